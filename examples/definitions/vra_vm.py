@@ -4,7 +4,7 @@ from vra_sdk.models.vra_object import VraBaseObject
 RESOURCE_TYPE = ['Virtual Machine']
 
 
-class Vm(VraBaseObject):
+class Vm(VraBaseObject, slotted=True):
 
     def __init__(self, raw_data=None, id=None, name=None, attr1=None, attr2=None):
 
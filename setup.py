@@ -14,5 +14,9 @@ setup(name='vra_sdk',
       install_requires=[
           "pbr", 'requests', 'dateutils', 'urllib3'
       ],
+      extras_require={
+          'async': ['aiohttp'],
+          'json': ['orjson']
+      },
       zip_safe=False
       )
@@ -10,12 +10,9 @@ def get_test_config_file_path():
 
 def get_side_effect_by_args(*args, **kwargs):
     m = MagicMock()
-    if "/catalog-service/api/consumer/entitledCatalogItems?limit=998" in args[0]:
-        # get_bg_id
-        m.text = '{"content":[{"entitledOrganizations":[{"subtenantLabel":"fake_bg", "subtenantRef":"fake_bg_id"}]}]}'
-    elif "/catalog-service/api/consumer/entitledCatalogItems?limit=9999" in args[0]:
-        # get_catalog
-        m.text = '{"content":[{"catalogItem":{"name":"fake_catalog_item", "id":"fake_catalog_item_id"}}]}'
+    if "/catalog-service/api/consumer/entitledCatalogItems?limit=9999" in args[0]:
+        # get_entitled_items
+        m.text = '{"content":[{"catalogItem":{"name":"fake_catalog_item", "id":"fake_catalog_item_id"}, "entitledOrganizations":[{"subtenantLabel":"fake_bg", "subtenantRef":"fake_bg_id"}]}]}'
     elif '/catalog-service/api/consumer/resources' in args[0]:
         # update_catalog_resource_operation
         m.text = '{"operations":[{"name":"fake_action_name", "id":"fake_action_id"}]}'
@@ -28,10 +25,8 @@ def get_side_effect_by_args(*args, **kwargs):
 def get_side_effect(*args, **kwargs):
     m = MagicMock()
     stack = [elt.function for elt in inspect.stack()]
-    if 'get_bg_id' in stack:
-        m.text = '{"content":[{"entitledOrganizations":[{"subtenantLabel":"fake_bg", "subtenantRef":"fake_bg_id"}]}]}'
-    elif 'get_catalog' in stack:
-        m.text = '{"content":[{"catalogItem":{"name":"fake_catalog_item", "id":"fake_catalog_item_id"}}]}'
+    if 'get_entitled_items' in stack:
+        m.text = '{"content":[{"catalogItem":{"name":"fake_catalog_item", "id":"fake_catalog_item_id"}, "entitledOrganizations":[{"subtenantLabel":"fake_bg", "subtenantRef":"fake_bg_id"}]}]}'
     elif 'get_status' in stack:
         m.text = '{"state":"SUCCESSFUL"}'
     elif ('get_template' in stack) and ('request_catalog_item' in stack):
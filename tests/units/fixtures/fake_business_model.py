@@ -9,3 +9,28 @@ class FakeObject(VraBaseObject):
         self.fake_attr1 = fake_attr1
         self.fake_attr2 = fake_attr2
         self.fake_attr_empty = fake_attr_empty
+
+
+class FakeKeywordObject(VraBaseObject):
+    def __init__(self, class_=None, fake_attr1=None):
+        super().__init__()
+
+        self.class_ = class_
+        self.fake_attr1 = fake_attr1
+
+
+class FakeRawObject(VraBaseObject):
+    def __init__(self, raw_data=None, fake_attr1=None):
+        super().__init__()
+
+        self.raw_data = raw_data
+        self.fake_attr1 = fake_attr1
+
+
+class FakeSlottedObject(VraBaseObject, slotted=True):
+    def __init__(self, raw_data=None, fake_attr1=None, fake_attr2=None):
+        super().__init__()
+
+        self.raw_data = raw_data
+        self.fake_attr1 = fake_attr1
+        self.fake_attr2 = fake_attr2 or []
@@ -0,0 +1,271 @@
+# -*- coding: utf-8 -*-
+import asyncio
+import unittest
+from unittest.mock import patch, MagicMock
+from pytest import mark
+from vra_sdk.vra_async import AsyncVraAuthenticate, AsyncVraRequest, AsyncVraSdk, request_json, gather_bounded
+from vra_sdk.vra_utils import TtlLruCache
+from vra_sdk.vra_exceptions import VraSdkAsyncException, VraSdkMainRequestException, VraSdkEntitlementException, \
+    VraSdkRequestTimeoutException
+from ..setup_test import SetupTest
+
+
+def run(coroutine):
+    loop = asyncio.new_event_loop()
+    try:
+        return loop.run_until_complete(coroutine)
+    finally:
+        loop.close()
+
+
+def fake_request_json(answers):
+    """Build a request_json replacement answering according to the requested url"""
+
+    async def side_effect(config, method, url, **kwargs):
+        for pattern, answer in answers:
+            if pattern in url:
+                return answer() if callable(answer) else answer
+        raise AssertionError(f'Unexpected url {url}')
+
+    return MagicMock(side_effect=side_effect)
+
+
+async def no_sleep(delay):
+    pass
+
+
+@mark.test_unit
+class TestVraAsyncHelpers(SetupTest):
+    def test_request_json_raises_no_session(self):
+        config = MagicMock()
+        config.aio_session = None
+        with self.assertRaises(VraSdkAsyncException):
+            run(request_json(config, 'GET', 'fake_url'))
+
+    def test_gather_bounded(self):
+        async def double(x):
+            await asyncio.sleep(0)
+            return x * 2
+
+        result = run(gather_bounded(double, range(10), 3))
+
+        self.assertEqual(result, [x * 2 for x in range(10)])
+
+
+@mark.test_unit
+@patch('vra_sdk.vra_authenticate.VraConfig')
+class TestAsyncVraAuthenticate(SetupTest):
+    @patch('vra_sdk.vra_async.aiohttp', None)
+    def test_init_raises_no_aiohttp(self, mock_config):
+        with self.assertRaises(VraSdkAsyncException):
+            AsyncVraAuthenticate('PRD')
+
+    def test_auth_login_password(self, mock_config):
+        mock_config.return_value.aio_session = None
+        mock_config.return_value.max_concurrent_requests = 5
+        mock_config.return_value.vcac_server = 'fake_server'
+
+        async def scenario():
+            with patch('vra_sdk.vra_async.request_json', fake_request_json([('/identity/api/tokens', ({'id': 'fake_token'}, {}))])) as mock_request:
+                async with AsyncVraAuthenticate('PRD') as auth:
+                    await auth.auth_login_password('fake_login', 'fake_pwd', 'fake_domain')
+                    headers = dict(mock_config.return_value.aio_session.headers)
+                return auth, headers, mock_request
+
+        auth, headers, mock_request = run(scenario())
+
+        self.assertEqual(auth.token, 'fake_token')
+        self.assertEqual(auth.requestedFor, 'fake_login@fake_domain')
+        self.assertEqual(headers['Authorization'], 'Bearer fake_token')
+        self.assertIsNone(mock_config.return_value.aio_session)
+        self.assertEqual(mock_request.call_args[1]['json']['username'], 'fake_login')
+
+
+@mark.test_unit
+@patch('vra_sdk.vra_request.VraConfig')
+class TestAsyncVraRequest(SetupTest):
+    @patch('vra_sdk.vra_async.asyncio.sleep', new=no_sleep)
+    def test_execute_sync(self, mock_config):
+        states = iter(['IN_PROGRESS', 'IN_PROGRESS', 'SUCCESSFUL'])
+        mock_request = fake_request_json([
+            ('fake_request_url', (None, {'Location': 'fake_status_url'})),
+            ('fake_status_url', lambda: ({'state': next(states)}, {}))])
+        payload = MagicMock()
+        payload.request_url.return_value = 'fake_request_url'
+
+        with patch('vra_sdk.vra_async.request_json', mock_request):
+            result = run(AsyncVraRequest(payload).execute_sync())
+
+        self.assertEqual(result.status_url, 'fake_status_url')
+        self.assertEqual(mock_request.call_count, 4)
+
+    @patch('vra_sdk.vra_async.asyncio.sleep', new=no_sleep)
+    def test_execute_sync_raises(self, mock_config):
+        mock_request = fake_request_json([
+            ('fake_request_url', (None, {'Location': 'fake_status_url'})),
+            ('fake_status_url', ({'state': 'PROVIDER_FAILED'}, {}))])
+        payload = MagicMock()
+        payload.request_url.return_value = 'fake_request_url'
+
+        with patch('vra_sdk.vra_async.request_json', mock_request):
+            with self.assertRaises(VraSdkMainRequestException):
+                run(AsyncVraRequest(payload).execute_sync())
+
+    @patch('vra_sdk.vra_async.asyncio.sleep', new=no_sleep)
+    @patch('vra_sdk.vra_async.polling_delays')
+    def test_execute_sync_raises_timeout(self, mock_delays, mock_config):
+        mock_config.return_value.polling = {}
+        mock_delays.return_value = iter([3])
+        mock_request = fake_request_json([
+            ('fake_request_url', (None, {'Location': 'fake_status_url'})),
+            ('fake_status_url', ({'state': 'IN_PROGRESS'}, {}))])
+        payload = MagicMock()
+        payload.request_url.return_value = 'fake_request_url'
+
+        with patch('vra_sdk.vra_async.request_json', mock_request):
+            with self.assertRaises(VraSdkRequestTimeoutException):
+                run(AsyncVraRequest(payload).execute_sync())
+        self.assertEqual(mock_request.call_count, 3)
+
+    @patch('vra_sdk.vra_request.VraRequest.format_filters')
+    def test_get_object_raw_full(self, mock_format, mock_config):
+        mock_config.return_value.vcac_server = 'fake_server'
+        mock_config.return_value.max_concurrent_requests = 3
+        mock_format.return_value = None
+        ids = [f"id{i}" for i in range(6)]
+
+        async def side_effect(config, method, url, **kwargs):
+            if '?' in url:
+                return {"content": [{"id": id} for id in ids], "metadata": {"totalPages": 1}}, {}
+            await asyncio.sleep(0)
+            return {"id": url.rsplit('/', 1)[1]}, {}
+
+        with patch('vra_sdk.vra_async.request_json', MagicMock(side_effect=side_effect)):
+            request = AsyncVraRequest({})
+            result = run(request.get_object_raw('vm', None, None, 6, 1, True))
+
+        self.assertEqual(result, [{"id": id} for id in ids])
+        self.assertEqual(request.metadata, {"totalPages": 1})
+
+
+@mark.test_unit
+@patch('vra_sdk.vra_request.VraConfig')
+@patch('vra_sdk.vra_async.VraConfig')
+class TestAsyncVraSdk(SetupTest):
+    entitled_items = {"content": [{"catalogItem": {"name": "fake_item", "id": "fake_item_id"},
+                                   "entitledOrganizations": [{"subtenantLabel": "fake_bg", "subtenantRef": "fake_bg_id"}]}]}
+
+    def test_load(self, mock_config, mock_request_config):
+        mock_config.return_value.cache = None
+        mock_request = fake_request_json([('entitledCatalogItems', (self.entitled_items, {}))])
+
+        with patch('vra_sdk.vra_async.request_json', mock_request):
+            sdk = run(AsyncVraSdk(MagicMock(context=None), 'fake_bg').load())
+
+        self.assertEqual(sdk.catalog, {'fake_item': 'fake_item_id'})
+        self.assertEqual(sdk.business_group_id, 'fake_bg_id')
+        mock_request.assert_called_once()
+
+    def test_load_from_cache(self, mock_config, mock_request_config):
+        mock_config.return_value.cache.get.return_value = {'catalog': {'fake_item': 'fake_item_id'}, 'business_group_id': 'fake_bg_id'}
+        mock_request = fake_request_json([])
+
+        with patch('vra_sdk.vra_async.request_json', mock_request):
+            sdk = run(AsyncVraSdk(MagicMock(context=None), 'fake_bg').load())
+
+        self.assertEqual(sdk.catalog, {'fake_item': 'fake_item_id'})
+        self.assertEqual(sdk.business_group_id, 'fake_bg_id')
+        mock_request.assert_not_called()
+
+    @patch('vra_sdk.vra_async.AsyncVraSdk.format_payload')
+    def test_request_catalog_item_outdated_cache(self, mock_payload, mock_config, mock_request_config):
+        mock_config.return_value.config_file = {'payload_default_version': 6, 'catalog_item': {}}
+        mock_config.return_value.cache.get.side_effect = [{'catalog': {'old_item': 'old_id'}, 'business_group_id': 'fake_bg_id'}, None]
+        mock_request = fake_request_json([('entitledCatalogItems', (self.entitled_items, {}))])
+
+        with patch('vra_sdk.vra_async.request_json', mock_request):
+            sdk = run(AsyncVraSdk(MagicMock(context=None), 'fake_bg').load())
+            result = run(sdk.request_catalog_item('fake_item'))
+
+        mock_config.return_value.cache.invalidate.assert_called_once()
+        self.assertEqual(sdk.catalog, {'fake_item': 'fake_item_id'})
+        self.assertEqual(result.on_entitlement_error, sdk.invalidate_cache)
+        mock_payload.assert_called_once()
+
+    def test_catalog_raises_not_loaded(self, mock_config, mock_request_config):
+        with self.assertRaises(VraSdkAsyncException):
+            'fake_item' in AsyncVraSdk(MagicMock(context=None), 'fake_bg').catalog
+
+    def test_switch_business_group(self, mock_config, mock_request_config):
+        mock_config.return_value.cache = None
+        entitled_items = {"content": [
+            {"catalogItem": {"name": "fake_item", "id": "fake_item_id"},
+             "entitledOrganizations": [{"subtenantLabel": "fake_bg", "subtenantRef": "fake_bg_id"}]},
+            {"catalogItem": {"name": "other_item", "id": "other_item_id"},
+             "entitledOrganizations": [{"subtenantLabel": "other_bg", "subtenantRef": "other_bg_id"}]}]}
+        mock_request = fake_request_json([('entitledCatalogItems', (entitled_items, {}))])
+
+        with patch('vra_sdk.vra_async.request_json', mock_request):
+            sdk = run(AsyncVraSdk(MagicMock(context=None), 'fake_bg').load())
+            sdk.business_group = 'other_bg'
+            with self.assertRaises(VraSdkAsyncException):
+                sdk.catalog
+            run(sdk.load())
+
+        self.assertEqual(sdk.catalog, {'other_item': 'other_item_id'})
+        self.assertEqual(sdk.business_group_id, 'other_bg_id')
+        mock_request.assert_called_once()
+
+    def test_invalidate_cache(self, mock_config, mock_request_config):
+        sdk = AsyncVraSdk(MagicMock(context=None), 'fake_bg')
+        sdk.catalog = {'fake_item': 'fake_item_id'}
+        sdk.business_group_id = 'fake_bg_id'
+
+        self.assertTrue(sdk.invalidate_cache())
+
+        self.assertEqual(sdk.catalog, {})
+        self.assertEqual(sdk.business_group_id, '')
+
+    @patch('vra_sdk.vra_async.AsyncVraSdk.format_payload')
+    def test_request_catalog_item(self, mock_payload, mock_config, mock_request_config):
+        mock_config.return_value.config_file = {'payload_default_version': 7, 'catalog_item': {}}
+        mock_config.return_value.vcac_server = 'fake_server'
+        mock_config.return_value.template_cache = TtlLruCache()
+        mock_request = fake_request_json([('requests/template', ({'data': {}}, {}))])
+        sdk = AsyncVraSdk(MagicMock(context=None), 'fake_bg')
+        sdk.catalog = {'fake_item': 'fake_item_id'}
+
+        with patch('vra_sdk.vra_async.request_json', mock_request):
+            result = run(sdk.request_catalog_item('fake_item', fake_key='fake_value'))
+            run(sdk.request_catalog_item('fake_item', fake_key='fake_value'))
+
+        self.assertIsInstance(result, AsyncVraRequest)
+        mock_payload.assert_called_with('catalog_item', 'fake_item', None, fake_key='fake_value',
+                                             payload_version=7, payload_template={'data': {}})
+        self.assertIn('/entitledCatalogItems/fake_item_id/requests/template', mock_request.call_args[0][2])
+        mock_request.assert_called_once()
+
+    def test_request_resource_action_raises(self, mock_config, mock_request_config):
+        mock_config.return_value.vcac_server = 'fake_server'
+        mock_request = fake_request_json([('resources/fake_resource', ({'operations': []}, {}))])
+        sdk = AsyncVraSdk(MagicMock(context=None), 'fake_bg')
+        sdk.catalog = {}
+
+        with patch('vra_sdk.vra_async.request_json', mock_request):
+            with self.assertRaises(VraSdkEntitlementException):
+                run(sdk.request_resource_action('fake_action', 'fake_resource'))
+
+    @patch('vra_sdk.vra_async.AsyncVraRequest.get_object', autospec=True)
+    def test_list_data_recursive(self, mock_get_object, mock_config, mock_request_config):
+        mock_config.return_value.max_concurrent_requests = 2
+        pages = {1: ['a', 'b'], 2: ['c', 'd'], 3: ['e', 'f'], 4: ['g']}
+
+        async def get_object(request, *args, **kwargs):
+            request.metadata = {'totalPages': 4}
+            return list(pages[args[4]])
+        mock_get_object.side_effect = get_object
+
+        result = run(AsyncVraSdk(MagicMock(context=None), 'fake_bg').list_data('vm', None, None, 2, 1, False, True))
+
+        self.assertEqual(result, ['a', 'b', 'c', 'd', 'e', 'f', 'g'])
+        self.assertEqual(mock_get_object.call_count, 4)
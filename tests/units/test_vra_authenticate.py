@@ -1,8 +1,10 @@
 # -*- coding: utf-8 -*-
 import unittest
-from unittest.mock import patch
+import time
+from unittest.mock import patch, MagicMock
+import requests
 from ..setup_test import SetupTest
-from vra_sdk.vra_authenticate import VraAuthenticate
+from vra_sdk.vra_authenticate import VraAuthenticate, parse_expires, hash_password
 from vra_sdk.vra_exceptions import VraSdkConfigException, VraSdkRequestException, VraSdkAuthenticateException
 from requests.exceptions import RequestException
 from pytest import mark
@@ -24,6 +26,7 @@ class TestVraAuthenticate(SetupTest):
         mock_config.assert_called_once()
         mock_urllib3.assert_called_once()
         self.assertEqual(authenticate.environment, 'PRD')
+        mock_config.return_value.mount_http_adapter.assert_called_once_with(mock_config.return_value.vcac_server)
         self.assertIsNone(authenticate.login)
         self.assertIsNone(authenticate.requestedFor)
         self.assertIsNone(authenticate.token)
@@ -39,6 +42,7 @@ class TestVraAuthenticate(SetupTest):
 
         mock_config.return_value.config_file = {'domain': [
             fake_domain], 'vcac_servers': {'PRD': 'fake_srv'}, 'tenant': {'PRD': ''}}
+        mock_config.return_value.cache = None
         mock_token.return_value = fake_token
 
         authenticate = VraAuthenticate('PRD')
@@ -106,3 +110,219 @@ class TestVraAuthenticate(SetupTest):
         authenticate.get_token(fake_login, fake_pwd)
 
         mock_config.return_value.session.post.assert_called_once_with('https://fake_srv/identity/api/tokens', headers={'Content-Type': 'application/json', 'Accept': 'application/json'}, json={'username': 'fake_login', 'password': 'fake_pwd', 'tenant': ''}, timeout=12, verify=False)
+
+    @patch("vra_sdk.vra_authenticate.VraConfig")
+    def test_get_token_expires(self, mock_config):
+        mock_config.return_value.config_file = {'vcac_servers': {'PRD': 'fake_srv'}, 'tenant': {'PRD': ''}}
+        mock_config.return_value.session.post.return_value.text = '{"id":"fake_token","expires":"2019-06-19T10:41:19.000Z"}'
+        authenticate = VraAuthenticate('PRD')
+
+        self.assertEqual(authenticate.get_token('fake_login', 'fake_pwd'), 'fake_token')
+        self.assertEqual(authenticate.expires, 1560940879)
+
+    def test_parse_expires(self):
+        self.assertEqual(parse_expires('2019-06-19T10:41:19.000Z'), 1560940879)
+        self.assertEqual(parse_expires('2019-06-19T12:41:19+0200'), 1560940879)
+        self.assertIsNone(parse_expires(None))
+        self.assertIsNone(parse_expires('fake_date'))
+
+
+@mark.test_unit
+@patch("vra_sdk.vra_authenticate.VraConfig")
+class TestVraAuthenticateTokenLifetime(SetupTest):
+    def set_config(self, mock_config, **token_options):
+        mock_config.return_value.config_file = {
+            'vcac_servers': {'PRD': 'fake_srv'}, 'tenant': {'PRD': 'fake_tenant'}, 'token': token_options}
+        mock_config.return_value.vcac_server = 'fake_srv'
+        mock_config.return_value.session = requests.Session()
+
+    def fake_get_token(self, authenticate, tokens, lifetime=3600):
+        tokens = iter(tokens)
+
+        def get_token(login, password):
+            authenticate.expires = time.time() + lifetime
+            return next(tokens)
+        return MagicMock(side_effect=get_token)
+
+    def test_auth_login_password_from_cache(self, mock_config):
+        self.set_config(mock_config, cache=True)
+        mock_config.return_value.cache.get.return_value = {'id': 'cached_token', 'expires': time.time() + 3600, 'salt': '00ff',
+                                                           'password_hash': hash_password('fake_pwd', '00ff')}
+        authenticate = VraAuthenticate('PRD')
+        authenticate.get_token = MagicMock()
+
+        with patch('vra_sdk.vra_authenticate.threading.Timer'):
+            authenticate.auth_login_password('fake_login', 'fake_pwd', 'fake_domain')
+
+        authenticate.get_token.assert_not_called()
+        self.assertEqual(authenticate.token, 'cached_token')
+        self.assertEqual(mock_config.return_value.session.headers['Authorization'], 'Bearer cached_token')
+        mock_config.return_value.cache.get.assert_called_once_with(('token', 'fake_srv', 'fake_tenant', 'fake_login@fake_domain'))
+
+    def test_auth_login_password_cache_expiring(self, mock_config):
+        self.set_config(mock_config, auto_refresh=False, cache=True)
+        mock_config.return_value.cache.get.return_value = {'id': 'cached_token', 'expires': time.time() + 60, 'salt': '00ff',
+                                                           'password_hash': hash_password('fake_pwd', '00ff')}
+        authenticate = VraAuthenticate('PRD')
+        authenticate.get_token = self.fake_get_token(authenticate, ['new_token'])
+
+        authenticate.auth_login_password('fake_login', 'fake_pwd', 'fake_domain')
+
+        self.assertEqual(authenticate.token, 'new_token')
+        key, entry = mock_config.return_value.cache.set.call_args[0]
+        self.assertEqual(key, ('token', 'fake_srv', 'fake_tenant', 'fake_login@fake_domain'))
+        self.assertEqual((entry['id'], entry['expires']), ('new_token', authenticate.expires))
+        self.assertEqual(entry['password_hash'], hash_password('fake_pwd', entry['salt']))
+        self.assertNotIn('fake_pwd', str(entry))
+
+    def test_auth_login_password_cache_disabled_by_default(self, mock_config):
+        self.set_config(mock_config, auto_refresh=False)
+        authenticate = VraAuthenticate('PRD')
+        authenticate.get_token = self.fake_get_token(authenticate, ['fake_token'])
+
+        authenticate.auth_login_password('fake_login', 'fake_pwd', 'fake_domain')
+
+        self.assertEqual(authenticate.token, 'fake_token')
+        mock_config.return_value.cache.get.assert_not_called()
+        mock_config.return_value.cache.set.assert_not_called()
+
+    @patch('vra_sdk.vra_authenticate.threading.Timer')
+    def test_schedule_refresh(self, mock_timer, mock_config):
+        self.set_config(mock_config, refresh_before=600)
+        mock_config.return_value.cache = None
+        authenticate = VraAuthenticate('PRD')
+        authenticate.get_token = self.fake_get_token(authenticate, ['fake_token'])
+
+        authenticate.auth_login_password('fake_login', 'fake_pwd', 'fake_domain')
+
+        delay, callback = mock_timer.call_args[0]
+        self.assertAlmostEqual(delay, 3000, delta=5)
+        self.assertEqual(callback, authenticate.refresh_in_background)
+        mock_timer.return_value.start.assert_called_once()
+
+        authenticate.cancel_refresh()
+        mock_timer.return_value.cancel.assert_called_once()
+
+    @patch('vra_sdk.vra_authenticate.threading.Timer')
+    def test_schedule_refresh_short_lifetime(self, mock_timer, mock_config):
+        self.set_config(mock_config, refresh_before=600)
+        mock_config.return_value.cache = None
+        authenticate = VraAuthenticate('PRD')
+        authenticate.get_token = self.fake_get_token(authenticate, ['fake_token'], lifetime=600)
+
+        authenticate.auth_login_password('fake_login', 'fake_pwd', 'fake_domain')
+
+        mock_timer.assert_not_called()
+        self.assertEqual(authenticate.token, 'fake_token')
+
+    def test_refresh_in_background(self, mock_config):
+        self.set_config(mock_config, auto_refresh=False)
+        mock_config.return_value.cache = None
+        authenticate = VraAuthenticate('PRD')
+        authenticate.get_token = self.fake_get_token(authenticate, ['fake_token', 'new_token'])
+        authenticate.auth_login_password('fake_login', 'fake_pwd', 'fake_domain')
+
+        authenticate.refresh_in_background()
+
+        self.assertEqual(authenticate.token, 'new_token')
+        self.assertEqual(mock_config.return_value.session.headers['Authorization'], 'Bearer new_token')
+
+    def test_refresh_token_raises_no_password(self, mock_config):
+        self.set_config(mock_config)
+        authenticate = VraAuthenticate('PRD').auth_login_token('fake_login', 'fake_token', 'fake_domain')
+
+        with self.assertRaises(VraSdkAuthenticateException):
+            authenticate.refresh_token()
+
+    def test_add_retry_hook(self, mock_config):
+        self.set_config(mock_config, auto_refresh=False)
+        mock_config.return_value.cache = None
+        first = VraAuthenticate('PRD')
+        first.get_token = self.fake_get_token(first, ['fake_token'])
+        second = VraAuthenticate('PRD')
+        second.get_token = self.fake_get_token(second, ['fake_token'])
+
+        first.auth_login_password('fake_login', 'fake_pwd', 'fake_domain')
+        second.auth_login_password('fake_login', 'fake_pwd', 'fake_domain')
+
+        self.assertEqual(mock_config.return_value.session.hooks['response'], [second.retry_unauthorized])
+
+    def test_retry_unauthorized(self, mock_config):
+        self.set_config(mock_config, auto_refresh=False)
+        mock_config.return_value.cache = None
+        authenticate = VraAuthenticate('PRD')
+        authenticate.get_token = self.fake_get_token(authenticate, ['fake_token', 'new_token'])
+        authenticate.auth_login_password('fake_login', 'fake_pwd', 'fake_domain')
+        responses = []
+        for _ in range(2):
+            response = MagicMock(status_code=401, url='https://fake_srv/catalog-service/api/consumer/resources')
+            response.request = requests.Request('GET', response.url, headers={'Authorization': 'Bearer fake_token'}).prepare()
+            response.connection.send.return_value.history = []
+            responses.append(response)
+
+        results = [authenticate.retry_unauthorized(response, timeout=12) for response in responses]
+
+        self.assertEqual(authenticate.get_token.call_count, 2)
+        for response, result in zip(responses, results):
+            self.assertIs(result, response.connection.send.return_value)
+            self.assertEqual(result.history, [response])
+            request = response.connection.send.call_args[0][0]
+            self.assertEqual(request.headers['Authorization'], 'Bearer new_token')
+            self.assertEqual(response.connection.send.call_args[1], {'timeout': 12})
+
+    def test_retry_unauthorized_ignored(self, mock_config):
+        self.set_config(mock_config)
+        authenticate = VraAuthenticate('PRD').auth_login_token('fake_login', 'fake_token', 'fake_domain')
+        response = MagicMock(status_code=401, url='https://fake_srv/catalog-service/api/consumer/resources')
+
+        self.assertIs(authenticate.retry_unauthorized(response), response)
+        response.status_code = 200
+        authenticate._password = 'fake_pwd'
+        self.assertIs(authenticate.retry_unauthorized(response), response)
+        response.connection.send.assert_not_called()
+
+    @patch('vra_sdk.vra_authenticate.threading.Timer')
+    def test_superseded_authentication(self, mock_timer, mock_config):
+        self.set_config(mock_config)
+        mock_config.return_value.cache = None
+        first = VraAuthenticate('PRD')
+        first.get_token = self.fake_get_token(first, ['A1', 'A2'])
+        second = VraAuthenticate('PRD')
+        second.get_token = self.fake_get_token(second, ['B1'])
+
+        first.auth_login_password('user_a', 'fake_pwd', 'fake_domain')
+        first_timer = first._refresh_timer
+        second.auth_login_password('user_b', 'fake_pwd', 'fake_domain')
+        first.refresh_in_background()
+
+        first_timer.cancel.assert_called()
+        self.assertIsNone(first._refresh_timer)
+        first.get_token.assert_called_once()
+        self.assertEqual(mock_config.return_value.session.headers['Authorization'], 'Bearer B1')
+
+    @patch('vra_sdk.vra_authenticate.threading.Timer')
+    def test_auth_login_token_stops_refresh(self, mock_timer, mock_config):
+        self.set_config(mock_config)
+        mock_config.return_value.cache = None
+        authenticate = VraAuthenticate('PRD')
+        authenticate.get_token = self.fake_get_token(authenticate, ['fake_token'])
+        authenticate.auth_login_password('fake_login', 'fake_pwd', 'fake_domain')
+
+        authenticate.auth_login_token('fake_login', 'other_token', 'fake_domain')
+
+        mock_timer.return_value.cancel.assert_called()
+        self.assertIsNone(authenticate._refresh_timer)
+        self.assertEqual(mock_config.return_value.session.hooks['response'], [])
+        with self.assertRaises(VraSdkAuthenticateException):
+            authenticate.refresh_token()
+
+    def test_auth_login_password_cache_other_password(self, mock_config):
+        self.set_config(mock_config, auto_refresh=False, cache=True)
+        mock_config.return_value.cache.get.return_value = {'id': 'cached_token', 'expires': time.time() + 3600, 'salt': '00ff',
+                                                           'password_hash': hash_password('fake_pwd', '00ff')}
+        authenticate = VraAuthenticate('PRD')
+        authenticate.get_token = MagicMock(side_effect=VraSdkAuthenticateException())
+
+        with self.assertRaises(VraSdkAuthenticateException):
+            authenticate.auth_login_password('fake_login', 'wrong_pwd', 'fake_domain')
+        authenticate.get_token.assert_called_once_with('fake_login', 'wrong_pwd')
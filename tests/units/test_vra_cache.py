@@ -0,0 +1,57 @@
+# -*- coding: utf-8 -*-
+import os
+import time
+import tempfile
+import unittest
+from unittest.mock import patch
+from pytest import mark
+from vra_sdk.vra_cache import VraCache
+
+
+@mark.test_unit
+class TestVraCache(unittest.TestCase):
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.cache = VraCache(os.path.join(self.directory.name, 'cache'), 60)
+
+    def tearDown(self):
+        self.directory.cleanup()
+
+    def test_get_missing(self):
+        self.assertIsNone(self.cache.get(('fake_server', 'fake_login')))
+
+    def test_set_get(self):
+        self.cache.set(('fake_server', 'fake_login'), {'catalog': {'fake_name': 'fake_id'}})
+
+        self.assertEqual(self.cache.get(('fake_server', 'fake_login')), {'catalog': {'fake_name': 'fake_id'}})
+        self.assertIsNone(self.cache.get(('fake_server', 'other_login')))
+        self.assertEqual(os.listdir(self.cache.directory), [os.path.basename(self.cache.get_path(('fake_server', 'fake_login')))])
+
+    def test_get_expired(self):
+        self.cache.set(('fake_server', 'fake_login'), {'catalog': {}})
+        path = self.cache.get_path(('fake_server', 'fake_login'))
+        os.utime(path, (time.time() - 120, time.time() - 120))
+
+        self.assertIsNone(self.cache.get(('fake_server', 'fake_login')))
+
+    def test_get_corrupted(self):
+        os.makedirs(self.cache.directory)
+        with open(self.cache.get_path(('fake_server', 'fake_login')), 'w') as f:
+            f.write('{"catalog":')
+
+        self.assertIsNone(self.cache.get(('fake_server', 'fake_login')))
+
+    def test_invalidate(self):
+        self.cache.set(('fake_server', 'fake_login'), {'catalog': {}})
+
+        self.assertTrue(self.cache.invalidate(('fake_server', 'fake_login')))
+        self.assertFalse(self.cache.invalidate(('fake_server', 'fake_login')))
+        self.assertIsNone(self.cache.get(('fake_server', 'fake_login')))
+
+    @patch('vra_sdk.vra_cache.os.replace')
+    def test_set_error_ignored(self, mock_replace):
+        mock_replace.side_effect = OSError()
+
+        with self.assertLogs('vra_sdk.vra_cache', level='WARNING'):
+            self.assertFalse(self.cache.set(('fake_server', 'fake_login'), {'catalog': {}}))
+        self.assertEqual(os.listdir(self.cache.directory), [])
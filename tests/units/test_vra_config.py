@@ -2,7 +2,9 @@
 import unittest
 from unittest.mock import patch, mock_open
 import json
+import socket
 from vra_sdk.vra_config import VraConfig
+from vra_sdk.vra_exceptions import VraSdkConfigException
 from ..setup_test import SetupTest
 from pytest import mark
 
@@ -13,3 +15,37 @@ class TestVraConfig(SetupTest):
     def test_init(self, mock_oppen):
         result = VraConfig('fake.json')
         self.assertEqual(result.config_file, {'fake_config': ''})
+
+    @patch('vra_sdk.vra_config.open', new_callable=mock_open,
+           read_data='{"max_concurrent_requests": 20, "http": {"pool_block": true, "retry": {"total": 5}, "keepalive": {"idle": 30}}}')
+    def test_init_http_adapter(self, mock_open):
+        result = VraConfig('fake.json')
+
+        adapter = result.http_adapter
+        self.assertEqual(adapter._pool_maxsize, 20)
+        self.assertTrue(adapter._pool_block)
+        self.assertEqual(adapter.max_retries.total, 5)
+        self.assertTrue(adapter.max_retries.is_retry('GET', 503))
+        self.assertFalse(adapter.max_retries.is_retry('POST', 503))
+        self.assertTrue(adapter.max_retries.respect_retry_after_header)
+        self.assertIn((socket.SOL_SOCKET, socket.SO_KEEPALIVE, 1), adapter.poolmanager.connection_pool_kw['socket_options'])
+
+    @patch('vra_sdk.vra_config.open', new_callable=mock_open, read_data='{"http": {"retry": null, "keepalive": false}}')
+    def test_init_http_adapter_disabled(self, mock_open):
+        adapter = VraConfig('fake.json').http_adapter
+
+        self.assertEqual(adapter.max_retries.total, 0)
+        self.assertNotIn('socket_options', adapter.poolmanager.connection_pool_kw)
+
+    @patch('vra_sdk.vra_config.open', new_callable=mock_open, read_data='{"output_timezone": "+1"}')
+    def test_init_invalid_output_timezone(self, mock_open):
+        with self.assertRaises(VraSdkConfigException):
+            VraConfig('fake.json')
+
+    def test_mount_http_adapter(self):
+        config = VraConfig()
+
+        config.mount_http_adapter('fake_server')
+
+        self.assertIs(config.session.get_adapter('https://fake_server/identity/api/tokens'), config.http_adapter)
+        self.assertIsNot(config.session.get_adapter('https://other_server/'), config.http_adapter)
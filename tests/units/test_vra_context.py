@@ -0,0 +1,87 @@
+# -*- coding: utf-8 -*-
+import unittest
+from unittest.mock import patch, MagicMock
+from pytest import mark
+from vra_sdk.vra_context import VraContext
+from vra_sdk.vra_authenticate import VraAuthenticate
+from vra_sdk.vra_request import VraRequest
+from vra_sdk.vra_sdk import VraSdk
+from vra_sdk.vra_exceptions import VraSdkMainException
+from ..setup_test import SetupTest
+
+
+def fake_config(**config_file):
+    config = MagicMock()
+    config.config_file = {'vcac_servers': {'PRD': 'prd_server', 'DEV': 'dev_server'},
+                          'tenant': {'PRD': 'prd_tenant', 'DEV': 'dev_tenant'}, **config_file}
+    config.max_concurrent_requests = 4
+    config.polling = {}
+    config.cache = None
+    return config
+
+
+@mark.test_unit
+class TestVraContext(SetupTest):
+    def test_init(self):
+        config = fake_config(template_cache={'maxsize': 3}, http={'retry': None})
+
+        context = VraContext(config)
+
+        self.assertIs(context.config_file, config.config_file)
+        self.assertEqual(context.max_concurrent_requests, 4)
+        self.assertEqual(context.template_cache.maxsize, 3)
+        self.assertFalse(context.session.trust_env)
+        self.assertEqual(context.http_adapter._pool_maxsize, 10)
+        self.assertEqual(context.http_adapter.max_retries.total, 0)
+        self.assertIsNone(context.vcac_server)
+        self.assertIsNone(context.aio_session)
+
+    def test_contexts_are_isolated(self):
+        config = fake_config()
+
+        prd = VraContext(config)
+        dev = VraContext(config)
+        self.assertIs(VraAuthenticate('PRD', context=prd).auth_login_token('fake_login', 'prd_token', 'fake_domain').context, prd)
+        VraAuthenticate('DEV', context=dev).auth_login_token('fake_login', 'dev_token', 'fake_domain')
+
+        self.assertEqual(prd.vcac_server, 'prd_server')
+        self.assertEqual(dev.vcac_server, 'dev_server')
+        self.assertEqual(prd.session.headers['Authorization'], 'Bearer prd_token')
+        self.assertEqual(dev.session.headers['Authorization'], 'Bearer dev_token')
+        self.assertIs(prd.session.get_adapter('https://prd_server/identity'), prd.http_adapter)
+        self.assertIsNot(prd.http_adapter, dev.http_adapter)
+        self.assertIsNot(prd.template_cache, dev.template_cache)
+        config.mount_http_adapter.assert_not_called()
+
+    @patch('vra_sdk.vra_request.VraConfig')
+    def test_request_uses_context(self, mock_config):
+        context = VraContext(fake_config())
+
+        request = VraRequest({}, context=context)
+
+        self.assertIs(request.config, context)
+        mock_config.assert_not_called()
+
+    @patch('vra_sdk.vra_sdk.VraRequest')
+    @patch('vra_sdk.vra_sdk.VraConfig')
+    def test_sdk_propagates_context(self, mock_config, mock_request):
+        mock_request.return_value.get_object.return_value = ['fake_data']
+        context = VraContext(fake_config())
+
+        sdk = VraSdk(MagicMock(context=context), 'fake_bg')
+        sdk.get_data('vm', 'id', 'fake_id')
+
+        self.assertIs(sdk.context, context)
+        self.assertIs(sdk.config, context)
+        mock_config.assert_not_called()
+        mock_request.assert_called_once_with({}, context=context)
+        self.assertIs(VraSdk(MagicMock(context=context), 'fake_bg', context=context).context, context)
+
+    @patch('vra_sdk.vra_sdk.VraConfig')
+    def test_sdk_raises_context_mismatch(self, mock_config):
+        context = VraContext(fake_config())
+
+        with self.assertRaises(VraSdkMainException):
+            VraSdk(MagicMock(context=None), 'fake_bg', context=context)
+        with self.assertRaises(VraSdkMainException):
+            VraSdk(MagicMock(context=VraContext(fake_config())), 'fake_bg', context=context)
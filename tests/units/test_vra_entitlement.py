@@ -0,0 +1,43 @@
+# -*- coding: utf-8 -*-
+import unittest
+from pytest import mark
+from vra_sdk.vra_entitlement import VraEntitlementIndex
+
+
+@mark.test_unit
+class TestVraEntitlementIndex(unittest.TestCase):
+    entitled_items = [
+        {"catalogItem": {"name": "item1", "id": "item1_id"},
+         "entitledOrganizations": [{"subtenantLabel": "bg1", "subtenantRef": "bg1_id"},
+                                   {"subtenantLabel": "bg2", "subtenantRef": "bg2_id"}]},
+        {"catalogItem": {"name": "item2", "id": "item2_id"},
+         "entitledOrganizations": [{"subtenantLabel": "bg2", "subtenantRef": "bg2_id"}]}]
+
+    def test_get_bg_id(self):
+        index = VraEntitlementIndex(self.entitled_items)
+
+        self.assertEqual(index.get_bg_id("bg1"), "bg1_id")
+        self.assertEqual(index.get_bg_id("bg2"), "bg2_id")
+        self.assertIsNone(index.get_bg_id("bg3"))
+
+    def test_get_catalog(self):
+        index = VraEntitlementIndex(self.entitled_items)
+
+        self.assertEqual(index.get_catalog(), {"item1": "item1_id", "item2": "item2_id"})
+        self.assertEqual(index.get_catalog("bg1"), {"item1": "item1_id"})
+        self.assertEqual(index.get_catalog("bg2"), {"item1": "item1_id", "item2": "item2_id"})
+        self.assertEqual(index.get_catalog("bg3"), {})
+
+    def test_get_catalog_copy(self):
+        index = VraEntitlementIndex(self.entitled_items)
+
+        index.get_catalog()["new_operation"] = "new_id"
+
+        self.assertNotIn("new_operation", index.catalog)
+
+    def test_partial_items(self):
+        index = VraEntitlementIndex([{"entitledOrganizations": [{"subtenantLabel": "bg1"}]},
+                                     {"catalogItem": {"name": "item1", "id": "item1_id"}}])
+
+        self.assertIsNone(index.get_bg_id("bg1"))
+        self.assertEqual(index.get_catalog(), {"item1": "item1_id"})
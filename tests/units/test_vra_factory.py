@@ -1,6 +1,6 @@
 # -*- coding: utf-8 -*-
 import unittest
-from unittest.mock import patch
+from unittest.mock import patch, MagicMock
 from vra_sdk.vra_exceptions import VraSdkFactoryException, VraSdkConfigException
 import sys
 import os
@@ -48,3 +48,108 @@ class TestVraObject(SetupTest):
         self.assertEqual(my_object.fake_attr1, 'value1')
         self.assertEqual(my_object.fake_attr2, 'value2')
         self.assertIsNone(my_object.fake_attr_empty)
+
+    def test_factory_from_resource(self, mock_config):
+        sys.path.append(os.path.abspath(os.path.join(
+            os.path.dirname(__file__), "fixtures")))
+        mock_config.return_value.config_file = {'business_models': {
+            'fake_type': {'path': 'fake_business_model.FakeObject'}}}
+        resource = MagicMock()
+        resource.__iter__.return_value = iter(['fake_attr1', 'fake_attr2'])
+        resource.__getitem__.side_effect = lambda key: f'{key}_value'
+
+        my_object = VraFactory.factory_from_resource('fake_type', resource, ['fake_attr1'])
+
+        self.assertEqual(my_object.fake_attr1, 'fake_attr1_value')
+        self.assertIsNone(my_object.fake_attr2)
+        resource.__getitem__.assert_called_once_with('fake_attr1')
+
+    def test_factory_from_resource_raises_not_authorized(self, mock_config):
+        sys.path.append(os.path.abspath(os.path.join(
+            os.path.dirname(__file__), "fixtures")))
+        mock_config.return_value.config_file = {'business_models': {
+            'fake_type': {'path': 'fake_business_model.FakeObject'}}}
+
+        with self.assertRaises(VraSdkConfigException):
+            VraFactory.factory_from_resource('fake_type', {'fake_attr3': ''}, ['fake_attr1'])
+
+    @patch('vra_sdk.vra_factory.get_module_class')
+    def test_factory_resolves_class_once(self, mock_module, mock_config):
+        mock_config.return_value.config_file = {'business_models': {
+            'fake_type': {'path': 'fake_business_model.FakeObject'}}}
+        mock_module.return_value = None, MagicMock()
+
+        VraFactory.factory('fake_type')
+        VraFactory.factory('fake_type')
+        mock_module.assert_called_once_with('fake_business_model.FakeObject')
+
+        mock_config.return_value.config_file = {'business_models': {
+            'fake_type': {'path': 'fake_business_model.FakeObject'}}}
+        VraFactory.factory('fake_type')
+        self.assertEqual(mock_module.call_count, 2)
+
+    def test_factory_renames_keywords(self, mock_config):
+        sys.path.append(os.path.abspath(os.path.join(
+            os.path.dirname(__file__), "fixtures")))
+        mock_config.return_value.config_file = {'business_models': {
+            'fake_type': {'path': 'fake_business_model.FakeKeywordObject'}}}
+
+        my_object = VraFactory.factory('fake_type', **{'class': 'value1', 'fake.attr1': 'value2'})
+
+        self.assertEqual(my_object.class_, 'value1')
+        self.assertEqual(my_object.fake_attr1, 'value2')
+
+    @patch('vra_sdk.vra_factory.to_attribute_name')
+    def test_factory_many(self, mock_name, mock_config):
+        sys.path.append(os.path.abspath(os.path.join(
+            os.path.dirname(__file__), "fixtures")))
+        mock_config.return_value.config_file = {'business_models': {
+            'fake_type': {'path': 'fake_business_model.FakeObject'}}}
+        mock_name.side_effect = lambda key: key.replace('.', '_')
+
+        result = VraFactory.factory_many('fake_type', [{'fake.attr1': f'value{i}'} for i in range(5)])
+
+        self.assertNotIsInstance(result, list)
+        self.assertEqual([elt.fake_attr1 for elt in result], [f'value{i}' for i in range(5)])
+        mock_name.assert_called_once_with('fake.attr1')
+
+    def test_factory_many_raw_data(self, mock_config):
+        sys.path.append(os.path.abspath(os.path.join(
+            os.path.dirname(__file__), "fixtures")))
+        mock_config.return_value.config_file = {'business_models': {
+            'fake_type': {'path': 'fake_business_model.FakeRawObject'}}}
+
+        result = list(VraFactory.factory_many('fake_type', [{'fake_attr1': 'value1'}, {'fake_attr1': 'value2'}], [{'raw': 1}, {'raw': 2}]))
+
+        self.assertEqual([(elt.fake_attr1, elt.raw_data) for elt in result], [('value1', {'raw': 1}), ('value2', {'raw': 2})])
+
+    def test_factory_many_raises_not_authorized(self, mock_config):
+        sys.path.append(os.path.abspath(os.path.join(
+            os.path.dirname(__file__), "fixtures")))
+        mock_config.return_value.config_file = {'business_models': {
+            'fake_type': {'path': 'fake_business_model.FakeObject'}}}
+
+        with self.assertRaises(VraSdkConfigException):
+            list(VraFactory.factory_many('fake_type', [{'fake_attr1': 'value1'}, {'fake_attr3': 'value2'}]))
+
+    def test_factory_many_without_raw_data_attribute(self, mock_config):
+        sys.path.append(os.path.abspath(os.path.join(
+            os.path.dirname(__file__), "fixtures")))
+        mock_config.return_value.config_file = {'business_models': {
+            'fake_type': {'path': 'fake_business_model.FakeObject'}}}
+
+        result = list(VraFactory.factory_many('fake_type', [{'fake_attr1': 'value1'}], [{'raw': 1}]))
+
+        self.assertEqual(result[0].fake_attr1, 'value1')
+        self.assertFalse(hasattr(result[0], 'raw_data'))
+
+    def test_factory_slotted(self, mock_config):
+        sys.path.append(os.path.abspath(os.path.join(
+            os.path.dirname(__file__), "fixtures")))
+        mock_config.return_value.config_file = {'business_models': {
+            'fake_type': {'path': 'fake_business_model.FakeSlottedObject'}}}
+
+        my_object = VraFactory.factory('fake_type', **{'fake_attr1': 'value1', 'raw_data': {'raw': 1}})
+
+        self.assertEqual(my_object.to_dict(raw_data=True), {'raw_data': {'raw': 1}, 'fake_attr1': 'value1', 'fake_attr2': []})
+        self.assertFalse(hasattr(my_object, '__dict__'))
@@ -1,7 +1,7 @@
 # -*- coding: utf-8 -*-
 
 import unittest
-from unittest.mock import patch, call
+from unittest.mock import patch, call, MagicMock
 import vra_sdk.vra_formatter
 from ..setup_test import SetupTest
 from pytest import mark
@@ -57,6 +57,31 @@ class TestVraFormatter(SetupTest):
         result = vra_sdk.vra_formatter.parse_datetime(data_to_test)
         self.assertEqual(expected_result, result)
 
+    @patch('vra_sdk.vra_formatter.parse')
+    def test_parse_datetime_iso_fast_path(self, mock_parse):
+        data_to_test = {"key": "result_key", "value": {"value": "2018-12-20T21:37:45.123Z"}}
+        result = vra_sdk.vra_formatter.parse_datetime(data_to_test)
+        self.assertEqual(result, ("result_key", "2018-12-20T21:37:45.000+0100"))
+        mock_parse.assert_not_called()
+
+    def test_parse_datetime_not_iso(self):
+        data_to_test = {"key": "result_key", "value": {"value": "20 Dec 2018 21:37:45"}}
+        result = vra_sdk.vra_formatter.parse_datetime(data_to_test)
+        self.assertEqual(result, ("result_key", "2018-12-20T21:37:45.000+0100"))
+
+    def test_parse_datetime_output_timezone(self):
+        data_to_test = {"key": "result_key", "value": {"value": "2018-12-20T22:37:45.000+0100"}}
+        try:
+            vra_sdk.vra_formatter.set_output_timezone("-05:30")
+            result = vra_sdk.vra_formatter.parse_datetime(data_to_test)
+        finally:
+            vra_sdk.vra_formatter.set_output_timezone(None)
+        self.assertEqual(result, ("result_key", "2018-12-20T16:07:45.000-0530"))
+
+    def test_set_output_timezone_raises(self):
+        with self.assertRaises(ValueError):
+            vra_sdk.vra_formatter.set_output_timezone("Europe/Paris")
+
     @patch('vra_sdk.vra_formatter.parse_key')
     def test_parse_multiple(self, mock_parse_key):
         item_to_test = ""
@@ -184,19 +209,38 @@ class TestVraFormatter(SetupTest):
         mock_parse_key.assert_has_calls(calls)
         self.assertEqual(mock_parse_key.call_count, 2)
 
-    @patch('vra_sdk.vra_formatter.parse_string')
-    def test_parse_key_with_value(self, mock_parse_string):
+    def test_parse_key_with_value(self):
+        mock_parse_string = MagicMock()
         data_to_test = {"value": {"type": "string"}}
-        vra_sdk.vra_formatter.parse_key(data_to_test)
-        mock_parse_string.assert_called_once()
-        mock_parse_string.asser_called_with(data_to_test)
+        with patch.dict(vra_sdk.vra_formatter.PARSERS, {"string": mock_parse_string}):
+            vra_sdk.vra_formatter.parse_key(data_to_test)
+        mock_parse_string.assert_called_once_with(data_to_test)
 
-    @patch('vra_sdk.vra_formatter.parse_string')
-    def test_parse_key_without_value(self, mock_parse_string):
+    def test_parse_key_without_value(self):
+        mock_parse_string = MagicMock()
         data_to_test = {"type": "string"}
-        vra_sdk.vra_formatter.parse_key(data_to_test)
-        mock_parse_string.assert_called_once()
-        mock_parse_string.asser_called_with(data_to_test)
+        with patch.dict(vra_sdk.vra_formatter.PARSERS, {"string": mock_parse_string}):
+            vra_sdk.vra_formatter.parse_key(data_to_test)
+        mock_parse_string.assert_called_once_with(data_to_test)
+
+    def test_parse_key_upper_case(self):
+        data_to_test = {"key": "result_key", "value": {"type": "INTEGER", "value": "10"}}
+        self.assertEqual(vra_sdk.vra_formatter.parse_key(data_to_test), ("result_key", 10))
+
+    def test_parse_key_mixed_case(self):
+        data_to_test = {"key": "result_key", "value": {"type": "Integer", "value": "10"}}
+        self.assertEqual(vra_sdk.vra_formatter.parse_key(data_to_test), ("result_key", 10))
+
+    def test_parse_key_unknown_type(self):
+        with self.assertRaises(AttributeError):
+            vra_sdk.vra_formatter.parse_key({"key": "result_key", "value": {"type": "UNKNOWN", "value": ""}})
+
+    def test_register_parser(self):
+        data_to_test = {"key": "result_key", "value": {"type": "SECURE_STRING", "value": "secret"}}
+        with patch.dict(vra_sdk.vra_formatter.PARSERS):
+            vra_sdk.vra_formatter.register_parser("secure_string", lambda element: (element["key"], "*****"))
+            self.assertEqual(vra_sdk.vra_formatter.parse_key(data_to_test), ("result_key", "*****"))
+        self.assertNotIn("SECURE_STRING", vra_sdk.vra_formatter.PARSERS)
 
     @patch('vra_sdk.vra_formatter.parse_key')
     def test_format_result_with_values(self, mock_parse_key):
@@ -254,3 +298,39 @@ class TestVraFormatter(SetupTest):
         self.assertEqual(expected_result, result)
         mock_parse_key.assert_has_calls(calls)
         self.assertEqual(2, mock_parse_key.call_count)
+
+    def test_format_results(self):
+        data_to_test = [{"id": "id1", "resourceData": {"entries": [{"key": "MachineCPU", "value": {"type": "integer", "value": 2}}]}},
+                        {"id": "id2", "resourceData": {"entries": [{"key": "MachineCPU", "value": {"type": "integer", "value": 4}}]}}]
+
+        result = vra_sdk.vra_formatter.format_results(data_to_test)
+
+        self.assertEqual(result, [{"id": "id1", "machine_cpu": 2}, {"id": "id2", "machine_cpu": 4}])
+        self.assertEqual(result, [vra_sdk.vra_formatter.format_result(elt) for elt in data_to_test])
+
+    def test_lazy_resource(self):
+        data_to_test = {"values": {"entries": [{"key": "provider-MachineCPU", "value": {"type": "integer", "value": 2}},
+                                               {"key": "description", "value": {"type": "string", "value": "fake_entry_description"}},
+                                               {"key": "fake_none", "value": None}]},
+                        "id": "fake_id", "name": "fake_name", "description": "fake_description",
+                        "organization": {"subtenantRef": "fake_subRef", "subtenantLabel": "fake_subLabel"}}
+
+        resource = vra_sdk.vra_formatter.LazyResource(data_to_test)
+
+        self.assertEqual(dict(resource), vra_sdk.vra_formatter.format_result(data_to_test))
+
+    @patch('vra_sdk.vra_formatter.parse_key')
+    def test_lazy_resource_parses_on_access(self, mock_parse_key):
+        entries = [{"key": "provider-MachineCPU", "value": {"type": "integer", "value": 2}},
+                   {"key": "MachineMemory", "value": {"type": "integer", "value": 4096}}]
+        mock_parse_key.return_value = "MachineCPU", 2
+
+        resource = vra_sdk.vra_formatter.LazyResource({"id": "fake_id", "resourceData": {"entries": entries}})
+
+        self.assertEqual(set(resource), {"id", "machine_cpu", "machine_memory"})
+        mock_parse_key.assert_not_called()
+        self.assertEqual(resource["machine_cpu"], 2)
+        self.assertEqual(resource["machine_cpu"], 2)
+        mock_parse_key.assert_called_once_with(entries[0])
+        self.assertEqual(resource["id"], "fake_id")
+        self.assertEqual(resource.get("missing", "default"), "default")
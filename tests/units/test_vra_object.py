@@ -0,0 +1,122 @@
+# -*- coding: utf-8 -*-
+import json
+import unittest
+from unittest.mock import patch
+from vra_sdk.models import vra_object
+from vra_sdk.models.vra_object import VraBaseObject, get_fields, to_json_many, iter_ndjson, dumps
+from ..setup_test import SetupTest
+from pytest import mark
+
+
+class FakeModel(VraBaseObject):
+    def __init__(self, raw_data=None, id=None, name=None):
+        super().__init__()
+
+        self.raw_data = raw_data
+        self.id = id
+        self.name = name
+
+
+@mark.test_unit
+class TestVraObject(SetupTest):
+    def test_to_dict(self):
+        my_object = FakeModel({'raw': 1}, 'fake_id', 'fake_name')
+
+        self.assertEqual(my_object.to_dict(), {'id': 'fake_id', 'name': 'fake_name'})
+        self.assertEqual(my_object.to_dict(True), {'raw_data': {'raw': 1}, 'id': 'fake_id', 'name': 'fake_name'})
+
+    @patch('vra_sdk.models.vra_object.inspect.signature', wraps=vra_object.inspect.signature)
+    def test_get_fields_cached(self, mock_signature):
+        class FakeCachedModel(FakeModel):
+            pass
+
+        self.assertEqual(get_fields(FakeCachedModel), ('raw_data', 'id', 'name'))
+        FakeCachedModel().to_dict()
+        FakeCachedModel().to_json()
+
+        mock_signature.assert_called_once_with(FakeCachedModel)
+
+    def test_to_json(self):
+        result = FakeModel(None, 'fake_id', 'fake_name').to_json()
+
+        self.assertEqual(json.loads(result), {'id': 'fake_id', 'name': 'fake_name'})
+
+    def test_to_json_many(self):
+        objects = (FakeModel(None, f'id{i}') for i in range(3))
+
+        result = to_json_many(objects)
+
+        self.assertEqual(json.loads(result), [{'id': f'id{i}', 'name': None} for i in range(3)])
+
+    def test_iter_ndjson(self):
+        objects = [FakeModel({'raw': i}, f'id{i}') for i in range(3)]
+
+        result = list(iter_ndjson(objects, raw_data=True))
+
+        self.assertEqual(len(result), 3)
+        self.assertTrue(all(line.endswith('\n') and line.count('\n') == 1 for line in result))
+        self.assertEqual(json.loads(result[2]), {'raw_data': {'raw': 2}, 'id': 'id2', 'name': None})
+
+    @patch('vra_sdk.models.vra_object.orjson')
+    def test_dumps_json_module(self, mock_orjson):
+        self.assertEqual(dumps({'id': 'fake_id', 'size': float('nan')}), '{"id": "fake_id", "size": NaN}')
+        mock_orjson.dumps.assert_not_called()
+
+    @patch('vra_sdk.models.vra_object.orjson')
+    def test_to_json_json_module(self, mock_orjson):
+        result = FakeModel(None, 'fake_id', 'fake_name').to_json()
+
+        self.assertEqual(result, '{"id": "fake_id", "name": "fake_name"}')
+        mock_orjson.dumps.assert_not_called()
+
+    @patch('vra_sdk.models.vra_object.orjson')
+    def test_dumps_fast(self, mock_orjson):
+        mock_orjson.dumps.return_value = b'{"id":"fake_id"}'
+
+        self.assertEqual(dumps({'id': 'fake_id'}, fast=True), '{"id":"fake_id"}')
+        mock_orjson.dumps.assert_called_once_with({'id': 'fake_id'})
+
+    @patch('vra_sdk.models.vra_object.orjson', None)
+    def test_dumps_fast_without_orjson(self):
+        self.assertEqual(dumps({'id': 'fake_id'}, fast=True), '{"id": "fake_id"}')
+
+    def test_dumps_fast_fallback(self):
+        self.assertEqual(json.loads(dumps({1: 'fake_value'}, fast=True)), {'1': 'fake_value'})
+
+    def test_slotted(self):
+        class FakeBase(VraBaseObject):
+            __slots__ = ()
+
+            def describe(self):
+                return 'base'
+
+        class FakeSlottedModel(FakeBase, slotted=True):
+            """fake model"""
+
+            def __init__(self, raw_data=None, name=None):
+                super().__init__()
+                self.raw_data = raw_data
+                self.name = name
+
+            def describe(self):
+                return f'{super().describe()} {self.name}'
+
+            @property
+            def label(self):
+                return super().describe()
+
+        test_object = FakeSlottedModel(name='fake_name')
+
+        self.assertEqual(FakeSlottedModel.__slots__, ('raw_data', 'name'))
+        self.assertEqual(FakeSlottedModel.__doc__, 'fake model')
+        self.assertFalse(hasattr(test_object, '__dict__'))
+        self.assertEqual(test_object.describe(), 'base fake_name')
+        self.assertEqual(test_object.label, 'base')
+        self.assertEqual(test_object.to_dict(), {'name': 'fake_name'})
+        with self.assertRaises(AttributeError):
+            test_object.other = 'value'
+
+    def test_slotted_raises_no_constructor(self):
+        with self.assertRaises(TypeError):
+            class FakeSlottedModel(VraBaseObject, slotted=True):
+                pass
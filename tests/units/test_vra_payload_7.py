@@ -0,0 +1,124 @@
+# -*- coding: utf-8 -*-
+from unittest.mock import patch, MagicMock
+from pytest import mark
+from requests.exceptions import RequestException, HTTPError
+from vra_sdk.models.vra_payload_7 import get_catalog_item_template, get_resource_action_template, CatalogItem
+from vra_sdk.vra_utils import TtlLruCache
+from vra_sdk.vra_exceptions import VraSdkRequestException, VraSdkEntitlementException
+from ..setup_test import SetupTest
+
+
+class NotCopyable():
+    """Template value failing the test if the template is copied instead of shared"""
+
+    def __copy__(self):
+        raise AssertionError('template copied')
+
+    def __deepcopy__(self, memo):
+        raise AssertionError('template deep copied')
+
+
+@mark.test_unit
+@patch('vra_sdk.models.vra_payload_7.VraConfig')
+class TestVraPayload7Template(SetupTest):
+    def setUp(self):
+        self.template_cache = TtlLruCache()
+
+    def set_config(self, mock_config):
+        mock_config.return_value.vcac_server = 'fake_server'
+        mock_config.return_value.verify = False
+        mock_config.return_value.timeout = 12
+        mock_config.return_value.template_cache = self.template_cache
+        mock_config.return_value.session.get.return_value.text = '{"data": {}}'
+
+    def test_get_catalog_item_template_cached(self, mock_config):
+        self.set_config(mock_config)
+
+        self.assertEqual(get_catalog_item_template('fake_id'), {'data': {}})
+        self.assertEqual(get_catalog_item_template('fake_id'), {'data': {}})
+
+        mock_config.return_value.session.get.assert_called_once_with(
+            'https://fake_server/catalog-service/api/consumer/entitledCatalogItems/fake_id/requests/template', verify=False, timeout=12)
+        self.assertEqual(self.template_cache.get(('catalog_item', 'fake_server', 'fake_id')), {'data': {}})
+
+    def test_get_resource_action_template_cached_by_resource_type(self, mock_config):
+        self.set_config(mock_config)
+
+        get_resource_action_template('resource1', 'fake_action_id', 'Infrastructure.Virtual')
+        get_resource_action_template('resource2', 'fake_action_id', 'Infrastructure.Virtual')
+
+        mock_config.return_value.session.get.assert_called_once()
+
+    def test_get_resource_action_template_not_cached(self, mock_config):
+        self.set_config(mock_config)
+
+        get_resource_action_template('resource1', 'fake_action_id')
+        get_resource_action_template('resource1', 'fake_action_id')
+
+        self.assertEqual(mock_config.return_value.session.get.call_count, 2)
+
+    def test_get_catalog_item_template_raises(self, mock_config):
+        self.set_config(mock_config)
+        mock_config.return_value.session.get.side_effect = RequestException()
+
+        with self.assertRaises(VraSdkRequestException):
+            get_catalog_item_template('fake_id')
+        self.assertIsNone(self.template_cache.get(('catalog_item', 'fake_server', 'fake_id')))
+
+
+@mark.test_unit
+@patch('vra_sdk.models.vra_payload_7.VraConfig')
+class TestVraPayload7CatalogItem(SetupTest):
+    def test_template_not_modified(self, mock_config):
+        mock_config.return_value.config_file = {'not_in_data': ['payload_type', 'catalog_item_id', 'requested_for', 'business_group_id']}
+        template = {'data': {'vm': {'data': {'cpu': 1}}, 'fake_key': ''}}
+
+        def customization(payload, **kwargs):
+            payload['data']['vm']['data']['cpu'] = 4
+            return payload
+
+        payload = CatalogItem(customization, payload_template=template, payload_type='CatalogItem', catalog_item_id='fake_id',
+                              requested_for='fake_user', business_group_id='fake_bg_id', fake_key='fake_value')
+        payload.execute_request()
+
+        self.assertEqual(template, {'data': {'vm': {'data': {'cpu': 1}}, 'fake_key': ''}})
+        sent = mock_config.return_value.session.post.call_args[1]['json']
+        self.assertIs(type(sent), dict)
+        self.assertEqual(sent, {'data': {'vm': {'data': {'cpu': 4}}, 'fake_key': 'fake_value'}, 'catalogItemId': 'fake_id',
+                                'requestedFor': 'fake_user', 'businessGroupId': 'fake_bg_id'})
+
+    def test_template_not_modified_by_copy(self, mock_config):
+        mock_config.return_value.config_file = {'not_in_data': ['payload_type', 'catalog_item_id', 'requested_for', 'business_group_id']}
+        untouched = NotCopyable()
+        template = {'data': {'vm': {'data': {'cpu': 1}}, 'disks': [{'size': 10}]}, 'untouched': untouched}
+        kwargs = {'payload_type': 'CatalogItem', 'catalog_item_id': 'fake_id', 'requested_for': 'fake_user', 'business_group_id': 'fake_bg_id'}
+
+        def customization(payload, **kwargs):
+            copied = dict(payload)
+            copied['data']['vm']['data']['cpu'] = 4
+            updated = {}
+            updated.update({**copied})
+            updated['data']['disks'][0]['size'] = 20
+            return updated
+
+        first = CatalogItem(customization, payload_template=template, **kwargs)
+        second = CatalogItem(None, payload_template=template, **kwargs)
+
+        self.assertEqual(first.customized['data']['vm']['data']['cpu'], 4)
+        self.assertEqual(first.customized['data']['disks'], [{'size': 20}])
+        self.assertIs(first.customized['untouched'], untouched)
+        self.assertEqual(second.customized['data']['vm']['data']['cpu'], 1)
+        self.assertEqual(template, {'data': {'vm': {'data': {'cpu': 1}}, 'disks': [{'size': 10}]}, 'untouched': untouched})
+
+    def test_execute_request_raises_entitlement(self, mock_config):
+        mock_config.return_value.config_file = {'not_in_data': ['payload_type', 'catalog_item_id', 'requested_for', 'business_group_id']}
+        mock_config.return_value.session.post.return_value.raise_for_status.side_effect = HTTPError(response=MagicMock(status_code=403))
+        payload = CatalogItem(None, payload_template={'data': {}}, payload_type='CatalogItem', catalog_item_id='fake_id',
+                              requested_for='fake_user', business_group_id='fake_bg_id')
+
+        with self.assertRaises(VraSdkEntitlementException):
+            payload.execute_request()
+
+        mock_config.return_value.session.post.return_value.raise_for_status.side_effect = HTTPError(response=MagicMock(status_code=500))
+        with self.assertRaises(VraSdkRequestException):
+            payload.execute_request()
@@ -0,0 +1,82 @@
+# -*- coding: utf-8 -*-
+import unittest
+from vra_sdk.vra_query import VraFilter, VraQuery, where, all_of, any_of, get_query, format_value
+from vra_sdk.vra_exceptions import VraSdkQueryException
+from ..setup_test import SetupTest
+from pytest import mark
+
+
+@mark.test_unit
+class TestVraQuery(SetupTest):
+    def test_format_value(self):
+        self.assertEqual(format_value("it's"), "'it''s'")
+        self.assertEqual(format_value(2), "2")
+        self.assertEqual(format_value(True), "true")
+
+    def test_filter_raises_unknown_operator(self):
+        with self.assertRaises(VraSdkQueryException):
+            VraFilter('name', 'like', 'my_vm')
+
+    def test_filter_to_odata(self):
+        self.assertEqual(where('name', 'ne', 'my_vm').to_odata(), "(name+ne+'my_vm')")
+        self.assertEqual(where('name', 'startswith', 'my').to_odata(), "startswith(name,'my')")
+        self.assertEqual(where('name', 'substringof', 'vm').to_odata(), "substringof('vm',name)")
+        self.assertIsNone(where('name', 'match', 'my.*').to_odata())
+        self.assertIsNone(where('machine_cpu', 'gt', 2).to_odata())
+
+    def test_filter_matches(self):
+        resource = {'name': 'my_vm', 'machine_cpu': 4}
+
+        self.assertTrue(where('machine_cpu', 'gt', 2).matches(resource))
+        self.assertFalse(where('machine_cpu', 'lt', 2).matches(resource))
+        self.assertFalse(where('missing', 'gt', 2).matches(resource))
+        self.assertFalse(where('name', 'gt', 2).matches(resource))
+        self.assertTrue(where('name', 'match', 'my_.*').matches(resource))
+        self.assertTrue(where('name', 'substringof', 'y_v').matches(resource))
+
+    def test_split_and(self):
+        query = all_of(where('name', 'startswith', 'my'), where('status', 'eq', 'ON'), where('machine_cpu', 'gt', 2))
+
+        server_filter, client_query = query.split()
+
+        self.assertEqual(server_filter, "(startswith(name,'my')+and+(status+eq+'ON'))")
+        self.assertEqual([condition.key for condition in client_query.conditions], ['machine_cpu'])
+
+    def test_split_or(self):
+        server_filter, client_query = any_of(where('name', 'eq', 'vm1'), where('name', 'eq', 'vm2')).split()
+        self.assertEqual(server_filter, "((name+eq+'vm1')+or+(name+eq+'vm2'))")
+        self.assertIsNone(client_query)
+
+        query = any_of(where('name', 'eq', 'vm1'), where('machine_cpu', 'gt', 2))
+        self.assertEqual(query.split(), (None, query))
+
+    def test_matches_nested(self):
+        query = all_of(where('status', 'eq', 'ON'), any_of(where('name', 'eq', 'vm1'), where('machine_cpu', 'gt', 2)))
+
+        self.assertTrue(query.matches({'status': 'ON', 'name': 'vm2', 'machine_cpu': 4}))
+        self.assertFalse(query.matches({'status': 'ON', 'name': 'vm2', 'machine_cpu': 1}))
+        self.assertFalse(query.matches({'status': 'OFF', 'name': 'vm1'}))
+
+    def test_from_dict(self):
+        query = VraQuery.from_dict({'all': [['status', 'eq', 'ON'], {'any': [['name', 'eq', 'vm1'], ['name', 'eq', 'vm2']]}],
+                                    'order_by': 'name desc'})
+
+        self.assertEqual(query.operator, 'and')
+        self.assertEqual(query.order_by, 'name desc')
+        self.assertEqual(query.conditions[1].operator, 'or')
+        self.assertEqual(query.conditions[1].conditions[1].value, 'vm2')
+
+    def test_from_dict_raises(self):
+        with self.assertRaises(VraSdkQueryException):
+            VraQuery.from_dict({'all': [['status', 'eq']]})
+        with self.assertRaises(VraSdkQueryException):
+            VraQuery.from_dict({'none': []})
+
+    def test_get_query(self):
+        condition = where('name', 'eq', 'vm1')
+
+        self.assertIsNone(get_query({}, None))
+        self.assertEqual(get_query({}, condition).conditions, [condition])
+        self.assertEqual(get_query({'filters': {'running': {'all': [['status', 'eq', 'ON']]}}}, 'running').conditions[0].value, 'ON')
+        with self.assertRaises(VraSdkQueryException):
+            get_query({}, 'running')
@@ -3,11 +3,25 @@ import unittest
 from unittest.mock import patch, MagicMock, call
 from pytest import mark
 from vra_sdk.vra_request import VraRequest
-from vra_sdk.vra_exceptions import VraSdkConfigException, VraSdkRequestException, VraSdkMainRequestException
+from vra_sdk.vra_query import where, all_of
+from vra_sdk.vra_exceptions import VraSdkConfigException, VraSdkRequestException, VraSdkMainRequestException, \
+    VraSdkRequestTimeoutException, VraSdkEntitlementException
 import json
+import time
+import threading
 from requests.exceptions import RequestException
+from vra_sdk.vra_utils import run_concurrently
 from ..setup_test import SetupTest
 
+
+def raw_resource(**entries):
+    """Build a raw vRa resource with string/integer entries"""
+
+    return {"resourceData": {"entries": [
+        {"key": key, "value": {"type": "integer" if isinstance(value, int) else "string", "value": value}}
+        for key, value in entries.items()]}}
+
+
 @mark.test_unit
 @patch('vra_sdk.vra_request.VraConfig')
 class TestVraRequest(SetupTest):
@@ -75,6 +89,15 @@ class TestVraRequest(SetupTest):
         self.assertEqual('NoLocationFound', vra_req.status_url)
         mock_payload.execute_request.assert_called_once
 
+    def test_execute_async_entitlement_error(self, mock_config):
+        mock_payload = MagicMock()
+        mock_payload.execute_request.side_effect = VraSdkEntitlementException()
+        mock_callback = MagicMock()
+
+        with self.assertRaises(VraSdkEntitlementException):
+            VraRequest(mock_payload, on_entitlement_error=mock_callback).execute_async()
+        mock_callback.assert_called_once_with()
+
     @patch('vra_sdk.vra_request.VraRequest.execute_async')
     @patch('vra_sdk.vra_request.VraRequest.get_status')
     def test_execute_sync_raises(self, mock_status, mock_exec, mock_config):
@@ -92,6 +115,44 @@ class TestVraRequest(SetupTest):
         mock_exec.assert_called_once
         mock_status.assert_called_once
 
+    @patch('vra_sdk.vra_request.time.sleep')
+    @patch('vra_sdk.vra_request.VraRequest.execute_async')
+    @patch('vra_sdk.vra_request.VraRequest.get_status')
+    def test_execute_sync_polling(self, mock_status, mock_exec, mock_sleep, mock_config):
+        mock_config.return_value.polling = {'initial_delay': 1, 'factor': 2, 'jitter': 0, 'timeout': None}
+        mock_status.side_effect = ['IN_PROGRESS', 'IN_PROGRESS', 'IN_PROGRESS', 'SUCCESSFUL']
+
+        VraRequest("").execute_sync()
+
+        self.assertEqual(mock_status.call_count, 4)
+        self.assertEqual(mock_sleep.call_args_list, [call(1), call(2), call(4)])
+
+    @patch('vra_sdk.vra_request.time.sleep')
+    @patch('vra_sdk.vra_request.VraRequest.execute_async')
+    @patch('vra_sdk.vra_request.VraRequest.get_status')
+    def test_execute_sync_raises_failed(self, mock_status, mock_exec, mock_sleep, mock_config):
+        mock_config.return_value.polling = {}
+        mock_status.return_value = 'FAILED'
+
+        with self.assertRaises(VraSdkMainRequestException):
+            VraRequest("").execute_sync()
+        mock_status.assert_called_once()
+        mock_sleep.assert_not_called()
+
+    @patch('vra_sdk.vra_request.polling_delays')
+    @patch('vra_sdk.vra_request.time.sleep')
+    @patch('vra_sdk.vra_request.VraRequest.execute_async')
+    @patch('vra_sdk.vra_request.VraRequest.get_status')
+    def test_execute_sync_raises_timeout(self, mock_status, mock_exec, mock_sleep, mock_delays, mock_config):
+        mock_config.return_value.polling = {}
+        mock_status.return_value = 'IN_PROGRESS'
+        mock_delays.return_value = iter([3, 3])
+
+        with self.assertRaises(VraSdkRequestTimeoutException):
+            VraRequest("").execute_sync()
+        self.assertEqual(mock_status.call_count, 3)
+        self.assertEqual(mock_sleep.call_count, 2)
+
     @patch('vra_sdk.vra_request.VraRequest.format_filters')
     def test_get_object_raw_not_vm(self, mock_format, mock_config):
         mock_config.return_value.verify = False
@@ -108,6 +169,34 @@ class TestVraRequest(SetupTest):
         mock_config.return_value.session.get.assert_called_once_with(
             "https://fake_server/catalog-service/api/consumer/resources/?limit=1&page=1&$filter=(((resourceType/name+eq+'FAKE_RESOURCE_TYPE'))+and+(fake_key+eq+'fake_value'))", verify=False, timeout=12)
 
+    @patch('vra_sdk.vra_request.VraRequest.format_filters')
+    def test_get_object_raw_nested_concurrency(self, mock_format, mock_config):
+        mock_config.return_value.max_concurrent_requests = 3
+        mock_config.return_value.request_semaphore = threading.BoundedSemaphore(3)
+        mock_format.return_value = None
+        lock = threading.Lock()
+        in_flight = []
+        peak = []
+
+        def get(url, **kwargs):
+            with lock:
+                in_flight.append(url)
+                peak.append(len(in_flight))
+            time.sleep(0.01)
+            with lock:
+                in_flight.remove(url)
+            response = MagicMock()
+            response.json.return_value = {"content": [{"id": f"id{i}"} for i in range(6)]} if '?' in url else {"id": url}
+            return response
+        mock_config.return_value.session.get.side_effect = get
+
+        # pages fetched concurrently, each fetching its resources concurrently, as list_data(recursive=True, full=True)
+        pages = run_concurrently(lambda page: VraRequest('').get_object_raw('vm', None, None, 6, page, True), [1, 2, 3], 3)
+
+        self.assertEqual([len(page) for page in pages], [6, 6, 6])
+        self.assertEqual(mock_config.return_value.session.get.call_count, 21)
+        self.assertLessEqual(max(peak), 3)
+
     @patch('vra_sdk.vra_request.VraRequest.format_filters')
     def test_get_object_vm_not_full_key_id(self, mock_format, mock_config):
         mock_config.return_value.config_file = {"virtual_machine_type":"vm"}
@@ -151,6 +240,7 @@ class TestVraRequest(SetupTest):
         mock_config.return_value.timeout = 12
         mock_config.return_value.vcac_server = 'fake_server'
         mock_format.return_value = "$filter=(((resourceType/name+eq+'FAKE_RESOURCE_TYPE'))+and+(fake_key+eq+'fake_value'))"
+        mock_config.return_value.max_concurrent_requests = 1
         mock_config.return_value.session.get.return_value.json.side_effect = [
                 {"content": [{"id":"id1"}]},
                 {"id":"id1", "fake_res1":"fake_value1"}
@@ -173,6 +263,7 @@ class TestVraRequest(SetupTest):
         mock_config.return_value.timeout = 12
         mock_config.return_value.vcac_server = 'fake_server'
         mock_format.return_value = "$filter=(((resourceType/name+eq+'FAKE_RESOURCE_TYPE'))+and+(fake_key+eq+'fake_value'))"
+        mock_config.return_value.max_concurrent_requests = 1
         mock_config.return_value.session.get.return_value.json.side_effect = [
                 {"content": [{"id":"id1"},{"id":"id2"}]},
                 {"id":"id1", "fake_res1":"fake_value1"},
@@ -191,6 +282,129 @@ class TestVraRequest(SetupTest):
 
         self.assertEqual(result, [{'id': 'id1', 'fake_res1': 'fake_value1'}, {'id': 'id2', 'fake_res2': 'fake_value2'}])
 
+    @patch('vra_sdk.vra_request.VraRequest.format_filters')
+    def test_get_object_vm_full_concurrent(self, mock_format, mock_config):
+        mock_config.return_value.verify = False
+        mock_config.return_value.timeout = 12
+        mock_config.return_value.vcac_server = 'fake_server'
+        mock_config.return_value.max_concurrent_requests = 4
+        mock_format.return_value = None
+        ids = [f"id{i}" for i in range(10)]
+
+        def get_side_effect(url, **kwargs):
+            response = MagicMock()
+            if '?' in url:
+                response.json.return_value = {"content": [{"id": id} for id in ids]}
+            else:
+                response.json.return_value = {"id": url.rsplit('/', 1)[1]}
+            return response
+        mock_config.return_value.session.get.side_effect = get_side_effect
+
+        result = VraRequest('').get_object_raw('vm', 'key1', 'value1', 10, 1, True)
+
+        self.assertEqual(result, [{"id": id} for id in ids])
+        self.assertEqual(mock_config.return_value.session.get.call_count, 11)
+
+    def test_get_resource_raw_raises(self, mock_config):
+        mock_config.return_value.session.get.side_effect = RequestException()
+        with self.assertRaises(VraSdkRequestException):
+            VraRequest('').get_resource_raw('fake_id')
+
+    @patch('vra_sdk.vra_request.VraFactory')
+    @patch('vra_sdk.vra_request.format_results')
+    @patch('vra_sdk.vra_request.VraRequest.get_object_raw')
+    def test_get_object_filter(self, mock_raw, mock_format, mock_factory, mock_config):
+        mock_raw.return_value = [raw_resource(hostname='other'), raw_resource(hostname='my_vm1')]
+        mock_format.return_value = [{'hostname': 'my_vm1'}]
+
+        VraRequest('').get_object('vm', 'hostname', 'my_vm.*', 2, 1)
+
+        mock_format.assert_called_once_with([mock_raw.return_value[1]])
+        mock_factory.factory_many.assert_called_once_with('vm', [{'hostname': 'my_vm1'}], [mock_raw.return_value[1]])
+
+    @patch('vra_sdk.vra_request.VraFactory')
+    @patch('vra_sdk.vra_request.format_results')
+    @patch('vra_sdk.vra_request.VraRequest.get_object_raw')
+    def test_get_object_filter_done_by_vra(self, mock_raw, mock_format, mock_factory, mock_config):
+        mock_raw.return_value = [{'raw': 1}]
+        mock_format.return_value = [{'name': 'my_vm(1)'}]
+
+        VraRequest('').get_object('vm', 'name', 'my_vm(1)', 2, 1)
+
+        mock_factory.factory_many.assert_called_once_with('vm', [{'name': 'my_vm(1)'}], [{'raw': 1}])
+
+    def test_filter_plan(self, mock_config):
+        request = VraRequest('')
+
+        self.assertIsNone(request.filter_plan(None, None))
+        self.assertIsNone(request.filter_plan('name', 'my_vm'))
+        self.assertIsNone(request.filter_plan(None, None, all_of(where('name', 'eq', 'my_vm'))))
+
+        matches = request.filter_plan('hostname', 'my_vm.*', all_of(where('machine_cpu', 'gt', 2)))
+        self.assertTrue(matches({'hostname': 'my_vm1', 'machine_cpu': 4}))
+        self.assertFalse(matches({'hostname': 'my_vm1', 'machine_cpu': 2}))
+        self.assertFalse(matches({'hostname': 'other', 'machine_cpu': 4}))
+
+    @patch('vra_sdk.vra_request.VraFactory')
+    @patch('vra_sdk.vra_request.format_results')
+    @patch('vra_sdk.vra_request.VraRequest.get_object_raw')
+    def test_get_object_without_raw_data(self, mock_raw, mock_format, mock_factory, mock_config):
+        mock_raw.return_value = [{'raw': 1}]
+        mock_format.return_value = [{'name': 'my_vm'}]
+        mock_factory.factory_many.return_value = iter(['fake_object'])
+
+        result = VraRequest('').get_object('vm', None, None, 1, 1, raw_data=False)
+
+        mock_factory.factory_many.assert_called_once_with('vm', [{'name': 'my_vm'}], None)
+        self.assertEqual(result, ['fake_object'])
+
+    @patch('vra_sdk.vra_request.VraFactory')
+    @patch('vra_sdk.vra_request.format_results')
+    @patch('vra_sdk.vra_request.VraRequest.get_object_raw')
+    def test_get_object_fields(self, mock_raw, mock_format, mock_factory, mock_config):
+        mock_raw.return_value = [raw_resource(hostname='other'), raw_resource(hostname='my_vm')]
+
+        result = VraRequest('').get_object('vm', 'hostname', 'my_vm', 2, 1, fields=['name'])
+
+        mock_format.assert_not_called()
+        (object_type, resource, fields), kwargs = mock_factory.factory_from_resource.call_args
+        self.assertEqual((object_type, resource['hostname'], fields), ('vm', 'my_vm', ['name']))
+        self.assertEqual(kwargs, {'raw_data': mock_raw.return_value[1]})
+        self.assertEqual(result, [mock_factory.factory_from_resource.return_value])
+
+    @patch('vra_sdk.vra_request.VraRequest.format_filters')
+    def test_listing_url_order_by(self, mock_format, mock_config):
+        mock_config.return_value.vcac_server = 'fake_server'
+        mock_format.return_value = "$filter=fake_filter"
+
+        url = VraRequest('').listing_url('vm', None, None, 10, 1, query=all_of(order_by='name desc'))
+
+        self.assertEqual(url, "https://fake_server/catalog-service/api/consumer/resources/?limit=10&page=1&$filter=fake_filter&$orderby=name+desc")
+
+    @patch('vra_sdk.vra_request.get_module_class')
+    def test_format_filters_query(self, mock_module, mock_config):
+        mock_config.return_value.config_file = {"business_models": {"vm": {"path": "fake_path"}}}
+        mock_module.return_value = MagicMock(RESOURCE_TYPE=['fake_type']), None
+        query = all_of(where('name', 'startswith', 'my'), where('machine_cpu', 'gt', 2))
+
+        result = VraRequest('').format_filters('vm', None, None, query=query)
+
+        self.assertEqual(result, "$filter=(((resourceType/name+eq+'fake_type'))+and+(startswith(name,'my')))")
+
+    @patch('vra_sdk.vra_request.VraFactory')
+    @patch('vra_sdk.vra_request.format_results')
+    @patch('vra_sdk.vra_request.VraRequest.get_object_raw')
+    def test_get_object_query(self, mock_raw, mock_format, mock_factory, mock_config):
+        mock_config.return_value.config_file = {'filters': {'big_vms': {'all': [['name', 'startswith', 'my'], ['machine_cpu', 'gt', 2]]}}}
+        mock_raw.return_value = [raw_resource(MachineCPU=2), raw_resource(MachineCPU=4)]
+        mock_format.return_value = [{'machine_cpu': 4}]
+
+        VraRequest('').get_object('vm', None, None, 2, 1, query='big_vms')
+
+        self.assertEqual(mock_raw.call_args[0][7].conditions[0].value, 'my')
+        mock_format.assert_called_once_with([mock_raw.return_value[1]])
+        mock_factory.factory_many.assert_called_once_with('vm', [{'machine_cpu': 4}], [mock_raw.return_value[1]])
+
     def test_get_request_result_raw_raises_request(self, mock_config):
         mock_config.return_value.session.get.side_effect = RequestException()
         with self.assertRaises(VraSdkRequestException):
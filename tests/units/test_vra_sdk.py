@@ -2,11 +2,13 @@
 
 
 import unittest
+import json
 from ..setup_test import SetupTest
 from unittest.mock import patch, MagicMock, call, mock_open
 from vra_sdk.vra_sdk import VraSdk
 from vra_sdk.vra_request import VraRequest
-from vra_sdk.vra_exceptions import VraSdkMainException, VraSdkRequestException
+from vra_sdk.vra_exceptions import VraSdkMainException, VraSdkRequestException, VraSdkMainRequestException, \
+    VraSdkRequestTimeoutException
 from pytest import mark
 from requests.exceptions import RequestException
 
@@ -17,37 +19,53 @@ from requests.exceptions import RequestException
 class TestVraSdkBgId(SetupTest):
 
     def test_get_bg_id_raises_no_content(self, mock_config, mock_catalog):
+        mock_config.return_value.cache = None
         mock_config.return_value.session.get.return_value.text = '{"no_content":""}'
 
         with self.assertRaises(VraSdkMainException):
-            VraSdk(MagicMock(), "")
+            VraSdk(MagicMock(context=None), "").business_group_id
 
         mock_config.return_value.session.get.assert_called_once()
         mock_config.return_value.session.get.return_value.raise_for_status.assert_called_once()
 
     def test_get_bg_id_raises_no_business_group(self, mock_config, mock_catalog):
+        mock_config.return_value.cache = None
         mock_config.return_value.session.get.return_value.text = '{"content":[{"entitledOrganizations":[{"subtenantLabel":"wrong_bg"}]}]}'
 
         with self.assertRaises(VraSdkMainException):
-            VraSdk(MagicMock(), "")
+            VraSdk(MagicMock(context=None), "").business_group_id
 
         mock_config.return_value.session.get.assert_called_once()
         mock_config.return_value.session.get.return_value.raise_for_status.assert_called_once()
 
     def test_request_bg_id(self, mock_config, mock_catalog):
+        mock_config.return_value.cache = None
         mock_config.return_value.verify = False
         mock_config.return_value.timeout = 12
         authentication_object = MagicMock()
+        authentication_object.context = None
         mock_config.return_value.vcac_server = 'fake_server'
         mock_config.return_value.session.get.return_value.text = '{"content":[{"entitledOrganizations":[{"subtenantLabel":"bg_label", "subtenantRef":"fake_bg_id"}]}]}'
 
         vra_sdk = VraSdk(authentication_object, "bg_label")
 
+        mock_config.return_value.session.get.assert_not_called()
         self.assertEqual(vra_sdk.business_group_id, "fake_bg_id")
         mock_config.return_value.session.get.assert_called_once_with(
-            'https://fake_server/catalog-service/api/consumer/entitledCatalogItems?limit=998', verify=False, timeout=12)
+            'https://fake_server/catalog-service/api/consumer/entitledCatalogItems?limit=9999', verify=False, timeout=12)
         mock_config.return_value.session.get.return_value.raise_for_status.assert_called_once()
 
+    def test_switch_business_group(self, mock_config, mock_catalog):
+        mock_config.return_value.cache = None
+        mock_config.return_value.session.get.return_value.text = '{"content":[{"entitledOrganizations":[{"subtenantLabel":"bg1", "subtenantRef":"bg1_id"}, {"subtenantLabel":"bg2", "subtenantRef":"bg2_id"}]}]}'
+
+        vra_sdk = VraSdk(MagicMock(context=None), "bg1")
+        self.assertEqual(vra_sdk.business_group_id, "bg1_id")
+        vra_sdk.business_group = "bg2"
+        self.assertEqual(vra_sdk.business_group_id, "bg2_id")
+
+        mock_config.return_value.session.get.assert_called_once()
+
 
 @mark.test_unit
 @patch('vra_sdk.vra_sdk.VraSdk.get_bg_id')
@@ -57,34 +75,123 @@ class TestVraSdkGetCatalog(SetupTest):
         mock_config.return_value.session.get.side_effect = RequestException()
 
         with self.assertRaises(VraSdkRequestException):
-            VraSdk(MagicMock(), "").get_catalog()
+            VraSdk(MagicMock(context=None), "").get_catalog()
 
         mock_config.return_value.session.get.assert_called_once()
 
-    @patch('vra_sdk.vra_sdk.os')
     @patch('vra_sdk.vra_sdk.json')
-    @patch('vra_sdk.vra_sdk.vra_utils.resolve_path')
-    def test_get_catalog_raises_json(self, mock_resolve, mock_json, mock_os, mock_config, mock_get_bg_id):
+    def test_get_catalog_raises_json(self, mock_json, mock_config, mock_get_bg_id):
         authentication_object = MagicMock()
+        authentication_object.context = None
         mock_json.loads.side_effect = Exception()
 
         with self.assertRaises(VraSdkMainException):
             VraSdk(authentication_object, "").get_catalog()
         mock_json.loads.assert_called_once()
 
-    @patch('vra_sdk.vra_sdk.os')
-    @patch('vra_sdk.vra_sdk.vra_utils.resolve_path')
-    def test_get_catalog(self, mock_resolve, mock_os, mock_config, mock_get_bg_id):
+    def test_get_catalog(self, mock_config, mock_get_bg_id):
+        mock_config.return_value.cache = None
         mock_config.return_value.verify = False
         mock_config.return_value.timeout = 12
         mock_config.return_value.vcac_server = 'fake_server'
-        mock_config.return_value.session.get.return_value.text = '{"content":[{"catalogItem":{"name":"fake_name","id":"fake_id"}}]}'
+        mock_config.return_value.session.get.return_value.text = json.dumps({"content": [
+            {"catalogItem": {"name": "fake_name", "id": "fake_id"}, "entitledOrganizations": [{"subtenantLabel": "bg1", "subtenantRef": "bg1_id"}]},
+            {"catalogItem": {"name": "other_name", "id": "other_id"}, "entitledOrganizations": [{"subtenantLabel": "bg2", "subtenantRef": "bg2_id"}]}]})
 
-        VraSdk(MagicMock(), "").get_catalog()
+        vra_sdk = VraSdk(MagicMock(context=None), "bg1")
 
-        mock_config.return_value.session.get.assert_any_call(
+        mock_config.return_value.session.get.assert_not_called()
+        self.assertEqual(vra_sdk.catalog, {"fake_name": "fake_id"})
+        self.assertEqual(vra_sdk.catalog, {"fake_name": "fake_id"})
+        mock_config.return_value.session.get.assert_called_once_with(
             'https://fake_server/catalog-service/api/consumer/entitledCatalogItems?limit=9999', verify=False, timeout=12)
 
+        vra_sdk.business_group = "bg2"
+        self.assertEqual(vra_sdk.catalog, {"other_name": "other_id"})
+        mock_config.return_value.session.get.assert_called_once()
+
+
+@mark.test_unit
+@patch('vra_sdk.vra_sdk.VraConfig')
+class TestVraSdkEntitledItems(SetupTest):
+    def test_catalog_and_bg_id_share_request(self, mock_config):
+        mock_config.return_value.cache = None
+        mock_config.return_value.session.get.return_value.text = '{"content":[{"catalogItem":{"name":"fake_name","id":"fake_id"}, "entitledOrganizations":[{"subtenantLabel":"bg_label", "subtenantRef":"fake_bg_id"}]}]}'
+
+        vra_sdk = VraSdk(MagicMock(context=None), "bg_label")
+
+        self.assertEqual(vra_sdk.catalog, {"fake_name": "fake_id"})
+        self.assertEqual(vra_sdk.business_group_id, "fake_bg_id")
+        mock_config.return_value.session.get.assert_called_once()
+
+    def test_force_refresh(self, mock_config):
+        mock_config.return_value.session.get.return_value.text = '{"content":[]}'
+
+        vra_sdk = VraSdk(MagicMock(context=None), "bg_label")
+        vra_sdk.get_entitlement_index()
+        vra_sdk.get_entitlement_index()
+        vra_sdk.get_entitlement_index(force_refresh=True)
+
+        self.assertEqual(mock_config.return_value.session.get.call_count, 2)
+
+
+@mark.test_unit
+@patch('vra_sdk.vra_sdk.VraSdk.get_bg_id')
+@patch('vra_sdk.vra_sdk.VraSdk.get_catalog')
+@patch('vra_sdk.vra_sdk.VraConfig')
+class TestVraSdkCache(SetupTest):
+    def get_vra_sdk(self, mock_config):
+        mock_config.return_value.vcac_server = 'fake_server'
+        authentication_object = MagicMock()
+        authentication_object.context = None
+        authentication_object.tenant = 'fake_tenant'
+        authentication_object.login = 'fake_login'
+        return VraSdk(authentication_object, 'fake_bg')
+
+    def test_cache_hit(self, mock_config, mock_get_catalog, mock_get_bg_id):
+        mock_config.return_value.cache.get.return_value = {'catalog': {'fake_name': 'fake_id'}, 'business_group_id': 'fake_bg_id'}
+
+        vra_sdk = self.get_vra_sdk(mock_config)
+
+        self.assertEqual(vra_sdk.catalog, {'fake_name': 'fake_id'})
+        self.assertEqual(vra_sdk.business_group_id, 'fake_bg_id')
+        mock_config.return_value.cache.get.assert_called_with(('fake_server', 'fake_tenant', 'fake_login', 'fake_bg'))
+        mock_get_catalog.assert_not_called()
+        mock_get_bg_id.assert_not_called()
+        mock_config.return_value.cache.set.assert_not_called()
+
+    def test_cache_miss(self, mock_config, mock_get_catalog, mock_get_bg_id):
+        mock_config.return_value.cache.get.return_value = None
+        mock_get_catalog.return_value = {'fake_name': 'fake_id'}
+
+        vra_sdk = self.get_vra_sdk(mock_config)
+
+        self.assertEqual(vra_sdk.catalog, {'fake_name': 'fake_id'})
+        mock_get_catalog.assert_called_once()
+        mock_config.return_value.cache.set.assert_called_once_with(
+            ('fake_server', 'fake_tenant', 'fake_login', 'fake_bg'), {'catalog': {'fake_name': 'fake_id'}})
+
+    def test_invalidate_cache_on_entitlement_error(self, mock_config, mock_get_catalog, mock_get_bg_id):
+        mock_config.return_value.cache.get.side_effect = [{'catalog': {'old_name': 'old_id'}}, None]
+        mock_get_catalog.return_value = {'fake_name': 'fake_id'}
+        vra_sdk = self.get_vra_sdk(mock_config)
+        vra_sdk.business_group_id = 'fake_bg_id'
+
+        with patch('vra_sdk.vra_sdk.VraSdk.format_payload') as mock_payload:
+            vra_sdk.request_catalog_item('fake_name', payload_version=6)
+
+        mock_config.return_value.cache.invalidate.assert_called_once_with(('fake_server', 'fake_tenant', 'fake_login', 'fake_bg'))
+        mock_get_catalog.assert_called_once()
+        mock_payload.assert_called_once()
+
+    def test_invalidate_cache_without_cache(self, mock_config, mock_get_catalog, mock_get_bg_id):
+        mock_config.return_value.cache = None
+        vra_sdk = self.get_vra_sdk(mock_config)
+        vra_sdk.catalog = {'fake_name': 'fake_id'}
+
+        self.assertFalse(vra_sdk.invalidate_cache())
+        self.assertEqual(vra_sdk.catalog, {'fake_name': 'fake_id'})
+
 
 @mark.test_unit
 @patch('vra_sdk.vra_sdk.VraSdk.get_bg_id')
@@ -92,25 +199,29 @@ class TestVraSdkGetCatalog(SetupTest):
 @patch('vra_sdk.vra_sdk.VraConfig')
 class TestVraSdk(SetupTest):
     def test_init(self, mock_config, mock_get_catalog, mock_get_bg_id):
+        mock_config.return_value.cache = None
         mock_get_bg_id.return_value = 'fake_bg_id'
         authentication_object = MagicMock()
+        authentication_object.context = None
         authentication_object.domain = "fake_domain"
         mock_get_catalog.return_value = "fake_catalog"
 
         vra_sdk = VraSdk(authentication_object, "fake_bg")
 
+        mock_get_catalog.assert_not_called()
+        mock_get_bg_id.assert_not_called()
         self.assertEqual(vra_sdk.catalog, "fake_catalog")
         self.assertEqual(vra_sdk.business_group, "fake_bg")
         self.assertEqual(vra_sdk.business_group_id, "fake_bg_id")
         mock_get_catalog.assert_called_once()
-        mock_get_bg_id.assert_called_once()
+        mock_get_bg_id.assert_called_once_with("fake_bg")
 
     @patch('vra_sdk.vra_sdk.VraRequest')
     @patch('vra_sdk.vra_sdk.VraSdk.format_payload')
     def test_request_catalog_item(self, mock_payload, mock_request, mock_config, mock_get_catalog, mock_get_bg_id):
         mock_payload.return_value = 'fake_payload'
         mock_config.return_value.config_file = {'payload_default_version': 7}
-        vra_sdk = VraSdk(MagicMock(), "")
+        vra_sdk = VraSdk(MagicMock(context=None), "")
 
         undecorrated = vra_sdk.request_catalog_item.__wrapped__
         fake_kwargs = {"fake_kwargs": ""}
@@ -121,14 +232,14 @@ class TestVraSdk(SetupTest):
         mock_payload.assert_called_once_with(
             'catalog_item', 'fake_catalog_name', None, **fake_kwargs)
         mock_request.assert_called_once_with(
-            'fake_payload')
+            'fake_payload', context=None, on_entitlement_error=vra_sdk.invalidate_cache)
 
     @patch('vra_sdk.vra_sdk.VraRequest')
     @patch('vra_sdk.vra_sdk.VraSdk.format_payload')
     def test_request_resource_action(self, mock_payload, mock_request, mock_config, mock_get_catalog, mock_get_bg_id):
         mock_config.return_value.config_file = {'payload_default_version': 7}
         mock_payload.return_value = 'fake_payload'
-        vra_sdk = VraSdk(MagicMock(), "")
+        vra_sdk = VraSdk(MagicMock(context=None), "")
 
         fake_kwargs = {"fake_key": "fake_value"}
         undecorrated = vra_sdk.request_resource_action.__wrapped__.__wrapped__
@@ -138,21 +249,145 @@ class TestVraSdk(SetupTest):
         fake_kwargs['payload_version'] = 7
         mock_payload.assert_called_once_with(
             'resource_action', 'fake_action_name', 'fake_resource_id', None, **fake_kwargs)
-        mock_request.assert_called_once_with('fake_payload')
+        mock_request.assert_called_once_with('fake_payload', context=None, on_entitlement_error=vra_sdk.invalidate_cache)
 
     @patch('vra_sdk.vra_sdk.VraRequest')
     def test_get_data(self, mock_request, mock_config, mock_catalog, mock_get_bg_id):
         mock_request.return_value.get_object.return_value = ['fake_data']
-        vra_sdk = VraSdk(MagicMock(), '')
+        vra_sdk = VraSdk(MagicMock(context=None), '')
 
         vra_sdk.get_data('vm', 'key', 'value')
 
         mock_request.return_value.get_object.assert_called_once_with(
-            'vm', 'key', 'value', 1 , 1, True)
+            'vm', 'key', 'value', 1 , 1, True, fields=None, query=None)
 
     @patch('vra_sdk.vra_sdk.VraRequest')
     def test_get_data_raises(self, mock_request, mock_config, mock_catalog, mock_get_bg_id):
         mock_request.return_value.get_object.return_value = None
-        vra_sdk = VraSdk(MagicMock(), '')
+        vra_sdk = VraSdk(MagicMock(context=None), '')
         with self.assertRaises(VraSdkMainException):
             vra_sdk.get_data('', '', '')
+
+    @patch('vra_sdk.vra_sdk.VraRequest')
+    def test_list_data_raises(self, mock_request, mock_config, mock_catalog, mock_get_bg_id):
+        mock_request.return_value.get_object.return_value = None
+        vra_sdk = VraSdk(MagicMock(context=None), '')
+        with self.assertRaises(VraSdkMainException):
+            vra_sdk.list_data('vm', None, None, 2)
+
+    @patch('vra_sdk.vra_sdk.VraRequest')
+    def test_list_data_recursive(self, mock_request, mock_config, mock_catalog, mock_get_bg_id):
+        mock_config.return_value.max_concurrent_requests = 3
+        pages = {1: ['a', 'b'], 2: ['c', 'd'], 3: ['e', 'f'], 4: ['g']}
+        mock_request.return_value.get_object.side_effect = lambda *args, **kwargs: list(pages[args[4]])
+        mock_request.return_value.metadata = {'totalPages': 4}
+        vra_sdk = VraSdk(MagicMock(context=None), '')
+
+        result = vra_sdk.list_data('vm', None, None, 2, 1, False, True)
+
+        self.assertEqual(result, ['a', 'b', 'c', 'd', 'e', 'f', 'g'])
+        self.assertEqual(mock_request.return_value.get_object.call_count, 4)
+
+    @patch('vra_sdk.vra_sdk.VraRequest')
+    def test_list_data_recursive_no_metadata(self, mock_request, mock_config, mock_catalog, mock_get_bg_id):
+        pages = {1: ['a', 'b'], 2: ['c', 'd'], 3: []}
+        mock_request.return_value.get_object.side_effect = lambda *args, **kwargs: list(pages[args[4]])
+        mock_request.return_value.metadata = {}
+        vra_sdk = VraSdk(MagicMock(context=None), '')
+
+        result = vra_sdk.list_data('vm', None, None, 2, 1, False, True)
+
+        self.assertEqual(result, ['a', 'b', 'c', 'd'])
+        self.assertEqual(mock_request.return_value.get_object.call_count, 3)
+
+    @patch('vra_sdk.vra_sdk.VraRequest')
+    def test_iter_data(self, mock_request, mock_config, mock_catalog, mock_get_bg_id):
+        pages = {1: ['a', 'b'], 2: ['c', 'd'], 3: ['e']}
+        mock_request.return_value.get_object.side_effect = lambda *args, **kwargs: list(pages[args[4]])
+        mock_request.return_value.metadata = {'totalPages': 3}
+        vra_sdk = VraSdk(MagicMock(context=None), '')
+
+        result = vra_sdk.iter_data('vm', None, None, 2, raw_data=False)
+
+        mock_request.return_value.get_object.assert_not_called()
+        self.assertEqual(next(result), 'a')
+        self.assertEqual(mock_request.return_value.get_object.call_count, 1)
+        self.assertEqual(list(result), ['b', 'c', 'd', 'e'])
+        self.assertEqual(mock_request.return_value.get_object.call_count, 3)
+        mock_request.return_value.get_object.assert_called_with('vm', None, None, 2, 3, False, raw_data=False, fields=None, query=None)
+
+
+@mark.test_unit
+@patch('vra_sdk.vra_sdk.time.sleep')
+@patch('vra_sdk.vra_sdk.VraConfig')
+class TestVraSdkExecuteMany(SetupTest):
+    def get_request(self, statuses, submit_error=None):
+        request = MagicMock()
+        request.execute_async.side_effect = submit_error
+        request.get_status.side_effect = statuses
+        return request
+
+    def test_execute_many(self, mock_config, mock_sleep):
+        mock_config.return_value.max_concurrent_requests = 4
+        mock_config.return_value.polling = {'initial_delay': 1, 'factor': 2, 'jitter': 0, 'timeout': None}
+        successful = self.get_request(['IN_PROGRESS', 'IN_PROGRESS', 'SUCCESSFUL'])
+        failed = self.get_request(['IN_PROGRESS', 'PROVIDER_FAILED'])
+        not_submitted = self.get_request([], RequestException())
+        status_error = self.get_request([RequestException(), 'SUCCESSFUL'])
+
+        result = VraSdk(MagicMock(context=None), "").execute_many([successful, failed, not_submitted, status_error])
+
+        self.assertEqual(list(result), [successful, failed, not_submitted, status_error])
+        self.assertIsNone(result[successful])
+        self.assertIsInstance(result[failed], VraSdkMainRequestException)
+        self.assertIsInstance(result[not_submitted], RequestException)
+        self.assertIsNone(result[status_error])
+        self.assertEqual(status_error.get_status.call_count, 2)
+        self.assertEqual(successful.get_status.call_count, 3)
+        self.assertEqual(failed.get_status.call_count, 2)
+        not_submitted.get_status.assert_not_called()
+        self.assertEqual(mock_sleep.call_args_list, [call(1), call(2)])
+
+    @patch('vra_sdk.vra_sdk.polling_delays')
+    def test_execute_many_timeout(self, mock_delays, mock_config, mock_sleep):
+        mock_config.return_value.max_concurrent_requests = 1
+        mock_config.return_value.polling = {}
+        mock_delays.return_value = iter([3])
+        running = self.get_request(['IN_PROGRESS', 'IN_PROGRESS'])
+        successful = self.get_request(['SUCCESSFUL'])
+
+        result = VraSdk(MagicMock(context=None), "").execute_many([running, successful])
+
+        self.assertIsInstance(result[running], VraSdkRequestTimeoutException)
+        self.assertIsNone(result[successful])
+        mock_sleep.assert_called_once_with(3)
+
+    @patch('vra_sdk.vra_sdk.polling_delays')
+    def test_execute_many_timeout_status_error(self, mock_delays, mock_config, mock_sleep):
+        mock_config.return_value.max_concurrent_requests = 1
+        mock_config.return_value.polling = {}
+        mock_delays.return_value = iter([3, 3])
+        error = RequestException()
+        status_error = self.get_request(['IN_PROGRESS', RequestException(), error])
+        recovered = self.get_request([RequestException(), 'IN_PROGRESS', 'IN_PROGRESS'])
+
+        result = VraSdk(MagicMock(context=None), "").execute_many([status_error, recovered])
+
+        self.assertIs(result[status_error], error)
+        self.assertIsInstance(result[recovered], VraSdkRequestTimeoutException)
+        self.assertEqual(status_error.get_status.call_count, 3)
+
+
+@mark.test_unit
+@patch('vra_sdk.vra_sdk.VraConfig')
+class TestVraSdkWarmTemplates(SetupTest):
+    @patch('vra_sdk.vra_sdk.vra_payload_7.get_catalog_item_template')
+    def test_warm_templates(self, mock_template, mock_config):
+        mock_config.return_value.max_concurrent_requests = 2
+        mock_config.return_value.config_file = {'catalog_item': {'item3': {'payload': 'fake_path'}}}
+        vra_sdk = VraSdk(MagicMock(context=None), "")
+        vra_sdk.catalog = {'item1': 'id1', 'item2': 'id2', 'item3': 'id3'}
+
+        vra_sdk.warm_templates(['item1', 'item2', 'item3'])
+
+        self.assertEqual(sorted(mock_template.call_args_list), [call('id1', None), call('id2', None)])
@@ -1,4 +1,7 @@
 # -*- coding: utf-8 -*-
+import os
+import json
+import tempfile
 import unittest
 from unittest.mock import patch
 import vra_sdk.vra_utils
@@ -27,4 +30,135 @@ class TestVraUtils(SetupTest):
         kwargs = {'fake.key':'fake_value'}
         result = vra_sdk.vra_utils.clean_kwargs_key(**kwargs)
         self.assertIn('fake_key', result)
-        self.assertEqual(result.get('fake_key'), 'fake_value')
\ No newline at end of file
+        self.assertEqual(result.get('fake_key'), 'fake_value')
+
+    def test_to_attribute_name(self):
+        self.assertEqual(vra_sdk.vra_utils.to_attribute_name('fake.key'), 'fake_key')
+        self.assertEqual(vra_sdk.vra_utils.to_attribute_name('class'), 'class_')
+        self.assertEqual(vra_sdk.vra_utils.to_attribute_name('fake_class'), 'fake_class')
+
+    def test_run_concurrently_keep_order(self):
+        result = vra_sdk.vra_utils.run_concurrently(lambda x: x * 2, range(20), 5)
+        self.assertEqual(result, [x * 2 for x in range(20)])
+
+    @patch('vra_sdk.vra_utils.ThreadPoolExecutor')
+    def test_run_concurrently_sequential(self, mock_executor):
+        result = vra_sdk.vra_utils.run_concurrently(lambda x: x * 2, [1, 2], 1)
+        self.assertEqual(result, [2, 4])
+        mock_executor.assert_not_called()
+
+    def test_polling_delays(self):
+        delays = vra_sdk.vra_utils.polling_delays(initial_delay=1, factor=2, max_delay=5, jitter=0, timeout=None)
+        self.assertEqual([next(delays) for _ in range(5)], [1, 2, 4, 5, 5])
+
+    def test_polling_delays_jitter(self):
+        delays = vra_sdk.vra_utils.polling_delays(initial_delay=10, factor=1, jitter=0.1, timeout=None)
+        for _ in range(20):
+            self.assertTrue(9 <= next(delays) <= 11)
+
+    @patch('vra_sdk.vra_utils.time.monotonic')
+    def test_polling_delays_timeout(self, mock_monotonic):
+        mock_monotonic.side_effect = [0, 0, 4, 9, 10]
+        delays = vra_sdk.vra_utils.polling_delays(initial_delay=2, factor=2, jitter=0, timeout=10)
+        self.assertEqual(list(delays), [2, 4, 1])
+
+    def test_ttl_lru_cache_eviction(self):
+        cache = vra_sdk.vra_utils.TtlLruCache(maxsize=2, ttl=None)
+        cache.set('a', 1)
+        cache.set('b', 2)
+        cache.get('a')
+        cache.set('c', 3)
+
+        self.assertEqual(cache.get('a'), 1)
+        self.assertIsNone(cache.get('b'))
+        self.assertEqual(cache.get('c'), 3)
+
+    @patch('vra_sdk.vra_utils.time.monotonic')
+    def test_ttl_lru_cache_expiration(self, mock_monotonic):
+        cache = vra_sdk.vra_utils.TtlLruCache(maxsize=2, ttl=10)
+        mock_monotonic.return_value = 0
+        cache.set('a', 1)
+
+        mock_monotonic.return_value = 10
+        self.assertEqual(cache.get('a'), 1)
+        mock_monotonic.return_value = 11
+        self.assertIsNone(cache.get('a'))
+
+    def test_ttl_lru_cache_disabled(self):
+        cache = vra_sdk.vra_utils.TtlLruCache(maxsize=0)
+        cache.set('a', 1)
+        self.assertIsNone(cache.get('a'))
+
+    def test_load_payload_file_cached(self):
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, 'payload.json')
+            with open(path, 'w') as f:
+                json.dump({'data': {'version': 1}}, f)
+
+            first = vra_sdk.vra_utils.load_payload_file(path)
+            with patch('vra_sdk.vra_utils.open') as mock_open_file:
+                second = vra_sdk.vra_utils.load_payload_file(path)
+            mock_open_file.assert_not_called()
+            self.assertIs(first, second)
+
+            with open(path, 'w') as f:
+                json.dump({'data': {'version': 2}}, f)
+            os.utime(path, ns=(0, os.stat(path).st_mtime_ns + 1000))
+
+            self.assertEqual(vra_sdk.vra_utils.load_payload_file(path), {'data': {'version': 2}})
+
+    @patch('vra_sdk.vra_utils.load_payload_file')
+    def test_preload_payload_files(self, mock_load):
+        mock_load.side_effect = [vra_sdk.vra_utils.VraSdkConfigException(), {}]
+        config_file = {'catalog_item': {'item1': {'payload': 'missing.json'}, 'item2': {}},
+                       'resource_action': {'action1': {'payload': 'action.json'}}}
+
+        vra_sdk.vra_utils.preload_payload_files(config_file)
+
+        self.assertEqual(mock_load.call_count, 2)
+        mock_load.assert_called_with('action.json')
+
+    def test_copy_on_write_dict(self):
+        base = {'data': {'nested': {'value': 1}, 'untouched': {'value': 2}}, 'entries': [{'key': 'a'}]}
+        payload = vra_sdk.vra_utils.CopyOnWriteDict(base)
+
+        payload['data']['nested']['value'] = 10
+        payload['data'].setdefault('new', {})['value'] = 3
+        payload['entries'].append({'key': 'b'})
+        for entry in payload['entries']:
+            entry['key'] = entry['key'].upper()
+        for key, value in payload['data'].items():
+            value['visited'] = True
+
+        self.assertEqual(base, {'data': {'nested': {'value': 1}, 'untouched': {'value': 2}}, 'entries': [{'key': 'a'}]})
+        self.assertEqual(payload, {'data': {'nested': {'value': 10, 'visited': True}, 'untouched': {'value': 2, 'visited': True},
+                                            'new': {'value': 3, 'visited': True}},
+                                   'entries': [{'key': 'A'}, {'key': 'B'}]})
+
+    def test_materialize(self):
+        base = {'data': {'nested': {'value': 1}}, 'untouched': {'value': 2}, 'entries': [1, 2]}
+        payload = vra_sdk.vra_utils.CopyOnWriteDict(base)
+        payload['data']['nested']['value'] = 10
+        payload['entries'][0] = 0
+
+        result = vra_sdk.vra_utils.materialize(payload)
+
+        self.assertIs(type(result), dict)
+        self.assertIs(type(result['data']), dict)
+        self.assertIs(type(result['entries']), list)
+        self.assertIs(result['untouched'], base['untouched'])
+        self.assertEqual(json.loads(json.dumps(result)), {'data': {'nested': {'value': 10}}, 'untouched': {'value': 2}, 'entries': [0, 2]})
+
+    def test_to_snake_case_dotted(self):
+        self.assertEqual(vra_sdk.vra_utils.to_snake_case("VirtualMachine.Admin.UUID"), "virtual_machine._admin.uuid")
+        self.assertEqual(vra_sdk.vra_utils.to_snake_case("MachineCPU"), "machine_cpu")
+
+    @patch('vra_sdk.vra_utils.to_snake_case')
+    def test_prettify_keys(self, mock_to_snake):
+        mock_to_snake.side_effect = lambda key: key.lower()
+        data = [{"KeyA": 1, "KeyB": 2}, {"KeyA": 3, "KeyC": 4}]
+
+        result = vra_sdk.vra_utils.prettify_keys(data)
+
+        self.assertEqual(result, [{"keya": 1, "keyb": 2}, {"keya": 3, "keyc": 4}])
+        self.assertEqual(mock_to_snake.call_count, 3)
@@ -1,12 +1,108 @@
 # -*- coding: utf-8 -*-
 import json
 import inspect
+from functools import lru_cache
 
+try:
+    import orjson
+except ImportError:
+    orjson = None
 
-class VraBaseObject:
+
+@lru_cache(maxsize=None)
+def get_fields(cls):
+    """Get the attributes of a business model class, which are the parameters of its constructor
+
+    Args:
+        cls (class): business model class
+
+    Returns:
+        tuple: attribute names
+    """
+
+    return tuple(inspect.signature(cls).parameters)
+
+
+def dumps(data, fast=False):
+    """Return json representation of data
+
+    Args:
+        data (dict or list): data to serialize
+        fast (bool, optional): Defaults to False. If true, use orjson if it's installed. Its output is compact,
+            and it serializes datetimes and NaN (as null) where the json module doesn't
+
+    Returns:
+        string: json representation of data
+    """
+
+    if fast and orjson is not None:
+        try:
+            return orjson.dumps(data).decode('utf-8')
+        except TypeError:
+            # orjson is stricter than json (eg: non string dict keys), let json handle these cases
+            pass
+    return json.dumps(data)
+
+
+def to_json_many(objects, raw_data=False):
+    """Return json array representation of several objects, serialized with orjson if it's installed
+
+    Args:
+        objects (iterable): VraBaseObject objects
+        raw_data (bool, optional): Defaults to False. If true, also return the raw_data attribute of the objects
+
+    Returns:
+        string: json array representation of the objects
+    """
+
+    return dumps([elt.to_dict(raw_data) for elt in objects], fast=True)
+
+
+def iter_ndjson(objects, raw_data=False):
+    """Generate the newline delimited json representation of several objects, one line per object, serialized with orjson
+    if it's installed
+
+    Objects are serialized as they are consumed, eg: f.writelines(iter_ndjson(my_vra_sdk.iter_data('vm', None, None)))
+
+    Args:
+        objects (iterable): VraBaseObject objects
+        raw_data (bool, optional): Defaults to False. If true, also return the raw_data attribute of the objects
+
+    Yields:
+        string: json representation of an object, followed by a new line
+    """
+
+    for elt in objects:
+        yield dumps(elt.to_dict(raw_data), fast=True) + '\n'
+
+
+class VraModelMeta(type):
+    """Metaclass of the business models
+
+    A business model declared with the slotted keyword (eg: class Vm(VraBaseObject, slotted=True)) stores its attributes in
+    __slots__ generated from the parameters of its constructor, instead of a __dict__ per object.
+    The slots are created with the class, so methods using super() without arguments work as usual.
+    """
+
+    def __new__(mcs, name, bases, namespace, slotted=False, **kwargs):
+        if slotted:
+            if '__init__' not in namespace:
+                raise TypeError(f'slotted business model {name} must define its constructor')
+            params = list(inspect.signature(namespace['__init__']).parameters.values())[1:]
+            namespace['__slots__'] = tuple(param.name for param in params
+                                           if param.kind not in (param.VAR_POSITIONAL, param.VAR_KEYWORD))
+        return super().__new__(mcs, name, bases, namespace, **kwargs)
+
+    def __init__(cls, name, bases, namespace, slotted=False, **kwargs):
+        super().__init__(name, bases, namespace, **kwargs)
+
+
+class VraBaseObject(metaclass=VraModelMeta):
     """Base class for business models class. Use to implement basic method.
     """
 
+    __slots__ = ()
+
     def to_dict(self, raw_data=False):
         """Return serialized object
             raw_data (bool, optional): Defaults to False. If true, also return the raw_data attribute of the object
@@ -15,16 +111,7 @@ class VraBaseObject:
             dict: dict of the object attribute
         """
 
-        result = {}
-        for k in inspect.signature(self.__class__).parameters:
-            result[k] = getattr(self, k)
-
-        if not raw_data:
-            try:
-                result.pop('raw_data')
-            except KeyError:
-                pass
-        return result
+        return {k: getattr(self, k) for k in get_fields(self.__class__) if raw_data or k != 'raw_data'}
 
     def to_json(self, raw_data=False):
         """Return json representation of the object
@@ -34,4 +121,4 @@ class VraBaseObject:
             string: json representation of the object
         """
 
-        return json.dumps(self.to_dict(raw_data))
+        return dumps(self.to_dict(raw_data))
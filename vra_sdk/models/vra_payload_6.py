@@ -1,18 +1,26 @@
 # -*- coding: utf-8 -*-
 from vra_sdk.models.vra_object import VraBaseObject
 from vra_sdk.vra_config import VraConfig
-from vra_sdk.vra_exceptions import VraSdkRequestException, VraSdkPayloadException
-from vra_sdk.vra_utils import load_payload_file
+from vra_sdk.vra_exceptions import VraSdkRequestException, VraSdkPayloadException, VraSdkEntitlementException
+from vra_sdk.vra_utils import load_payload_file, CopyOnWriteDict, materialize
 import requests
 import json
-from copy import deepcopy
 
 class BasePayload():
     """Base class for CatalogItem and ResourceAction
     """
 
-    def __init__(self):
-        self.config = VraConfig()
+    def __init__(self, context=None):
+        self.config = context or VraConfig()
+
+    def request_url(self):
+        """Url to use to execute the request against the vRa infrastructure
+
+        Returns:
+            string: request url
+        """
+
+        return f"https://{self.config.vcac_server}/catalog-service/api/consumer/requests"
 
     def customize_payload(self, payload, **kwargs):
         """base customization payload
@@ -55,12 +63,13 @@ class BasePayload():
 
 class CatalogItem(BasePayload):
 
-    def __init__(self, customization_func=None, **kwargs):
+    def __init__(self, customization_func=None, context=None, **kwargs):
         """Init the CatalogItem for vRa 6.x payload object
             customization_func ([type], optional): Defaults to None. If not None, this function will add a second customization after the initial one.
+            context (VraContext, optional): Defaults to None. client context to use. If None, the VraConfig singleton is used
         """
 
-        super().__init__()
+        super().__init__(context)
         self.customized = None
         if not kwargs.get('payload_path'):
             self.base = {
@@ -83,7 +92,7 @@ class CatalogItem(BasePayload):
         else:
             self.base = load_payload_file(kwargs['payload_path'])
 
-        self.customized = self.customize_payload(deepcopy(self.base), **kwargs)
+        self.customized = self.customize_payload(CopyOnWriteDict(self.base), **kwargs)
         if customization_func:
             self.customized = customization_func(self.customized, **kwargs)
 
@@ -96,12 +105,18 @@ class CatalogItem(BasePayload):
 
         try:
             req = self.config.session.post(
-                f"https://{self.config.vcac_server}/catalog-service/api/consumer/requests",
-                data=json.dumps(self.customized),
+                self.request_url(),
+                data=json.dumps(materialize(self.customized)),
                 verify=self.config.verify,
                 timeout=self.config.timeout)
             req.raise_for_status()
             return req
+        except requests.exceptions.HTTPError as e:
+            if e.response is not None and e.response.status_code == 403:
+                raise VraSdkEntitlementException(
+                    f'vRa refused the request for entitlement reason : {e}')
+            raise VraSdkRequestException(
+                f'vRa request exception : {e}')
         except requests.exceptions.RequestException as e:
             raise VraSdkRequestException(
                 f'vRa request exception : {e}')
@@ -112,12 +127,14 @@ class CatalogItem(BasePayload):
 
 class ResourceAction(BasePayload):
 
-    def __init__(self, customization_func=None, **kwargs):
+    def __init__(self, customization_func=None, resource_type=None, context=None, **kwargs):
         """Init ResourceAction object for vRa 6.x payload object
             customization_func ([type], optional): Defaults to None. If not None, this function will add a second customization after the initial one.
+            resource_type (string, optional): Defaults to None. Type of the resource. Unused for vRa 6.x, kept for compatibility with vRa 7.x payload
+            context (VraContext, optional): Defaults to None. client context to use. If None, the VraConfig singleton is used
         """
 
-        super().__init__()
+        super().__init__(context)
         self.customized = None
         if not kwargs.get('payload_path'):
             self.base = {
@@ -144,7 +161,7 @@ class ResourceAction(BasePayload):
         else:
             self.base = load_payload_file(kwargs['payload_path'])
 
-        self.customized = self.customize_payload(deepcopy(self.base), **kwargs)
+        self.customized = self.customize_payload(CopyOnWriteDict(self.base), **kwargs)
         if customization_func:
             self.customized = customization_func(self.customized, **kwargs)
 
@@ -156,11 +173,18 @@ class ResourceAction(BasePayload):
         """
         try:
             req = self.config.session.post(
-                f"https://{self.config.vcac_server}/catalog-service/api/consumer/requests",
-                data=json.dumps(self.customized),
+                self.request_url(),
+                data=json.dumps(materialize(self.customized)),
                 verify=self.config.verify,
                 timeout=self.config.timeout)
             req.raise_for_status()
+            return req
+        except requests.exceptions.HTTPError as e:
+            if e.response is not None and e.response.status_code == 403:
+                raise VraSdkEntitlementException(
+                    f'vRa refused the request for entitlement reason : {e}')
+            raise VraSdkRequestException(
+                f'vRa request exception : {e}')
         except requests.exceptions.RequestException as e:
             raise VraSdkRequestException(
                 f'vRa request exception : {e}')
@@ -1,18 +1,88 @@
 # -*- coding: utf-8 -*-
 from vra_sdk.models.vra_object import VraBaseObject
 from vra_sdk.vra_config import VraConfig
-from vra_sdk.vra_utils import load_payload_file
-from vra_sdk.vra_exceptions import VraSdkRequestException, VraSdkPayloadException
+from vra_sdk.vra_utils import load_payload_file, CopyOnWriteDict, materialize
+from vra_sdk.vra_exceptions import VraSdkRequestException, VraSdkPayloadException, VraSdkEntitlementException
 import requests
 import json
-from copy import deepcopy 
+
+
+def load_template(url, cache_key=None, context=None):
+    """Get a payload template from the template cache, or against vRa infrastructure
+
+    Args:
+        url (string): url of the template
+        cache_key (tuple, optional): Defaults to None. key of the template in the cache. If None, the cache is not used
+        context (VraContext, optional): Defaults to None. client context to use. If None, the VraConfig singleton is used
+
+    Returns:
+        dict: payload template. Shared with the cache, so it must not be modified
+    """
+
+    config = context or VraConfig()
+    template = config.template_cache.get(cache_key) if cache_key else None
+    if template is None:
+        try:
+            with config.request_semaphore:
+                req = config.session.get(url, verify=config.verify, timeout=config.timeout)
+            req.raise_for_status()
+            template = json.loads(req.text)
+        except requests.exceptions.RequestException as e:
+            raise VraSdkRequestException(
+                f'vRa request exception : {e}')
+        except Exception as e:
+            raise VraSdkPayloadException(
+                f'Unmanaged error requesting vRa: {e}')
+        if cache_key:
+            config.template_cache.set(cache_key, template)
+    return template
+
+
+def get_catalog_item_template(catalog_item_id, context=None):
+    """Get payload template for catalog item request. Templates are cached per catalog item
+
+    Args:
+        catalog_item_id (string): id of the catalog item
+        context (VraContext, optional): Defaults to None. client context to use. If None, the VraConfig singleton is used
+
+    Returns:
+        dict: payload of the request to perform to request the specified catalog item
+    """
+
+    config = context or VraConfig()
+    return load_template(
+        f"https://{config.vcac_server}/catalog-service/api/consumer/entitledCatalogItems/{catalog_item_id}/requests/template",
+        ('catalog_item', config.vcac_server, catalog_item_id), context)
+
+
+def get_resource_action_template(resource_id, resource_action_id, resource_type=None, context=None):
+    """Get payload template for resource action request.
+
+    Templates are cached per action and resource type, only if the resource type is given
+
+    Args:
+        resource_id (string): id of the resource to perform the action on
+        resource_action_id (string): id of the action to perform
+        resource_type (string, optional): Defaults to None. type of the resource
+        context (VraContext, optional): Defaults to None. client context to use. If None, the VraConfig singleton is used
+
+    Returns:
+        dict: payload of the request to perform to request the specified action on the specified resource
+    """
+
+    config = context or VraConfig()
+    cache_key = ('resource_action', config.vcac_server, resource_action_id, resource_type) if resource_type else None
+    return load_template(
+        f"https://{config.vcac_server}/catalog-service/api/consumer/resources/{resource_id}/actions/{resource_action_id}/requests/template",
+        cache_key, context)
+
 
 class BasePayload():
     """Base class for CatalogItem and ResourceAction
     """
 
-    def __init__(self):
-        self.config = VraConfig()
+    def __init__(self, context=None):
+        self.config = context or VraConfig()
 
     def customize_payload(self, payload, **kwargs):
         """base customization payload
@@ -43,19 +113,21 @@ class BasePayload():
 
 class CatalogItem(BasePayload):
 
-    def __init__(self, customization_func=None, **kwargs):
+    def __init__(self, customization_func=None, payload_template=None, context=None, **kwargs):
         """Init ResourceAction object for vRa 7.x payload object
             customization_func ([type], optional): Defaults to None. If not None, this function will add a second customization after the initial one.
+            payload_template (dict, optional): Defaults to None. Template to use instead of requesting it against vRa
+            context (VraContext, optional): Defaults to None. client context to use. If None, the VraConfig singleton is used
         """
 
-        super().__init__()
+        super().__init__(context)
         self.customized = None
         if not kwargs.get('payload_path'):
-            self.base = self.get_template(kwargs.get('catalog_item_id'))
+            self.base = payload_template or self.get_template(kwargs.get('catalog_item_id'))
         else:
             self.base = load_payload_file(kwargs['payload_path'])
 
-        self.customized = self.customize_payload(deepcopy(self.base), **kwargs)
+        self.customized = self.customize_payload(CopyOnWriteDict(self.base), **kwargs)
         if customization_func:
             self.customized = customization_func(self.customized, **kwargs)
 
@@ -68,12 +140,18 @@ class CatalogItem(BasePayload):
 
         try:
             req = self.config.session.post(
-                f"https://{self.config.vcac_server}/catalog-service/api/consumer/entitledCatalogItems/{self.customized['catalogItemId']}/requests",
-                json=self.customized,
+                self.request_url(),
+                json=materialize(self.customized),
                 verify=self.config.verify,
                 timeout=self.config.timeout)
             req.raise_for_status()
             return req
+        except requests.exceptions.HTTPError as e:
+            if e.response is not None and e.response.status_code == 403:
+                raise VraSdkEntitlementException(
+                    f'vRa refused the request for entitlement reason : {e}')
+            raise VraSdkRequestException(
+                f'vRa request exception : {e}')
         except requests.exceptions.RequestException as e:
             raise VraSdkRequestException(
                 f'vRa request exception : {e}')
@@ -81,8 +159,17 @@ class CatalogItem(BasePayload):
             raise VraSdkPayloadException(
                 f'Unmanaged error requesting vRa: {e}')
 
+    def request_url(self):
+        """Url to use to execute the request against the vRa infrastructure
+
+        Returns:
+            string: request url
+        """
+
+        return f"https://{self.config.vcac_server}/catalog-service/api/consumer/entitledCatalogItems/{self.customized['catalogItemId']}/requests"
+
     def get_template(self, catalog_item_id):
-        """Get payload template for catalog item request against vRa infrastructure
+        """Get payload template for catalog item request, from the template cache or against vRa infrastructure
         
         Args:
             catalog_item_id (string): id of the catalog item
@@ -91,35 +178,26 @@ class CatalogItem(BasePayload):
             dict: payload of the request to perform to request the specified catalog item
         """
 
-        try:
-            req = self.config.session.get(
-                f"https://{self.config.vcac_server}/catalog-service/api/consumer/entitledCatalogItems/{catalog_item_id}/requests/template",
-                verify=self.config.verify,
-                timeout=self.config.timeout)
-            req.raise_for_status()
-            return json.loads(req.text) 
-        except requests.exceptions.RequestException as e:
-            raise VraSdkRequestException(
-                f'vRa request exception : {e}')
-        except Exception as e:
-            raise VraSdkPayloadException(
-                f'Unmanaged error requesting vRa: {e}')
-        
+        return get_catalog_item_template(catalog_item_id, self.config)
+
 
 class ResourceAction(BasePayload):
-    def __init__(self, customization_func=None, **kwargs):
+    def __init__(self, customization_func=None, payload_template=None, resource_type=None, context=None, **kwargs):
         """Init ResourceAction object for vRa 7.x payload object
             customization_func ([type], optional): Defaults to None. If not None, this function will add a second customization after the initial one.
+            payload_template (dict, optional): Defaults to None. Template to use instead of requesting it against vRa
+            resource_type (string, optional): Defaults to None. Type of the resource. If set, the template is shared with the other resources of this type
+            context (VraContext, optional): Defaults to None. client context to use. If None, the VraConfig singleton is used
         """
 
-        super().__init__()
+        super().__init__(context)
         self.customized = None
         if not kwargs.get('payload_path'):
-            self.base = self.get_template(kwargs.get('resource_id'), kwargs.get('resource_action_id'))
+            self.base = payload_template or self.get_template(kwargs.get('resource_id'), kwargs.get('resource_action_id'), resource_type)
         else:
             self.base = load_payload_file(kwargs['payload_path'])
 
-        self.customized = self.customize_payload(deepcopy(self.base), **kwargs)
+        self.customized = self.customize_payload(CopyOnWriteDict(self.base), **kwargs)
         if customization_func:
             self.customized = customization_func(self.customized, **kwargs)
 
@@ -132,12 +210,18 @@ class ResourceAction(BasePayload):
 
         try:
             req = self.config.session.post(
-                f"https://{self.config.vcac_server}/catalog-service/api/consumer/resources/{self.customized['resourceId']}/actions/{self.customized['actionId']}/requests",
-                json=self.customized,
+                self.request_url(),
+                json=materialize(self.customized),
                 verify=self.config.verify,
                 timeout=self.config.timeout)
             req.raise_for_status()
             return req
+        except requests.exceptions.HTTPError as e:
+            if e.response is not None and e.response.status_code == 403:
+                raise VraSdkEntitlementException(
+                    f'vRa refused the request for entitlement reason : {e}')
+            raise VraSdkRequestException(
+                f'vRa request exception : {e}')
         except requests.exceptions.RequestException as e:
             raise VraSdkRequestException(
                 f'vRa request exception : {e}')
@@ -145,27 +229,25 @@ class ResourceAction(BasePayload):
             raise VraSdkPayloadException(
                 f'Unmanaged error requesting vRa: {e}')
 
-    def get_template(self, resource_id, resource_action_id):
-        """Get payload template for resource action request against vRa infrastructure
+    def request_url(self):
+        """Url to use to execute the request against the vRa infrastructure
+
+        Returns:
+            string: request url
+        """
+
+        return f"https://{self.config.vcac_server}/catalog-service/api/consumer/resources/{self.customized['resourceId']}/actions/{self.customized['actionId']}/requests"
+
+    def get_template(self, resource_id, resource_action_id, resource_type=None):
+        """Get payload template for resource action request, from the template cache or against vRa infrastructure
         
         Args:
             resource_id (string): id of the resource to perform the action on
             resource_action_id (string): id of the action to perform
+            resource_type (string, optional): Defaults to None. type of the resource, needed to use the template cache
         
         Returns:
             dict: payload of the request to perform to request the specified action on the specified resource
         """
 
-        try:
-            req = self.config.session.get(
-                f"https://{self.config.vcac_server}/catalog-service/api/consumer/resources/{resource_id}/actions/{resource_action_id}/requests/template",
-                verify=self.config.verify,
-                timeout=self.config.timeout)
-            req.raise_for_status()
-            return json.loads(req.text)
-        except requests.exceptions.RequestException as e:
-            raise VraSdkRequestException(
-                f'vRa request exception : {e}')
-        except Exception as e:
-            raise VraSdkPayloadException(
-                f'Unmanaged error requesting vRa: {e}')
+        return get_resource_action_template(resource_id, resource_action_id, resource_type, self.config)
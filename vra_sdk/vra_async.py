@@ -0,0 +1,771 @@
+# -*- coding: utf-8 -*-
+import asyncio
+import json
+import ssl
+from vra_sdk.vra_config import VraConfig
+from vra_sdk.vra_authenticate import VraAuthenticate, parse_expires
+from vra_sdk.vra_request import VraRequest, FINAL_STATES
+from vra_sdk.vra_sdk import VraSdk, get_context
+from vra_sdk.vra_entitlement import VraEntitlementIndex
+from vra_sdk.vra_formatter import format_result
+from vra_sdk.vra_query import get_query
+from vra_sdk.vra_utils import polling_delays, materialize
+from vra_sdk.vra_exceptions import VraSdkAsyncException, VraSdkRequestException, VraSdkAuthenticateException, \
+    VraSdkMainException, VraSdkMainRequestException, VraSdkEntitlementException, VraSdkRequestTimeoutException
+
+try:
+    import aiohttp
+except ImportError:
+    aiohttp = None
+
+
+def get_ssl(verify):
+    """Convert a Requests verify value to an aiohttp ssl value
+
+    Args:
+        verify (boolean or string): Requests verify value. Can be a path to a CA bundle
+
+    Returns:
+        None, boolean or ssl.SSLContext: aiohttp ssl value
+    """
+
+    if isinstance(verify, str):
+        return ssl.create_default_context(cafile=verify)
+    return None if verify else False
+
+
+async def request_json(config, method, url, **kwargs):
+    """Perform an http request using the aiohttp session of the configuration
+
+    Args:
+        config (VraConfig): VraConfig object
+        method (string): http method
+        url (string): url to request
+
+    Raises:
+        VraSdkAsyncException: No aiohttp session. Authentication has not been done
+        VraSdkRequestException: Raised if any aiohttp error
+        VraSdkEntitlementException: vRa refused the request for entitlement reason (403)
+
+    Returns:
+        tuple: json answer (None if the answer is empty), answer headers
+    """
+
+    if config.aio_session is None:
+        raise VraSdkAsyncException('No aiohttp session available, authenticate first')
+
+    try:
+        async with config.aio_session.request(method, url,
+                                              ssl=get_ssl(config.verify),
+                                              timeout=aiohttp.ClientTimeout(total=config.timeout),
+                                              **kwargs) as resp:
+            resp.raise_for_status()
+            text = await resp.text()
+            return (json.loads(text) if text else None), resp.headers
+    except aiohttp.ClientResponseError as e:
+        if e.status == 403:
+            raise VraSdkEntitlementException(f'vRa refused the request for entitlement reason : {e}')
+        raise VraSdkRequestException(f'vRa request exception : {e}')
+    except (aiohttp.ClientError, asyncio.TimeoutError) as e:
+        raise VraSdkRequestException(f'vRa request exception : {e}')
+
+
+async def gather_bounded(func, iterable, max_workers):
+    """asyncio version of vra_utils.run_concurrently()
+
+    Args:
+        func (function): coroutine function to apply on each element
+        iterable (iterable): elements to process
+        max_workers (int): maximum number of concurrent calls
+
+    Returns:
+        list: result of func for each element, in the same order
+    """
+
+    semaphore = asyncio.Semaphore(max(max_workers, 1))
+
+    async def bounded(elt):
+        async with semaphore:
+            return await func(elt)
+
+    return await asyncio.gather(*[bounded(elt) for elt in iterable])
+
+
+class AsyncVraAuthenticate(VraAuthenticate):
+    """asyncio version of VraAuthenticate, based on aiohttp
+
+    The aiohttp session is stored in the aio_session attribute of the VraConfig object.
+    It is created on the first authentication and must be closed using close() (or using this object as an async context manager)
+    """
+
+    def __init__(self, environment, context=None, **kwargs):
+        """Init AsyncVraAuthenticate
+
+        Args:
+            environment (string): requested vRa server environment
+            context (VraContext, optional): Defaults to None. client context to use. If None, the VraConfig singleton is used
+
+        Raises:
+            VraSdkAsyncException: aiohttp is not installed
+        """
+
+        if aiohttp is None:
+            raise VraSdkAsyncException('aiohttp is required to use vra_async, install it using "pip install vra_sdk[async]"')
+        super().__init__(environment, context, **kwargs)
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *args):
+        await self.close()
+
+    def get_session(self):
+        """Return the aiohttp session, create it if needed. Must be called from a coroutine
+
+        Returns:
+            aiohttp.ClientSession: aiohttp session
+        """
+
+        if self.config.aio_session is None or self.config.aio_session.closed:
+            self.config.aio_session = aiohttp.ClientSession(
+                headers={'content-type': 'application/json', 'Accept': 'application/json'},
+                connector=aiohttp.TCPConnector(limit=self.config.max_concurrent_requests))
+        return self.config.aio_session
+
+    async def auth_login_password(self, login, password, domain):
+        """Manage login/password authentication
+        Will update self.token accordingly
+
+        Args:
+            login (string): vRa login
+            password (string): vRa password
+            domain (string): AD domain
+
+        Returns:
+            AsyncVraAuthenticate: self
+        """
+
+        self.login = login
+        self.domain = domain
+        self.requestedFor = self.login + "@" + self.domain
+        self.token = await self.get_token(login, password)
+        self.get_session().headers.update({'Authorization': 'Bearer ' + self.token})
+        return self
+
+    async def auth_login_token(self, login, token, domain):
+        """Manage login/token authentication
+        Will update self.token accordingly
+
+        Args:
+            login (string): vRa login
+            token (string): vRa token
+            domain (string): AD Domain
+
+        Returns:
+            AsyncVraAuthenticate: self
+        """
+
+        self.login = login
+        self.domain = domain
+        self.requestedFor = self.login + "@" + self.domain
+        self.token = token
+        self.get_session().headers.update({'Authorization': 'Bearer ' + self.token})
+        return self
+
+    async def get_token(self, login, password):
+        """Get authentication token against vRa infrastructure
+        Will update self.expires accordingly
+
+        Args:
+            login (string): vRa login
+            password (string): vRa password
+
+        Raises:
+            VraSdkRequestException: Raised if any aiohttp error
+            VraSdkAuthenticateException: Raised for unmanaged error
+
+        Returns:
+            string: vRa token
+        """
+
+        payload = {
+            'username': login,
+            'password': password,
+            'tenant': self.tenant
+        }
+
+        self.get_session()
+        response, _ = await request_json(self.config, 'POST',
+                                         f"https://{self.config.vcac_server}/identity/api/tokens",
+                                         json=payload)
+        try:
+            self.expires = parse_expires(response.get('expires'))
+            return response['id']
+        except Exception as e:
+            raise VraSdkAuthenticateException(f"Unmanaged error during token retrieving: {e}")
+
+    async def delete_token(self):
+        """Delete vRa token
+
+        Returns:
+            bolean: True if the token has been succesfully deleted, False there's already no token
+        """
+
+        if not self.token: return False
+        await request_json(self.config, 'DELETE',
+                           f"https://{self.config.vcac_server}/identity/api/tokens/{self.token}")
+        self.token = None
+        self.get_session().headers.pop('Authorization', None)
+        return True
+
+    async def close(self):
+        """Close the aiohttp session"""
+
+        if self.config.aio_session is not None:
+            await self.config.aio_session.close()
+            self.config.aio_session = None
+
+
+class AsyncVraRequest(VraRequest):
+    """asyncio version of VraRequest
+
+    Attributes:
+        config (VraConfig): VraConfig object
+        Payload (vra_payload_x.CatalogItem or vra_payload_x.ResourceAction): Payload object
+        status_url (string): url to get the status of the current request
+        response (dict): json answer of the request execution
+        metadata (dict): paging metadata of the last resources listing
+    """
+
+    async def get_status(self):
+        """Use the status_url attribute to get the status of the request against the vRa infrastructure
+
+        Returns:
+            string: vRa status state
+        """
+
+        response, _ = await request_json(self.config, 'GET', self.status_url)
+        try:
+            return response['state']
+        except Exception as e:
+            raise VraSdkMainRequestException(
+                f'Unmanaged error requesting status url {self.status_url}: {e}')
+
+    async def execute_async(self):
+        """Execute the request of the payload object. Set the status_url if there's one in the vRa answer.
+
+        Raises:
+            VraSdkEntitlementException: vRa refused the request for entitlement reason, on_entitlement_error has been called
+
+        Returns:
+            self: AsyncVraRequest
+        """
+
+        try:
+            self.response, headers = await request_json(self.config, 'POST', self.payload.request_url(),
+                                                        json=materialize(self.payload.customized))
+        except VraSdkEntitlementException:
+            if self.on_entitlement_error:
+                self.on_entitlement_error()
+            raise
+        self.status_url = headers.get('Location', 'NoLocationFound')
+        return self
+
+    async def wait(self):
+        """Poll the status of the request until it reaches a final state, once per tick
+
+        Raises:
+            VraSdkRequestTimeoutException: The request is still running after the polling timeout
+
+        Returns:
+            string: final vRa status state
+        """
+
+        delays = polling_delays(**self.config.polling)
+        while True:
+            status = await self.get_status()
+            if status in FINAL_STATES:
+                return status
+            delay = next(delays, None)
+            if delay is None:
+                raise VraSdkRequestTimeoutException(
+                    f'Request {self.status_url} still in state {status} after polling timeout')
+            await asyncio.sleep(delay)
+
+    async def execute_sync(self):
+        """wrapper of execute_async and wait until the result is successful or failed
+
+        Raises:
+            VraSdkMainRequestException: Request failed
+            VraSdkRequestTimeoutException: The request is still running after the polling timeout
+
+        Returns:
+            self: AsyncVraRequest
+        """
+
+        await self.execute_async()
+        status = await self.wait()
+        if status != 'SUCCESSFUL':
+            raise VraSdkMainRequestException(f'Request failed with state {status}')
+        return self
+
+    async def get_object_raw(self, object_type, key, value, limit, page, full=False, resource_type=None, query=None):
+        """Get raw catalog resource information from vRa infrastructure
+
+        Args:
+            object_type (string): type of vRa resource to get data on
+            key (string): field to search for
+            value (string): value of the field
+            limit (int): maximum result per page
+            page (int): page to get from result.
+            full (bool): If True return the full result
+            resource_type (string, optional): Defaults to None. Only used for get_raw_definitions()
+            query (VraQuery, optional): Defaults to None. Query to filter and order the resources with
+
+        Returns:
+            list: raw vRa data
+        """
+
+        url = self.listing_url(object_type, key, value, limit, page, resource_type, query)
+        res, _ = await request_json(self.config, 'GET', url)
+        self.metadata = res.get('metadata', {})
+
+        if (not object_type and resource_type) or full:
+            ids = [value] if key == 'id' else [elt["id"] for elt in res["content"]]
+            return await gather_bounded(self.get_resource_raw, ids, self.config.max_concurrent_requests)
+        else:
+            return res['content'] if 'content' in res else []
+
+    async def get_resource_raw(self, resource_id):
+        """Get the full raw data of one catalog resource from vRa infrastructure
+
+        Args:
+            resource_id (string): id of the catalog resource
+
+        Returns:
+            dict: raw vRa data
+        """
+
+        res, _ = await request_json(self.config, 'GET',
+                                    f"https://{self.config.vcac_server}/catalog-service/api/consumer/resources/{resource_id}")
+        return res
+
+    async def get_object(self, object_type, key, value, limit, page, full=False, resource_type=None, raw_data=True, fields=None, query=None):
+        """Get raw_data from get_raw_object() and create a list of object using the factory and these data.
+
+        Args:
+            object_type (string): type of vRa resource to get data on
+            key (string): field to search for
+            value (string): value of the field
+            limit (int): maximum result per page
+            page (int): page to get from result.
+            resource_type (string, optional): Defaults to None. Only used for get_raw_definitions()
+            raw_data (bool, optional): Defaults to True. If False, the raw_data attribute of the objects is not set
+            fields (list, optional): Defaults to None. If set, only these fields are formatted and set on the objects
+            query (string, VraFilter or VraQuery, optional): Defaults to None. Query to filter and order the resources with, or name of a filter of the configuration file
+
+        Returns:
+            list: list of object type as defined in the business_models configuration section
+        """
+
+        query = get_query(self.config.config_file, query)
+        raw_result = await self.get_object_raw(object_type, key, value, limit, page, full, resource_type, query)
+        return self.build_objects(object_type, key, value, raw_result, resource_type, raw_data, fields, query)
+
+    async def get_request_result_raw(self):
+        """Request vRa to get the result of a specific request based on the status_url
+
+        Returns:
+            dict: vRa raw data
+        """
+
+        data, _ = await request_json(self.config, 'GET', f"{self.status_url}/resources")
+        if data and data.get("content"):
+            return data['content'][0]
+
+        data, _ = await request_json(self.config, 'GET', f"{self.status_url}/forms/details")
+        return data
+
+    async def get_request_result(self):
+        """wrapper of get_request_result_raw(). Return the beautify result
+
+        Returns:
+            dict: vRa beautify result
+        """
+
+        return format_result(await self.get_request_result_raw())
+
+
+class AsyncVraSdk(VraSdk):
+    """asyncio version of VraSdk
+
+    Properties can't perform asynchronous requests, so load() must be awaited to get the catalog and the business group id,
+    and again after switching business group
+
+    Attributes:
+        config (VraConfig): VraConfig object
+        business_group (string): current business group name
+        business_group_id (string): current business group id
+        catalog (dict): map of catalog item/resource action to related vRa id
+    """
+
+    def __init__(self, authentication_object, business_group, context=None, **kwargs):
+        """Init the AsyncVraSdk object
+
+        Args:
+            authentication_object (AsyncVraAuthenticate): authentication object
+            business_group (string): business group to work on
+            context (VraContext, optional): Defaults to None. client context to use, which must be the one of the authentication object.
+                If None, the context of the authentication object is used
+
+        Raises:
+            VraSdkMainException: The context is not the one of the authentication object
+        """
+
+        self.authentication_object = authentication_object
+        self.context = get_context(authentication_object, context)
+        self.config = self.context or VraConfig()
+        self._entitlement_index = None
+        self._catalog = None
+        self.business_group = business_group
+
+    @property
+    def catalog(self):
+        """property to get the catalog of the business group, as loaded by the last load() call
+
+        Raises:
+            VraSdkAsyncException: The catalog of the business group is not loaded
+        """
+
+        if self._catalog is None:
+            raise VraSdkAsyncException(f'Catalog of business group {self.business_group} not loaded, await load() first')
+        return self._catalog
+
+    @catalog.setter
+    def catalog(self, value):
+        self._catalog = value
+
+    @property
+    def business_group_id(self):
+        """property to get business group id, as resolved by the last load() call"""
+        return self._business_group_id
+
+    @business_group_id.setter
+    def business_group_id(self, value):
+        self._business_group_id = value
+
+    async def load(self, force_refresh=False):
+        """Get the catalog and the business group id from the cache, or from the vRa infrastructure using a single request
+
+        Args:
+            force_refresh (bool, optional): Defaults to False. force the refresh of the entitled catalog items
+
+        Returns:
+            AsyncVraSdk: self
+        """
+
+        entry = {} if force_refresh else self.read_cache()
+        if 'catalog' not in entry or 'business_group_id' not in entry:
+            entry = {'catalog': await self.get_catalog(force_refresh),
+                     'business_group_id': await self.get_bg_id(self.business_group)}
+            self.write_cache(entry)
+        self.catalog = entry['catalog']
+        self.business_group_id = entry['business_group_id']
+        return self
+
+    def invalidate_cache(self):
+        """Drop the cache entry of this business group, and the data loaded from it. load() must be awaited again to reload them
+
+        Called when an entitlement error could be due to outdated cached data. Does nothing if there's no cache configured
+
+        Returns:
+            bool: True if the data has been dropped
+        """
+
+        if not self.config.cache:
+            return False
+        self.config.cache.invalidate(self.cache_key())
+        self._entitlement_index = None
+        self.catalog = {}
+        self._business_group_id = ''
+        return True
+
+    async def get_entitled_items(self):
+        """Get the entitled catalog items from the vRa infrastructure.
+
+        Raises:
+            VraSdkMainException: No entitled catalog item
+
+        Returns:
+            list: entitled catalog items as returned by vRa
+        """
+
+        response, _ = await request_json(
+            self.config, 'GET',
+            f"https://{self.config.vcac_server}/catalog-service/api/consumer/entitledCatalogItems?limit=9999")
+        if not response or 'content' not in response:
+            raise VraSdkMainException(
+                f'Unable get entitled catalog items for account {self.authentication_object.login}')
+        return response['content']
+
+    async def get_entitlement_index(self, force_refresh=False):
+        """Get the index of the entitled catalog items, built once from a single vRa request
+
+        Args:
+            force_refresh (bool, optional): Defaults to False. force a new request against vRa
+
+        Raises:
+            VraSdkMainException: Error building the index
+
+        Returns:
+            VraEntitlementIndex: index of the entitled catalog items
+        """
+
+        if self._entitlement_index is None or force_refresh:
+            entitled_items = await self.get_entitled_items()
+            try:
+                self._entitlement_index = VraEntitlementIndex(entitled_items)
+            except Exception as e:
+                raise VraSdkMainException(
+                    f'Error indexing the entitled catalog items {e}')
+        return self._entitlement_index
+
+    async def get_bg_id(self, business_group, force_refresh=False):
+        """get business group id against vRa infrastructure
+
+        Args:
+            business_group (string): business group name
+            force_refresh (bool, optional): Defaults to False. force the refresh of the entitled catalog items
+
+        Returns:
+            string: business group id
+        """
+
+        return self.find_bg_id(await self.get_entitlement_index(force_refresh), business_group)
+
+    async def get_catalog(self, force_refresh=False):
+        """Get the catalog item list of the business group from the vRa infrastructure
+
+        Args:
+            force_refresh (bool, optional): Defaults to False. force the refresh of the entitled catalog items
+
+        Returns:
+            dict: map of catalog item to vRa id
+        """
+
+        return (await self.get_entitlement_index(force_refresh)).get_catalog(self.business_group)
+
+    async def get_payload_template(self, origin, name, template_url, cache_key=None, **kwargs):
+        """Get the template of a vRa 7.x payload, except if a payload file is defined for it in the configuration file
+
+        Args:
+            origin (string): origin of the request. 'catalog_item' or 'resource_action'
+            name (string): catalog item or resource action name
+            template_url (string): url of the template
+            cache_key (tuple, optional): Defaults to None. key of the template in the template cache. If None, the cache is not used
+
+        Returns:
+            dict: payload template, None if not needed
+        """
+
+        if str(kwargs['payload_version']) != '7' or self.config.config_file[origin].get(name, {}).get('payload'):
+            return None
+        template = self.config.template_cache.get(cache_key) if cache_key else None
+        if template is None:
+            template, _ = await request_json(self.config, 'GET', template_url)
+            if cache_key:
+                self.config.template_cache.set(cache_key, template)
+        return template
+
+    async def request_catalog_item(self, item_name, customization_func=None, **kwargs):
+        """create a ready to use AsyncVraRequest object to request a catalog item
+
+        Args:
+            item_name (string): catalog item name
+            customization_func (function, optional): Defaults to None. payload customization function
+
+        Raises:
+            VraSdkEntitlementException: Requested catalog item is not in the catalog
+
+        Returns:
+            AsyncVraRequest: object with the payload attribute well customized
+        """
+
+        if item_name not in self.catalog and self.invalidate_cache():
+            # the catalog may come from an outdated cache
+            await self.load()
+        if item_name not in self.catalog:
+            raise VraSdkEntitlementException(
+                'You do not have permissions to perform this request')
+
+        if not kwargs.get('payload_version'):
+            kwargs['payload_version'] = self.config.config_file['payload_default_version']
+        template = await self.get_payload_template(
+            'catalog_item', item_name,
+            f"https://{self.config.vcac_server}/catalog-service/api/consumer/entitledCatalogItems/{self.catalog[item_name]}/requests/template",
+            ('catalog_item', self.config.vcac_server, self.catalog[item_name]),
+            **kwargs)
+        if template:
+            kwargs['payload_template'] = template
+        payload = self.format_payload(
+            'catalog_item', item_name, customization_func, **kwargs)
+        return AsyncVraRequest(payload, context=self.context, on_entitlement_error=self.invalidate_cache)
+
+    async def update_resource_operations(self, resource_id):
+        """Update the catalog to add the resource actions available for a resource
+
+        Args:
+            resource_id (string): id of the resource
+        """
+
+        response, _ = await request_json(
+            self.config, 'GET', f'https://{self.config.vcac_server}/catalog-service/api/consumer/resources/{resource_id}')
+        try:
+            for elt in response['operations']:
+                self.catalog[elt["name"]] = elt["id"]
+        except Exception as e:
+            raise VraSdkAsyncException(f'Error retrieving resource operation: {e}')
+
+    async def request_resource_action(self, action_name, resource_id, customization_func=None, **kwargs):
+        """create a ready to use AsyncVraRequest object to request a resource action
+
+        Args:
+            action_name (string): resource action name
+            resource_id (string): resource id to perform action on
+            customization_func (function, optional): Defaults to None. payload customization function
+
+        Raises:
+            VraSdkEntitlementException: Requested action is not available
+
+        Returns:
+            AsyncVraRequest: object with the payload attribute well customized
+        """
+
+        if action_name not in self.catalog:
+            await self.update_resource_operations(resource_id)
+        if action_name not in self.catalog:
+            raise VraSdkEntitlementException(
+                'You do not have permissions to perform this request')
+
+        if not kwargs.get('payload_version'):
+            kwargs['payload_version'] = self.config.config_file['payload_default_version']
+        template = await self.get_payload_template(
+            'resource_action', action_name,
+            f"https://{self.config.vcac_server}/catalog-service/api/consumer/resources/{resource_id}/actions/{self.catalog[action_name]}/requests/template",
+            ('resource_action', self.config.vcac_server, self.catalog[action_name], kwargs['resource_type']) if kwargs.get('resource_type') else None,
+            **kwargs)
+        if template:
+            kwargs['payload_template'] = template
+        payload = self.format_payload(
+            'resource_action', action_name, resource_id, customization_func, **kwargs)
+        return AsyncVraRequest(payload, context=self.context, on_entitlement_error=self.invalidate_cache)
+
+    async def get_data(self, object_type, key, value, fields=None, query=None):
+        """Get data about one catalog resource in vRa. Get detailed info about your object
+
+        Args:
+            object_type (string): object type as described in the 'business_models' section of the configuration fiel
+            key (string): field to filter on
+            value (string): value of the field
+            fields (list, optional): Defaults to None. If set, only these fields are formatted and set on the object
+            query (string, VraFilter or VraQuery, optional): Defaults to None. Query to filter and order the resources with, or name of a filter of the configuration file
+
+        Returns:
+            object: business models object type as described in you configuration file
+        """
+
+        data = await AsyncVraRequest({}, context=self.context).get_object(object_type, key, value, 1, 1, True, fields=fields, query=query)
+
+        if not data:
+            raise VraSdkMainException(
+                f'No {object_type} exist with {key}={value}')
+
+        return data[0]
+
+    async def list_data(self, object_type, key, value, limit=None, page=1, full=False, recursive=False, fields=None, query=None):
+        """Get info about a list of object. Get less details than get_data(), but you still get the id
+
+        Args:
+            object_type (string): object typre
+            key (string): field to filter on
+            value (string): value of the field to search on
+            limit (int, optional): Defaults to None. maximum result
+            page (int, optional): Defaults to 1. vRa result page to get data from
+            recursive (bool, optional): Defaults to False. If True, will also get every following page. Pages are fetched concurrently.
+            fields (list, optional): Defaults to None. If set, only these fields are formatted and set on the objects
+            query (string, VraFilter or VraQuery, optional): Defaults to None. Query to filter and order the resources with, or name of a filter of the configuration file
+
+        Returns:
+            list: list of business models object type as described in you configuration file
+        """
+
+        if not limit:
+            limit = self.config.config_file['max_vra_result_per_page']
+
+        request = AsyncVraRequest({}, context=self.context)
+        data = await request.get_object(object_type, key, value, limit, page, full, fields=fields, query=query)
+        if not data:
+            raise VraSdkMainException(f'No {object_type} exist with {key}={value}')
+
+        if recursive:
+            total_pages = request.metadata.get('totalPages')
+            if total_pages:
+                pages = await gather_bounded(
+                    lambda next_page: AsyncVraRequest({}, context=self.context).get_object(object_type, key, value, limit, next_page, full, fields=fields, query=query),
+                    range(page + 1, total_pages + 1),
+                    self.config.max_concurrent_requests)
+                for page_data in pages:
+                    data.extend(page_data or [])
+            else:
+                page_data = data
+                while len(page_data) == limit:
+                    page = page + 1
+                    page_data = await AsyncVraRequest({}, context=self.context).get_object(object_type, key, value, limit, page, full, fields=fields, query=query) or []
+                    data.extend(page_data)
+        return data
+
+    async def iter_data(self, object_type, key, value, limit=None, page=1, full=False, raw_data=True, fields=None, query=None):
+        """Asynchronous generator version of list_data(). vRa pages are requested one by one
+
+        Args:
+            object_type (string): object type as described in the 'business_models' section of the configuration file
+            key (string): field to filter on
+            value (string): value of the field to search on
+            limit (int, optional): Defaults to None. maximum result per page
+            page (int, optional): Defaults to 1. first vRa result page to get data from
+            full (bool, optional): Defaults to False. If True, get detailed info about each object
+            raw_data (bool, optional): Defaults to True. If False, the raw_data attribute of the objects is not set
+            fields (list, optional): Defaults to None. If set, only these fields are formatted and set on the objects
+            query (string, VraFilter or VraQuery, optional): Defaults to None. Query to filter and order the resources with, or name of a filter of the configuration file
+
+        Yields:
+            object: business models object type as described in you configuration file
+        """
+
+        if not limit:
+            limit = self.config.config_file['max_vra_result_per_page']
+
+        while True:
+            request = AsyncVraRequest({}, context=self.context)
+            data = await request.get_object(object_type, key, value, limit, page, full, raw_data=raw_data, fields=fields, query=query)
+            for elt in data or []:
+                yield elt
+
+            total_pages = request.metadata.get('totalPages')
+            if (total_pages and page >= total_pages) or (not total_pages and len(data or []) < limit):
+                return
+            page = page + 1
+
+    async def get_raw_definition(self, key, value, resource_type):
+        """Return dict used to create object inside the VraFactory
+
+        Args:
+            key (string): key to search data from
+            value (string): value of the key
+            resource_type (string): vRa resource type
+
+        Returns:
+            dict: dict of user friendly vRa formatted data
+        """
+
+        return (await AsyncVraRequest({}, context=self.context).get_object(None, key, value, 1, 1, True, resource_type))[0]
@@ -1,41 +1,105 @@
 # -*- coding: utf-8 -*-
 import urllib3
 import json
+import os
+import hmac
+import hashlib
+import time
+import threading
+from datetime import datetime
 import requests
 from vra_sdk.vra_config import VraConfig
 from vra_sdk.vra_exceptions import VraSdkConfigException, VraSdkRequestException, VraSdkAuthenticateException
 
+# minimum delay in seconds before a scheduled token refresh. A token expiring sooner than that after refresh_before is not
+# refreshed in background, otherwise each new token would be refreshed again right away
+MIN_REFRESH_DELAY = 60
+
+
+def parse_expires(value):
+    """Parse the expiration date of a vRa token
+
+    Args:
+        value (string): expires field of the /identity/api/tokens answer (eg: 2019-06-19T10:41:19.000Z)
+
+    Returns:
+        float: expiration timestamp, None if missing or unreadable
+    """
+
+    if not value:
+        return None
+    value = value.replace('Z', '+0000')
+    for date_format in ('%Y-%m-%dT%H:%M:%S.%f%z', '%Y-%m-%dT%H:%M:%S%z'):
+        try:
+            return datetime.strptime(value, date_format).timestamp()
+        except ValueError:
+            pass
+    return None
+
+
+def hash_password(password, salt):
+    """Hash a password, to check a cached token has been requested with the same password
+
+    Args:
+        password (string): vRa password
+        salt (string): hex encoded random salt
+
+    Returns:
+        string: hex encoded pbkdf2 hash
+    """
+
+    return hashlib.pbkdf2_hmac('sha256', password.encode('utf-8'), bytes.fromhex(salt), 100000).hex()
+
+
 class VraAuthenticate():
     """Provide authentication mechanism against vRa and context switching support
 
     Attributes:
-        config (VraConfig): VraConfig object
+        config (VraConfig or VraContext): configuration and session to use
+        context (VraContext): client context given at creation, None for the VraConfig singleton
         login (string): User login
         requestedFor (string): User login + domain
         token (string): vRa token
+        expires (float): expiration timestamp of the token, None if unknown
         domain (string): User ad domain
         environment (string): requested vRa environment
         tenant (string): vRa tenant
     """
 
-    def __init__(self, environment, **kwargs):
+    def __init__(self, environment, context=None, **kwargs):
         """Init VraAuthenticate
         
         Args:
             environment (string): requested vRa server environment
+            context (VraContext, optional): Defaults to None. client context to use. If None, the VraConfig singleton is used
 
         Returns:
             VraAuthenticate: self
         """
 
         urllib3.disable_warnings()
-        self.config = VraConfig()
+        self.context = context
+        self.config = context or VraConfig()
         self.login = None
         self.requestedFor = None
         self.token = None
+        self.expires = None
         self.domain = None
+        self._password = None
+        self._refresh_timer = None
+        self._lock = threading.RLock()
         self.environment = environment
 
+    @property
+    def token_options(self):
+        """Token lifetime options of the configuration file
+
+        Returns:
+            dict: refresh_before (seconds), auto_refresh (bool) and cache (bool)
+        """
+
+        return {'refresh_before': 300, 'auto_refresh': True, 'cache': False, **self.config.config_file.get('token', {})}
+
     @property
     def environment(self):
         return self._environment
@@ -44,19 +108,24 @@ class VraAuthenticate():
     def environment(self, value):
         """environment property setter
 
-        Will update tenant and vcac_server accordingly
+        Will update tenant and vcac_server accordingly, and use the configured http adapter for the vcac_server
         
         Args:
             value (string): environment as describe in your configuration file
         """
 
         self.config.vcac_server = self.config.config_file['vcac_servers'][value]
+        self.config.mount_http_adapter(self.config.vcac_server)
         self.tenant = self.config.config_file['tenant'][value]
         self._environment = value
 
     def auth_login_password(self, login, password, domain):
         """Managem login/password authentication
         Will update self.token accordingly
+
+        A still valid token of the token cache, requested with the same password, is reused instead of requesting a new one.
+        The token is then refreshed in background before it expires, and a request refused with a 401 is sent again once
+        after a new authentication.
         
         Args:
             login (string): vRa login
@@ -73,9 +142,17 @@ class VraAuthenticate():
         self.login = login
         self.domain = domain
         self.requestedFor = self.login + "@" + self.domain
-        self.token = self.get_token(login, password)
+        self._password = password
+        cached = self.read_token_cache(password)
+        if cached:
+            self.token, self.expires = cached['id'], cached['expires']
+        else:
+            self.token = self.get_token(login, password)
+            self.write_token_cache()
         self.config.session.headers.update(
             {'content-type': 'application/json', 'Accept': 'application/json', 'Authorization': 'Bearer ' + self.token})
+        self.add_retry_hook()
+        self.schedule_refresh()
 
         return self
 
@@ -99,12 +176,17 @@ class VraAuthenticate():
         self.domain = domain
         self.requestedFor = self.login + "@" + self.domain
         self.token = token
+        self.expires = None
+        self._password = None
+        self.cancel_refresh()
+        self.take_over_session()
         self.config.session.headers.update(
             {'content-type': 'application/json', 'Accept': 'application/json', 'Authorization': 'Bearer ' + self.token})
         return self
 
     def get_token(self, login, password):
         """Get authentication token against vRa infrastructure
+        Will update self.expires accordingly
         
         Args:
             login (string): vRa login
@@ -133,7 +215,9 @@ class VraAuthenticate():
                                            headers=headers,
                                            timeout=self.config.timeout)
             req.raise_for_status()
-            return json.loads(req.text)['id']
+            response = json.loads(req.text)
+            self.expires = parse_expires(response.get('expires'))
+            return response['id']
         except requests.exceptions.RequestException as e:
             raise VraSdkRequestException(f"Error during request to get vRa token: {e}")
         except Exception as e:
@@ -150,17 +234,203 @@ class VraAuthenticate():
             bolean: True if the token has been succesfully deleted, False there's already no token
         """
 
+        self.cancel_refresh()
+        self._password = None
         try:
             if not self.token: return False
+            self.invalidate_token_cache()
             req = self.config.session.delete(f"https://{self.config.vcac_server}/identity/api/tokens/{self.token}",
                                            verify=self.config.verify,
                                            headers=self.config.session.headers,
                                            timeout=self.config.timeout)
             req.raise_for_status()
             self.token = None
+            self.expires = None
             self.config.session.headers.update({'content-type':'application/json', 'Accept':'application/json', 'Authorization':''})
             return True
         except requests.exceptions.RequestException as e:
             raise VraSdkRequestException(f"Error during request to get vRa token: {e}")
         except Exception as e:
             raise VraSdkAuthenticateException(f"Unmanaged error during token retrieving: {e}")
+
+    def expires_in(self):
+        """Remaining lifetime of the token
+
+        Returns:
+            float: seconds before the token expires, None if unknown
+        """
+
+        return self.expires - time.time() if self.expires is not None else None
+
+    def token_cache_key(self):
+        """Key of the token cache entry of this account
+
+        Returns:
+            tuple: cache key
+        """
+
+        return ('token', self.config.vcac_server, self.tenant, self.requestedFor)
+
+    def read_token_cache(self, password):
+        """Read the token of this account from the token cache
+
+        Args:
+            password (string): vRa password, must be the one the cached token has been requested with
+
+        Returns:
+            dict: cached token (id and expires), None if there's no cache configured, no token valid for more than refresh_before seconds
+                or if the token has been requested with another password
+        """
+
+        options = self.token_options
+        if not self.config.cache or not options['cache']:
+            return None
+        cached = self.config.cache.get(self.token_cache_key())
+        if not cached or cached.get('expires') is None or cached['expires'] - options['refresh_before'] <= time.time():
+            return None
+        try:
+            if not hmac.compare_digest(hash_password(password, cached['salt']), cached['password_hash']):
+                return None
+        except (KeyError, TypeError, ValueError):
+            return None
+        return cached
+
+    def write_token_cache(self):
+        """Store the token in the token cache, if configured and its expiration is known
+
+        Tokens are stored in the on-disk cache, so they are readable by anyone allowed to read the cache directory.
+        The entry holds a salted hash of the password, so the token is only reused with the same password
+        """
+
+        if not self.config.cache or not self.token_options['cache'] or self.expires is None or not self._password:
+            return
+        salt = os.urandom(16).hex()
+        self.config.cache.set(self.token_cache_key(), {'id': self.token, 'expires': self.expires, 'salt': salt,
+                                                       'password_hash': hash_password(self._password, salt)})
+
+    def invalidate_token_cache(self):
+        """Remove the token of this account from the token cache"""
+
+        if self.config.cache:
+            self.config.cache.invalidate(self.token_cache_key())
+
+    def refresh_token(self):
+        """Request a new token with the login/password and use it in the session
+
+        Raises:
+            VraSdkAuthenticateException: Not authenticated with a login/password
+
+        Returns:
+            string: vRa token
+        """
+
+        with self._lock:
+            if not self._password:
+                raise VraSdkAuthenticateException("Unable to refresh the token, not authenticated with a login/password")
+            owns_session = self.owns_session()
+            self.token = self.get_token(self.login, self._password)
+            self.write_token_cache()
+            if owns_session:
+                self.config.session.headers.update({'Authorization': 'Bearer ' + self.token})
+            self.schedule_refresh()
+            return self.token
+
+    def owns_session(self):
+        """Check the session is still authenticated with the token of this object
+
+        Returns:
+            bool: False if another authentication has been done on the session since
+        """
+
+        return self.token is not None and self.config.session.headers.get('Authorization') == 'Bearer ' + self.token
+
+    def schedule_refresh(self):
+        """Schedule the refresh of the token refresh_before seconds before it expires, in a background thread
+
+        Nothing is scheduled if auto_refresh is disabled, the expiration is unknown, there is no password to authenticate with,
+        the session is authenticated by another object or the refresh would happen in less than MIN_REFRESH_DELAY seconds
+        (token lifetime shorter than refresh_before). Requests refused with an expired token still trigger a new authentication
+        """
+
+        self.cancel_refresh()
+        options = self.token_options
+        if not options['auto_refresh'] or self.expires is None or not self._password or not self.owns_session():
+            return
+        delay = self.expires_in() - options['refresh_before']
+        if delay < MIN_REFRESH_DELAY:
+            return
+        self._refresh_timer = threading.Timer(delay, self.refresh_in_background)
+        self._refresh_timer.daemon = True
+        self._refresh_timer.start()
+
+    def cancel_refresh(self):
+        """Cancel the scheduled refresh of the token"""
+
+        if self._refresh_timer:
+            self._refresh_timer.cancel()
+            self._refresh_timer = None
+
+    def refresh_in_background(self):
+        """Refresh the token from the refresh timer
+
+        Errors are ignored: requests refused with an expired token will trigger a new authentication.
+        Nothing is done if the session is now authenticated by another object.
+        """
+
+        if not self.owns_session():
+            self._refresh_timer = None
+            return
+        try:
+            self.refresh_token()
+        except (VraSdkRequestException, VraSdkAuthenticateException):
+            self._refresh_timer = None
+
+    def take_over_session(self):
+        """Stop the token management (retry hook and refresh timer) of the other VraAuthenticate objects using the session"""
+
+        hooks = self.config.session.hooks['response']
+        for hook in hooks:
+            if getattr(hook, '__func__', None) is VraAuthenticate.retry_unauthorized and hook.__self__ is not self:
+                hook.__self__.cancel_refresh()
+        hooks[:] = [hook for hook in hooks if getattr(hook, '__func__', None) is not VraAuthenticate.retry_unauthorized]
+
+    def add_retry_hook(self):
+        """Add retry_unauthorized to the response hooks of the session, in place of the one of any other VraAuthenticate object"""
+
+        self.take_over_session()
+        self.config.session.hooks['response'].append(self.retry_unauthorized)
+
+    def retry_unauthorized(self, response, *args, **kwargs):
+        """Response hook sending again once a request refused with a 401, after a new authentication
+
+        Concurrent requests refused with the same token trigger a single authentication.
+
+        Args:
+            response (requests.Response): vRa answer
+            kwargs: options the request has been sent with (timeout, verify...)
+
+        Returns:
+            requests.Response: answer of the retried request, or the initial answer
+        """
+
+        if response.status_code != 401 or not self._password or '/identity/api/tokens' in response.url:
+            return response
+
+        with self._lock:
+            if response.request.headers.get('Authorization') == 'Bearer ' + str(self.token):
+                # nobody re-authenticated since this request has been sent
+                self.invalidate_token_cache()
+                try:
+                    self.refresh_token()
+                except (VraSdkRequestException, VraSdkAuthenticateException):
+                    return response
+
+        request = response.request.copy()
+        request.headers['Authorization'] = 'Bearer ' + self.token
+        response.content
+        response.close()
+        # sent through the adapter, so this hook is not run again on the retried request
+        retried = response.connection.send(request, **kwargs)
+        retried.history.append(response)
+        retried.request = request
+        return retried
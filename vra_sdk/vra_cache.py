@@ -0,0 +1,110 @@
+# -*- coding: utf-8 -*-
+import os
+import json
+import time
+import hashlib
+import logging
+import tempfile
+from vra_sdk.vra_utils import resolve_path
+
+logger = logging.getLogger(__name__)
+
+
+class VraCache():
+    """Persistent on-disk cache, used to keep vRa data (eg: the catalog) between several executions
+
+    Each entry is stored in its own json file, named after a hash of its key.
+    An entry expires ttl seconds after it has been written.
+
+    Attributes:
+        directory (string): absolute path of the folder containing the cache files
+        ttl (int): time to live of an entry, in seconds
+    """
+
+    def __init__(self, directory='~/.vra_sdk', ttl=86400, **kwargs):
+        """Init VraCache
+
+        Args:
+            directory (string, optional): Defaults to ~/.vra_sdk. folder containing the cache files. Relative to the python execution path
+            ttl (int, optional): Defaults to 86400. time to live of an entry, in seconds
+        """
+
+        self.directory = resolve_path(os.path.expanduser(directory))
+        self.ttl = ttl
+
+    def get_path(self, key):
+        """Get the path of the file of an entry
+
+        Args:
+            key (tuple): entry key, made of json serializable elements
+
+        Returns:
+            string: path to the entry file
+        """
+
+        digest = hashlib.sha256(json.dumps(key).encode('utf-8')).hexdigest()
+        return os.path.join(self.directory, f'{digest}.json')
+
+    def get(self, key):
+        """Get an entry from the cache
+
+        Args:
+            key (tuple): entry key, made of json serializable elements
+
+        Returns:
+            dict: cached value, None if the entry is missing, expired or unreadable
+        """
+
+        path = self.get_path(key)
+        try:
+            if time.time() - os.path.getmtime(path) > self.ttl:
+                return None
+            with open(path, 'r') as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return None
+
+    def set(self, key, value):
+        """Store an entry in the cache
+
+        The file is written atomically, so concurrent executions never read a partial entry.
+        The cache being optional, a write error (eg: unwritable directory) is logged and ignored
+
+        Args:
+            key (tuple): entry key, made of json serializable elements
+            value (dict): value to store, must be json serializable
+
+        Returns:
+            bool: True if the entry has been written
+        """
+
+        try:
+            os.makedirs(self.directory, exist_ok=True)
+            fd, tmp_path = tempfile.mkstemp(dir=self.directory, suffix='.tmp')
+            try:
+                with os.fdopen(fd, 'w') as f:
+                    json.dump(value, f, separators=(',', ':'))
+                os.replace(tmp_path, self.get_path(key))
+            except BaseException:
+                os.remove(tmp_path)
+                raise
+        except Exception as e:
+            logger.warning('Error writing cache entry in %s: %s', self.directory, e)
+            return False
+        return True
+
+    def invalidate(self, key):
+        """Remove an entry from the cache
+
+        Args:
+            key (tuple): entry key, made of json serializable elements
+
+        Returns:
+            bool: True if an entry has been removed
+        """
+
+        try:
+            os.remove(self.get_path(key))
+            return True
+        except FileNotFoundError:
+            return False
@@ -3,11 +3,126 @@
 import json
 import requests
 import os
+import socket
+import threading
+from requests.adapters import HTTPAdapter
+from urllib3.connection import HTTPConnection
+from urllib3.util.retry import Retry
 from vra_sdk.vra_decorator import singleton
-from vra_sdk.vra_utils import resolve_path
+from vra_sdk.vra_utils import resolve_path, TtlLruCache, preload_payload_files
+from vra_sdk.vra_cache import VraCache
+from vra_sdk.vra_formatter import set_output_timezone
 from vra_sdk.vra_exceptions import VraSdkConfigException, VraSdkMainConfigException
 
 
+def get_keepalive_options(idle=60, interval=10, count=6):
+    """Get the socket options enabling TCP keep-alive
+
+    Options not supported by the platform are skipped
+
+    Args:
+        idle (int, optional): Defaults to 60. idle time in seconds before sending keep-alive probes
+        interval (int, optional): Defaults to 10. time in seconds between two keep-alive probes
+        count (int, optional): Defaults to 6. number of unanswered probes before closing the connection
+
+    Returns:
+        list: socket options, as expected by urllib3
+    """
+
+    options = [(socket.SOL_SOCKET, socket.SO_KEEPALIVE, 1)]
+    for name, value in (('TCP_KEEPIDLE', idle), ('TCP_KEEPINTVL', interval), ('TCP_KEEPCNT', count)):
+        if hasattr(socket, name):
+            options.append((socket.IPPROTO_TCP, getattr(socket, name), value))
+    return options
+
+
+def get_retry(total=3, backoff_factor=0.5, status_forcelist=(429, 502, 503, 504), **kwargs):
+    """Get the urllib3 retry policy of the requests to vRa
+
+    Only GET requests are retried, other methods may not be idempotent (eg: a catalog item request).
+    The Retry-After header of the 429 and 503 answers is respected.
+
+    Args:
+        total (int, optional): Defaults to 3. maximum number of retries
+        backoff_factor (float, optional): Defaults to 0.5. factor of the exponential delay between retries
+        status_forcelist (list, optional): Defaults to (429, 502, 503, 504). http status to retry
+
+    Returns:
+        urllib3.util.retry.Retry: retry policy
+    """
+
+    retry_kwargs = dict(total=total, backoff_factor=backoff_factor, status_forcelist=status_forcelist,
+                        respect_retry_after_header=True, raise_on_status=False, **kwargs)
+    try:
+        return Retry(allowed_methods=frozenset(['GET']), **retry_kwargs)
+    except TypeError:
+        # urllib3 < 1.26
+        return Retry(method_whitelist=frozenset(['GET']), **retry_kwargs)
+
+
+class VraHTTPAdapter(HTTPAdapter):
+    """Requests transport adapter for vRa servers: connection pool sizing, retry policy and TCP keep-alive
+
+    Attributes:
+        socket_options (list): socket options of the connections, None for urllib3 defaults
+    """
+
+    def __init__(self, socket_options=None, **kwargs):
+        """Init VraHTTPAdapter
+
+        Args:
+            socket_options (list, optional): Defaults to None. socket options of the connections
+            kwargs: requests.adapters.HTTPAdapter parameters (pool_connections, pool_maxsize, pool_block, max_retries)
+        """
+
+        self.socket_options = socket_options
+        super().__init__(**kwargs)
+
+    def init_poolmanager(self, *args, **kwargs):
+        if self.socket_options is not None:
+            kwargs['socket_options'] = self.socket_options
+        super().init_poolmanager(*args, **kwargs)
+
+
+def get_http_adapter(http_config, max_concurrent_requests=10):
+    """Create the http adapter mounted for the vRa servers
+
+    Args:
+        http_config (dict): http section of the configuration file
+        max_concurrent_requests (int, optional): Defaults to 10. minimum size of the connection pool
+
+    Returns:
+        VraHTTPAdapter: http adapter
+    """
+
+    keepalive = http_config.get('keepalive', True)
+    socket_options = None
+    if keepalive:
+        socket_options = HTTPConnection.default_socket_options + \
+            get_keepalive_options(**(keepalive if isinstance(keepalive, dict) else {}))
+
+    retry = http_config.get('retry', {})
+    return VraHTTPAdapter(socket_options=socket_options,
+                          pool_connections=http_config.get('pool_connections', 10),
+                          pool_maxsize=http_config.get('pool_maxsize', max(10, max_concurrent_requests)),
+                          pool_block=http_config.get('pool_block', False),
+                          max_retries=get_retry(**retry) if retry is not None else 0)
+
+
+def mount_http_adapter(session, http_adapter, vcac_server):
+    """Use an http adapter for the requests of a session to a vRa server
+
+    Args:
+        session (requests.sessions): Requests session object
+        http_adapter (VraHTTPAdapter): http adapter to mount
+        vcac_server (string): vRa server
+    """
+
+    prefix = f'https://{vcac_server}/'
+    if session.adapters.get(prefix) is not http_adapter:
+        session.mount(prefix, http_adapter)
+
+
 @singleton
 class VraConfig():
     """Handle configuration loading
@@ -19,6 +134,13 @@ class VraConfig():
         verify (boolean): Requests verify option behavior
         session (requests.sessions): Requests session object
         vcac_server (string): vRa server
+        max_concurrent_requests (int): maximum number of requests performed concurrently against vRa
+        request_semaphore (threading.BoundedSemaphore): slots of the concurrent GET requests, shared by nested thread pools
+        aio_session (aiohttp.ClientSession): aiohttp session used by the vra_async module
+        cache (VraCache): on-disk cache, None if not configured
+        polling (dict): request status polling options, see vra_utils.polling_delays
+        template_cache (TtlLruCache): in-memory cache of the vRa 7.x payload templates
+        http_adapter (VraHTTPAdapter): http adapter of the session for the vRa servers
     """
 
     def __init__(self, config_path=None):
@@ -26,7 +148,7 @@ class VraConfig():
             config_path (string, optional): Defaults to None. Path to the config file. Relative to the python execution path
         
         Raises:
-            VraSdkConfigException: Config file not found
+            VraSdkConfigException: Config file not found or invalid output_timezone
             VraSdkMainConfigException: Unmanaged error
         """
 
@@ -43,6 +165,28 @@ class VraConfig():
 
         self.verify = self.config_file.get('verify', True)
         self.timeout = self.config_file.get('timeout', 30)
+        self.max_concurrent_requests = self.config_file.get('max_concurrent_requests', 10)
+        self.request_semaphore = threading.BoundedSemaphore(max(self.max_concurrent_requests, 1))
+        self.polling = self.config_file.get('polling', {})
+        self.template_cache = TtlLruCache(**self.config_file.get('template_cache', {}))
+        preload_payload_files(self.config_file)
+        try:
+            set_output_timezone(self.config_file.get('output_timezone'))
+        except (ValueError, TypeError) as e:
+            raise VraSdkConfigException(f'Invalid output_timezone in config file: {e}')
         self.session = requests.Session()
         self.session.trust_env = False
+        self.http_adapter = get_http_adapter(self.config_file.get('http', {}), self.max_concurrent_requests)
         self.vcac_server = None
+        self.aio_session = None
+        cache_config = self.config_file.get('cache')
+        self.cache = VraCache(**cache_config) if cache_config else None
+
+    def mount_http_adapter(self, vcac_server):
+        """Use the http adapter for the requests to a vRa server
+
+        Args:
+            vcac_server (string): vRa server
+        """
+
+        mount_http_adapter(self.session, self.http_adapter, vcac_server)
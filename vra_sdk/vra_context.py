@@ -0,0 +1,68 @@
+# -*- coding: utf-8 -*-
+import threading
+import requests
+from vra_sdk.vra_config import VraConfig, get_http_adapter, mount_http_adapter
+from vra_sdk.vra_utils import TtlLruCache
+
+
+class VraContext():
+    """Client context: http session, vRa server and caches of one connection to vRa
+
+    By default, every object uses the VraConfig singleton, so a process can only work on one vRa server and one account at a time.
+    Give a context to VraAuthenticate (context parameter) to work on another server or account concurrently: each context has
+    its own session (and so its own authentication header), vcac_server and template cache. VraSdk objects use the context of
+    their authentication object, and give it to the VraRequest objects they create.
+    The configuration file options are the ones of the VraConfig singleton when the context is created.
+
+    eg:
+        context = VraContext()
+        auth_obj = VraAuthenticate('PRD', context=context).auth_login_password('my_login', 'my_password', 'my_domain')
+        my_vra_sdk = VraSdk(auth_obj, 'my_business_group')
+
+    A context can be shared between threads, as long as they work on the same server with the same account.
+
+    Attributes:
+        config_file (dict): Serialization of the configuration file
+        verify (boolean): Requests verify option behavior
+        timeout (int): Requests timeout option
+        max_concurrent_requests (int): maximum number of requests performed concurrently against vRa
+        request_semaphore (threading.BoundedSemaphore): slots of the concurrent GET requests of this context
+        polling (dict): request status polling options, see vra_utils.polling_delays
+        cache (VraCache): on-disk cache, None if not configured. Shared with VraConfig, entries are per server and account
+        template_cache (TtlLruCache): in-memory cache of the vRa 7.x payload templates of this context
+        session (requests.sessions): Requests session object of this context
+        http_adapter (VraHTTPAdapter): http adapter of the session for the vRa servers
+        vcac_server (string): vRa server of this context, set by VraAuthenticate
+        aio_session (aiohttp.ClientSession): aiohttp session used by the vra_async module
+    """
+
+    def __init__(self, config=None):
+        """Init VraContext
+
+        Args:
+            config (VraConfig, optional): Defaults to None. configuration to take the options from. If None, the VraConfig singleton is used
+        """
+
+        config = config or VraConfig()
+        self.config_file = config.config_file
+        self.verify = config.verify
+        self.timeout = config.timeout
+        self.max_concurrent_requests = config.max_concurrent_requests
+        self.request_semaphore = threading.BoundedSemaphore(max(self.max_concurrent_requests, 1))
+        self.polling = config.polling
+        self.cache = config.cache
+        self.template_cache = TtlLruCache(**self.config_file.get('template_cache', {}))
+        self.session = requests.Session()
+        self.session.trust_env = False
+        self.http_adapter = get_http_adapter(self.config_file.get('http', {}), self.max_concurrent_requests)
+        self.vcac_server = None
+        self.aio_session = None
+
+    def mount_http_adapter(self, vcac_server):
+        """Use the http adapter for the requests to a vRa server
+
+        Args:
+            vcac_server (string): vRa server
+        """
+
+        mount_http_adapter(self.session, self.http_adapter, vcac_server)
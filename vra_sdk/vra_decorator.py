@@ -22,6 +22,9 @@ def check_entitlement(func):
     @wraps(func)
     def wrapper(*args, **kwargs):
         # args[0] is the first argument of the decorated function, so it's the self of the decorated function
+        if args[1] not in args[0].catalog and hasattr(args[0], 'invalidate_cache'):
+            # the catalog may come from an outdated cache
+            args[0].invalidate_cache()
         if args[1] in args[0].catalog:
             return func(*args, **kwargs)
         else:
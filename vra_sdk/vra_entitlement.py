@@ -0,0 +1,61 @@
+# -*- coding: utf-8 -*-
+
+
+class VraEntitlementIndex():
+    """In-memory index of the entitled catalog items of an account, built in a single pass
+
+    Attributes:
+        catalog (dict): map of catalog item name to vRa id
+        business_groups (dict): map of business group name to vRa id (subtenantRef)
+        business_group_catalogs (dict): map of business group name to its catalog (catalog item name to vRa id)
+    """
+
+    def __init__(self, entitled_items):
+        """Init VraEntitlementIndex
+
+        Args:
+            entitled_items (list): entitled catalog items as returned by vRa
+        """
+
+        self.catalog = {}
+        self.business_groups = {}
+        self.business_group_catalogs = {}
+
+        for elt in entitled_items:
+            catalog_item = elt.get('catalogItem') or {}
+            name = catalog_item.get('name')
+            if name is not None:
+                self.catalog[name] = catalog_item.get('id')
+
+            for organization in elt.get('entitledOrganizations') or []:
+                label = organization.get('subtenantLabel')
+                if organization.get('subtenantRef'):
+                    self.business_groups[label] = organization['subtenantRef']
+                if name is not None:
+                    self.business_group_catalogs.setdefault(label, {})[name] = catalog_item.get('id')
+
+    def get_bg_id(self, business_group):
+        """Get the id of a business group
+
+        Args:
+            business_group (string): business group name
+
+        Returns:
+            string: business group id, None if the account has no entitlement in this business group
+        """
+
+        return self.business_groups.get(business_group)
+
+    def get_catalog(self, business_group=None):
+        """Get a catalog
+
+        Args:
+            business_group (string, optional): Defaults to None. business group name. If None, the catalog of every business group is returned
+
+        Returns:
+            dict: map of catalog item name to vRa id
+        """
+
+        if business_group is None:
+            return dict(self.catalog)
+        return dict(self.business_group_catalogs.get(business_group, {}))
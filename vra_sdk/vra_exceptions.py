@@ -46,4 +46,16 @@ class VraSdkDecoratorException(VraSdkException):
 
 class VraSdkMainRequestException(VraSdkException):
     """for vra_request"""
+    pass
+
+class VraSdkRequestTimeoutException(VraSdkMainRequestException):
+    """for vra_request status polling timeout"""
+    pass
+
+class VraSdkAsyncException(VraSdkException):
+    """for vra_async"""
+    pass
+
+class VraSdkQueryException(VraSdkException):
+    """for vra_query"""
     pass
\ No newline at end of file
@@ -1,16 +1,88 @@
 # -*- coding: utf-8 -*-
-from vra_sdk.vra_utils import get_module_class, clean_kwargs_key
+from collections import namedtuple
+from vra_sdk.vra_utils import get_module_class, clean_kwargs_key, to_attribute_name
 from vra_sdk.vra_config import VraConfig
 import inspect
 from vra_sdk.vra_exceptions import VraSdkFactoryException, VraSdkConfigException
 
+# Class of an object type, resolved once: object_path (string), object_class (class), id_cards (frozenset of the class parameters)
+FactorySpec = namedtuple('FactorySpec', ['object_path', 'object_class', 'id_cards'])
+
 
 class VraFactory(object):
     """Factory to create specific object class
+
+    Attributes:
+        specs (dict): map of (object_type, object_path) to FactorySpec, for the configuration file specs_config
+        specs_config (dict): configuration file the specs have been resolved from. The specs are dropped when it's reloaded
     """
 
-    
-    
+    specs = {}
+    specs_config = None
+
+    @staticmethod
+    def clear_specs():
+        """Drop the resolved classes of the object types, to take into account a business model change"""
+
+        VraFactory.specs = {}
+        VraFactory.specs_config = None
+
+    @staticmethod
+    def get_spec(object_type, object_path=None):
+        """Get the class of an object type, resolving it only on first call
+        
+        Args:
+            object_type (string): Object type as defined in the business_models section of the configuration file
+            object_path (string, optional): Defaults to None. path of the class (module.class). If None, it's read from the business_models section
+
+        Raises:
+            VraSdkConfigException: Unknown object type
+            VraSdkFactoryException: No path for the object type
+        
+        Returns:
+            FactorySpec: resolved class of the object type
+        """
+
+        config = VraConfig().config_file
+        if VraFactory.specs_config is not config:
+            VraFactory.specs = {}
+            VraFactory.specs_config = config
+
+        spec = VraFactory.specs.get((object_type, object_path))
+        if spec is None:
+            path = object_path
+            if path is None:
+                if object_type not in config['business_models']:
+                    raise VraSdkConfigException(
+                        'Error building vraObject, unknown type')
+                path = config.get(
+                    'business_models').get(object_type).get('path')
+                if not path:
+                    raise VraSdkFactoryException(
+                        f"Error retrieving module_class for {object_type} object type.")
+
+            _, object_class = get_module_class(path)
+            spec = FactorySpec(path, object_class, frozenset(inspect.signature(object_class).parameters))
+            VraFactory.specs[(object_type, object_path)] = spec
+        return spec
+
+    @staticmethod
+    def check_id_cards(object_type, spec, kwargs):
+        """Check every kwarg is a parameter of the object class
+
+        Args:
+            object_type (string): Object type to create
+            spec (FactorySpec): resolved class of the object type
+            kwargs (iterable): names of the kwargs
+
+        Raises:
+            VraSdkConfigException: kwarg not authorized by the id card of the class
+        """
+
+        if not spec.id_cards.issuperset(kwargs):
+            kwarg = next(kwarg for kwarg in kwargs if kwarg not in spec.id_cards)
+            raise VraSdkConfigException(
+                f"Error creating vraObject {object_type}, {kwarg} not authorized by the id card of {spec.object_path}")
 
     @staticmethod
     def factory(object_type, customization_func=None, **kwargs):
@@ -24,37 +96,76 @@ class VraFactory(object):
             object: object of the 'object_type' type specified in args
         """
 
-        config = VraConfig().config_file
-
         if object_type == 'payload':
             if all(k in kwargs for k in ("payload_version", "payload_type")):
                 str_version = str(kwargs['payload_version'])
                 payload_type = kwargs['payload_type']
-                object_path = f'vra_sdk.models.vra_payload_{str_version}.{payload_type}'
+                spec = VraFactory.get_spec(object_type, f'vra_sdk.models.vra_payload_{str_version}.{payload_type}')
             else:
                 raise VraSdkFactoryException(
                     "Error creating payload object. Missing required parameters")
-        elif object_type in config['business_models']:
-            object_path = config.get(
-                'business_models').get(object_type).get('path')
-            if not object_path:
-                raise VraSdkFactoryException(
-                    f"Error retrieving module_class for {object_type} object type.")
-        else:
-            raise VraSdkConfigException(
-                'Error building vraObject, unknown type')
+            return spec.object_class(customization_func, **clean_kwargs_key(**kwargs))
 
-        _, object_class = get_module_class(object_path)
-        id_cards = inspect.signature(object_class).parameters
-        cleaned_kwargs = clean_kwargs_key(**kwargs)
+        spec = VraFactory.get_spec(object_type)
+        if 'raw_data' not in spec.id_cards:
+            # raw_data is optional in business models
+            kwargs.pop('raw_data', None)
+        cleaned_kwargs = {to_attribute_name(k): v for (k, v) in kwargs.items()}
+        VraFactory.check_id_cards(object_type, spec, cleaned_kwargs)
+        return spec.object_class(**cleaned_kwargs)
 
-        if object_type != 'payload':
-            for kwarg in cleaned_kwargs:
-                if kwarg not in id_cards:
-                    raise VraSdkConfigException(
-                        f"Error creating vraObject {object_type}, {kwarg} not authorized by the id card of {object_path}")
+    @staticmethod
+    def factory_many(object_type, kwargs_list, raw_data=None):
+        """Create business model objects from several sets of kwargs, of the same type
 
-        if object_type == 'payload':
-            return object_class(customization_func, **cleaned_kwargs)
-            
-        return object_class(**cleaned_kwargs)
+        The class is resolved once, and the kwargs names are cleaned and checked once per distinct set of names.
+        Objects are created one by one, as the result is consumed.
+
+        Args:
+            object_type (string): Object type to create as defined in the business_models section of the configuration file
+            kwargs_list (iterable): dict of kwargs of each object (eg: vra_formatter.format_results() result)
+            raw_data (iterable, optional): Defaults to None. raw_data of each object, in the same order as kwargs_list. If None, or if the business model has no raw_data parameter, the raw_data attribute of the objects is not set
+
+        Yields:
+            object: object of the 'object_type' type specified in args
+        """
+
+        spec = VraFactory.get_spec(object_type)
+        raw_data = iter(raw_data) if raw_data is not None and 'raw_data' in spec.id_cards else None
+
+        # map of kwargs names (in order) to their cleaned names
+        shapes = {}
+        for kwargs in kwargs_list:
+            shape = tuple(kwargs)
+            names = shapes.get(shape)
+            if names is None:
+                names = tuple(to_attribute_name(key) for key in shape)
+                VraFactory.check_id_cards(object_type, spec, names)
+                shapes[shape] = names
+
+            cleaned_kwargs = dict(zip(names, kwargs.values()))
+            if raw_data is not None:
+                cleaned_kwargs['raw_data'] = next(raw_data)
+            yield spec.object_class(**cleaned_kwargs)
+
+    @staticmethod
+    def factory_from_resource(object_type, resource, fields=None, **kwargs):
+        """Create a business model object from a vra_formatter.LazyResource, formatting only the needed fields
+        
+        Args:
+            object_type (string): Object type to create as defined in the business_models section of the configuration file
+            resource (LazyResource): vRa resource to create the object from
+            fields (list, optional): Defaults to None. Fields to set on the object, the other ones keep their default value. If None, every field is set
+        
+        Returns:
+            object: object of the 'object_type' type specified in args
+        """
+
+        spec = VraFactory.get_spec(object_type)
+        if 'raw_data' not in spec.id_cards:
+            kwargs.pop('raw_data', None)
+        names = {key: to_attribute_name(key) for key in resource}
+        VraFactory.check_id_cards(object_type, spec, names.values())
+
+        selected_kwargs = {name: resource[key] for key, name in names.items() if fields is None or name in fields}
+        return spec.object_class(**selected_kwargs, **kwargs)
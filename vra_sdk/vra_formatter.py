@@ -1,6 +1,10 @@
 # -*- coding: utf-8 -*-
 import json
+import re
 import sys
+from collections.abc import Mapping
+from datetime import datetime, timedelta, timezone
+from functools import lru_cache
 from dateutil.parser import parse
 
 from vra_sdk import vra_utils
@@ -71,6 +75,87 @@ def parse_boolean(element):
     return element["key"], bool(element["value"]["value"])
 
 
+ISO_DATETIME_RE = re.compile(
+    r'(\d{4})-(\d{2})-(\d{2})[T ](\d{2}):(\d{2}):(\d{2})(?:\.(\d{1,6}))?(?:(Z)|([+-])(\d{2}):?(\d{2}))?$')
+
+# timezone of the formatted datetimes. If None, datetimes are not converted and are suffixed with +0100
+OUTPUT_TIMEZONE = None
+
+
+def set_output_timezone(offset):
+    """Set the timezone of the datetimes formatted by parse_datetime()
+
+    Args:
+        offset (string): utc offset, like "+0100", "-05:30" or "Z". If None, datetimes are not converted and are suffixed with +0100
+    """
+
+    global OUTPUT_TIMEZONE
+    OUTPUT_TIMEZONE = parse_offset(offset) if offset is not None else None
+    format_datetime.cache_clear()
+
+
+def parse_offset(offset):
+    """Convert an utc offset string to a timezone
+
+    Args:
+        offset (string): utc offset, like "+0100", "-05:30" or "Z"
+
+    Returns:
+        datetime.timezone: timezone of the offset
+    """
+
+    if offset in ('Z', 'z'):
+        return timezone.utc
+    match = re.match(r'([+-])(\d{2}):?(\d{2})$', offset)
+    if not match:
+        raise ValueError(f'Invalid utc offset {offset}')
+    delta = timedelta(hours=int(match.group(2)), minutes=int(match.group(3)))
+    return timezone(-delta if match.group(1) == '-' else delta)
+
+
+def parse_iso_datetime(value):
+    """Parse an ISO-8601 datetime, as returned by vRa. Other formats are parsed with dateutil
+
+    Args:
+        value (string): datetime to parse
+
+    Returns:
+        datetime.datetime: parsed datetime
+    """
+
+    match = ISO_DATETIME_RE.match(value)
+    if not match:
+        return parse(value)
+    year, month, day, hour, minute, second, fraction, utc, sign, offset_hour, offset_minute = match.groups()
+    tzinfo = None
+    if utc:
+        tzinfo = timezone.utc
+    elif sign:
+        tzinfo = parse_offset(f'{sign}{offset_hour}{offset_minute}')
+    return datetime(int(year), int(month), int(day), int(hour), int(minute), int(second),
+                    int(fraction.ljust(6, '0')) if fraction else 0, tzinfo)
+
+
+@lru_cache(maxsize=4096)
+def format_datetime(value):
+    """Format a vRa datetime in the output timezone
+
+    Results are memoized, since resources often share the same datetimes
+
+    Args:
+        value (string): vRa datetime
+
+    Returns:
+        string: formatted datetime
+    """
+
+    date = parse_iso_datetime(value)
+    if OUTPUT_TIMEZONE is None:
+        return date.strftime("%Y-%m-%dT%H:%M:%S.000+0100")
+    date = date.astimezone(OUTPUT_TIMEZONE) if date.tzinfo else date.replace(tzinfo=OUTPUT_TIMEZONE)
+    return date.strftime("%Y-%m-%dT%H:%M:%S.000%z")
+
+
 def parse_datetime(element):
     """parser for vRa data datetime type
     
@@ -81,7 +166,7 @@ def parse_datetime(element):
         tuple: key, datatime of vRa data
     """
 
-    return element["key"], parse(element["value"]["value"]).strftime("%Y-%m-%dT%H:%M:%S.000+0100")
+    return element["key"], format_datetime(element["value"]["value"])
 
 
 def parse_multiple(element):
@@ -128,6 +213,28 @@ def parse_complex(element):
     return key, parsed
 
 
+# map of vRa data type to its parser. Both upper and lower case types are registered to avoid any transformation when parsing
+PARSERS = {}
+
+
+def register_parser(vra_type, parser):
+    """Register the parser of a vRa data type. Can be used to parse custom vRa types, or to override a default parser
+
+    Args:
+        vra_type (string): vRa data type (case insensitive)
+        parser (function): parser, taking the vRa data and returning a tuple key, value
+    """
+
+    PARSERS[vra_type.lower()] = parser
+    PARSERS[vra_type.upper()] = parser
+
+
+for vra_type, parser in (('string', parse_string), ('integer', parse_integer), ('decimal', parse_decimal),
+                         ('boolean', parse_boolean), ('datetime', parse_datetime), ('multiple', parse_multiple),
+                         ('complex', parse_complex)):
+    register_parser(vra_type, parser)
+
+
 def parse_key(element):
     """proxy  method to class the specific parser
     
@@ -139,14 +246,19 @@ def parse_key(element):
     """
 
     elt_type = element["value"]["type"] if "value" in element else element["type"]
-    return getattr(sys.modules[__name__], "parse_%s" % elt_type.lower())(element)
+    parser = PARSERS.get(elt_type)
+    if parser is None:
+        # fallback for types neither registered nor in upper/lower case
+        parser = PARSERS.get(elt_type.lower()) or getattr(sys.modules[__name__], "parse_%s" % elt_type.lower())
+    return parser(element)
 
 
-def format_result(raw_result):
+def format_result(raw_result, prettify=True):
     """Format raw vRa result to a more user friendly result
     
     Args:
         raw_result (dict): raw data of vRa infrastructure when getting data
+        prettify (bool, optional): Defaults to True. If False, keys are not converted to snake_case
     
     Returns:
         dict: user friendly vRa result
@@ -180,4 +292,78 @@ def format_result(raw_result):
         # if the key is not already set before
         if elt["value"] is not None and (key_clean not in data_clean or key_clean == "description"):
             data_clean[key_clean] = parse_key(elt)[1]
-    return vra_utils.prettify_key(data_clean)
+    return vra_utils.prettify_key(data_clean) if prettify else data_clean
+
+
+def format_results(raw_results):
+    """Format a list of raw vRa results, converting the keys of the whole list at once
+    
+    Args:
+        raw_results (list): raw data of vRa infrastructure when getting data
+    
+    Returns:
+        list: user friendly vRa results
+    """
+
+    return vra_utils.prettify_keys([format_result(elt, prettify=False) for elt in raw_results])
+
+
+class LazyResource(Mapping):
+    """Read-only mapping over a raw vRa resource, formatting each field only when it's accessed
+
+    Keys and values are the same as the ones of format_result(), but only the keys are computed at creation.
+    Values are parsed on first access, and kept.
+
+    Attributes:
+        raw_result (dict): raw data of vRa infrastructure
+    """
+
+    def __init__(self, raw_result):
+        """Init LazyResource
+
+        Args:
+            raw_result (dict): raw data of vRa infrastructure when getting data
+        """
+
+        self.raw_result = raw_result
+        # map of key to vRa entry to parse, or to None if the value is already known
+        self.index = {}
+        self.parsed = {}
+
+        sources = {}
+        for field in ('id', 'name', 'status', 'lease', 'description'):
+            if field in raw_result:
+                sources[field] = (None, raw_result[field])
+        if 'organization' in raw_result:
+            sources['business_group'] = (None, {'id': raw_result['organization']['subtenantRef'],
+                                                'label': raw_result['organization']['subtenantLabel']})
+
+        value_to_iter_on = "values" if "values" in raw_result else "resourceData"
+        for elt in raw_result[value_to_iter_on]["entries"]:
+            key_clean = elt['key'].replace('provider-', '')
+            if elt["value"] is not None and (key_clean not in sources or key_clean == "description"):
+                sources[key_clean] = (elt, None)
+
+        for key, (elt, value) in sources.items():
+            key = vra_utils.to_snake_case(key)
+            self.index[key] = elt
+            if elt is None:
+                self.parsed[key] = value
+            else:
+                self.parsed.pop(key, None)
+
+    def __getitem__(self, key):
+        if key in self.parsed:
+            return self.parsed[key]
+        value = parse_key(self.index[key])[1]
+        self.parsed[key] = value
+        return value
+
+    def __contains__(self, key):
+        return key in self.index
+
+    def __iter__(self):
+        return iter(self.index)
+
+    def __len__(self):
+        return len(self.index)
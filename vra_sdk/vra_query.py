@@ -0,0 +1,275 @@
+# -*- coding: utf-8 -*-
+import re
+from vra_sdk.vra_exceptions import VraSdkQueryException
+
+# formatted resource keys vRa can filter on, and their OData name
+SERVER_KEYS = {'id': 'id', 'name': 'name', 'description': 'description', 'status': 'status'}
+
+# operators vRa can evaluate in an OData filter
+SERVER_OPERATORS = ('eq', 'ne', 'gt', 'lt', 'ge', 'le', 'startswith', 'substringof')
+
+CLIENT_OPERATORS = {
+    'eq': lambda field, value: field == value,
+    'ne': lambda field, value: field != value,
+    'gt': lambda field, value: field is not None and field > value,
+    'lt': lambda field, value: field is not None and field < value,
+    'ge': lambda field, value: field is not None and field >= value,
+    'le': lambda field, value: field is not None and field <= value,
+    'startswith': lambda field, value: field is not None and str(field).startswith(value),
+    'substringof': lambda field, value: field is not None and value in str(field),
+    'match': lambda field, pattern: field is not None and pattern.match(str(field)) is not None,
+}
+
+
+def format_value(value):
+    """Format a value for an OData filter
+
+    Args:
+        value (string, int, float or bool): value to format
+
+    Returns:
+        string: OData value, strings being quoted
+    """
+
+    if isinstance(value, bool):
+        return str(value).lower()
+    if isinstance(value, (int, float)):
+        return str(value)
+    return "'" + str(value).replace("'", "''") + "'"
+
+
+class VraFilter():
+    """Condition on one field of a vRa resource
+
+    Attributes:
+        key (string): formatted field name (as in the business model objects)
+        operator (string): one of eq, ne, gt, lt, ge, le, startswith, substringof or match (regex, client side only)
+        value (string, int, float or bool): value to compare the field with
+        pattern (re.Pattern): compiled value of the match operator, None for the other operators
+    """
+
+    def __init__(self, key, operator, value):
+        """Init VraFilter
+
+        Args:
+            key (string): formatted field name
+            operator (string): comparison operator
+            value (string, int, float or bool): value to compare the field with
+
+        Raises:
+            VraSdkQueryException: Unknown operator
+        """
+
+        if operator not in CLIENT_OPERATORS:
+            raise VraSdkQueryException(
+                f"Unknown filter operator {operator}, must be one of {', '.join(CLIENT_OPERATORS)}")
+        self.key = key
+        self.operator = operator
+        self.value = value
+        # regex of the match operator, compiled once for every resource
+        self.pattern = re.compile(value) if operator == 'match' else None
+
+    def to_odata(self):
+        """Get the OData filter of the condition
+
+        Returns:
+            string: OData filter, None if vRa can't evaluate this condition
+        """
+
+        if self.key not in SERVER_KEYS or self.operator not in SERVER_OPERATORS:
+            return None
+
+        key = SERVER_KEYS[self.key]
+        value = format_value(self.value)
+        if self.operator == 'startswith':
+            return f"startswith({key},{value})"
+        if self.operator == 'substringof':
+            return f"substringof({value},{key})"
+        return f"({key}+{self.operator}+{value})"
+
+    def split(self):
+        """Split the condition between the part vRa evaluates and the part to evaluate on the results
+
+        Returns:
+            tuple: OData filter (None if nothing to push), condition to evaluate client side (None if nothing left)
+        """
+
+        odata = self.to_odata()
+        return (odata, None) if odata else (None, self)
+
+    def matches(self, resource):
+        """Evaluate the condition against a formatted resource
+
+        Args:
+            resource (dict or LazyResource): formatted vRa resource
+
+        Returns:
+            bool: True if the resource matches
+        """
+
+        try:
+            value = self.pattern if self.pattern is not None else self.value
+            return CLIENT_OPERATORS[self.operator](resource.get(self.key), value)
+        except TypeError:
+            return False
+
+
+class VraQuery():
+    """Combination of conditions on vRa resources, and their order
+
+    Conditions vRa can evaluate are sent in the OData filter of the listing, the other ones are evaluated on the results.
+
+    Attributes:
+        operator (string): and/or
+        conditions (list): VraFilter or nested VraQuery
+        order_by (string): OData order of the results (eg: "name" or "dateCreated desc")
+    """
+
+    def __init__(self, operator, conditions, order_by=None):
+        """Init VraQuery
+
+        Args:
+            operator (string): and/or
+            conditions (list): VraFilter or nested VraQuery
+            order_by (string, optional): Defaults to None. OData order of the results
+
+        Raises:
+            VraSdkQueryException: Unknown operator
+        """
+
+        if operator not in ('and', 'or'):
+            raise VraSdkQueryException(f"Unknown query operator {operator}, must be and/or")
+        self.operator = operator
+        self.conditions = list(conditions)
+        self.order_by = order_by
+
+    @classmethod
+    def from_dict(cls, definition):
+        """Create a query from its configuration file definition
+
+        Args:
+            definition (dict): {"all": [...]} or {"any": [...]}, with an optional "order_by".
+                Conditions are [key, operator, value] lists or nested definitions
+
+        Raises:
+            VraSdkQueryException: Invalid definition
+
+        Returns:
+            VraQuery: query object
+        """
+
+        try:
+            operator = 'and' if 'all' in definition else 'or'
+            conditions = []
+            for elt in definition['all' if operator == 'and' else 'any']:
+                if isinstance(elt, dict):
+                    conditions.append(cls.from_dict(elt))
+                else:
+                    conditions.append(VraFilter(*elt))
+        except VraSdkQueryException:
+            raise
+        except Exception as e:
+            raise VraSdkQueryException(f"Invalid query definition {definition}: {e}")
+
+        return cls(operator, conditions, definition.get('order_by'))
+
+    def split(self):
+        """Split the query between the part vRa evaluates and the part to evaluate on the results
+
+        An 'and' query sends every condition vRa can evaluate, an 'or' query is sent only if vRa can evaluate it entirely.
+
+        Returns:
+            tuple: OData filter (None if nothing to push), query to evaluate client side (None if nothing left)
+        """
+
+        parts = [condition.split() for condition in self.conditions]
+        server = [odata for odata, _ in parts if odata]
+        client = [condition for _, condition in parts if condition]
+
+        if self.operator == 'or' and client:
+            return None, self
+        odata = "(" + f"+{self.operator}+".join(server) + ")" if server else None
+        remaining = VraQuery(self.operator, client) if client else None
+        return odata, remaining
+
+    def matches(self, resource):
+        """Evaluate the query against a formatted resource
+
+        Args:
+            resource (dict or LazyResource): formatted vRa resource
+
+        Returns:
+            bool: True if the resource matches
+        """
+
+        if self.operator == 'and':
+            return all(condition.matches(resource) for condition in self.conditions)
+        return any(condition.matches(resource) for condition in self.conditions)
+
+
+def where(key, operator, value):
+    """Create a condition on one field of a vRa resource
+
+    Args:
+        key (string): formatted field name (as in the business model objects)
+        operator (string): one of eq, ne, gt, lt, ge, le, startswith, substringof or match
+        value (string, int, float or bool): value to compare the field with
+
+    Returns:
+        VraFilter: condition
+    """
+
+    return VraFilter(key, operator, value)
+
+
+def all_of(*conditions, order_by=None):
+    """Create a query matching resources matching all the conditions
+
+    Args:
+        conditions (VraFilter or VraQuery): conditions to combine
+        order_by (string, optional): Defaults to None. OData order of the results
+
+    Returns:
+        VraQuery: query object
+    """
+
+    return VraQuery('and', conditions, order_by)
+
+
+def any_of(*conditions, order_by=None):
+    """Create a query matching resources matching at least one of the conditions
+
+    Args:
+        conditions (VraFilter or VraQuery): conditions to combine
+        order_by (string, optional): Defaults to None. OData order of the results
+
+    Returns:
+        VraQuery: query object
+    """
+
+    return VraQuery('or', conditions, order_by)
+
+
+def get_query(config_file, query):
+    """Get a query object, from a named filter of the configuration file if needed
+
+    Args:
+        config_file (dict): content of the configuration file
+        query (string, VraFilter or VraQuery): query object, or name of a filter of the 'filters' configuration section
+
+    Raises:
+        VraSdkQueryException: Unknown filter name
+
+    Returns:
+        VraQuery: query object, None if query is None
+    """
+
+    if query is None or isinstance(query, VraQuery):
+        return query
+    if isinstance(query, VraFilter):
+        return VraQuery('and', [query])
+
+    filters = config_file.get('filters', {})
+    if query not in filters:
+        raise VraSdkQueryException(f"Unknown filter {query}, have you declared it in the filters section of your configuration file?")
+    return VraQuery.from_dict(filters[query])
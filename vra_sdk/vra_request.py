@@ -5,37 +5,50 @@ import re
 import json
 import time
 import importlib
-from vra_sdk.vra_formatter import format_result
-from vra_sdk.vra_utils import get_module_class
+from vra_sdk.vra_formatter import format_result, format_results, LazyResource
+from vra_sdk.vra_utils import get_module_class, run_concurrently, polling_delays
 from vra_sdk.vra_authenticate import VraConfig
 from vra_sdk.vra_factory import VraFactory
-from vra_sdk.vra_exceptions import VraSdkConfigException, VraSdkRequestException, VraSdkMainRequestException
+from vra_sdk.vra_query import get_query, SERVER_KEYS
+from vra_sdk.vra_exceptions import VraSdkConfigException, VraSdkRequestException, VraSdkMainRequestException, \
+    VraSdkRequestTimeoutException, VraSdkEntitlementException
+
+# vRa request states after which the status won't change anymore
+FINAL_STATES = ('SUCCESSFUL', 'PARTIALLY_SUCCESSFUL', 'FAILED', 'PROVIDER_FAILED',
+                'REJECTED', 'APPROVAL_REJECTED', 'POST_APPROVAL_REJECTED', 'CANCELLED')
 
 
 class VraRequest():
     """Handle getting data from vRa infrastructure as well as catalog item/resource action request
 
     Attributes:
-        config (VraConfig): VraConfig object
+        config (VraConfig or VraContext): configuration and session to use
         Payload (vra_payload_x.CatalogItem or vra_payload_x.ResourceAction): Payload object
         status_url (string): url to get the status of the current request
         response (requests.Response): request response
+        metadata (dict): paging metadata of the last resources listing (size, totalElements, totalPages, number, offset)
+        on_entitlement_error (function): function called when vRa refuses the request for entitlement reason
     """
 
-    def __init__(self, payload, **kwargs):
+    def __init__(self, payload, context=None, on_entitlement_error=None, **kwargs):
         """Init the VraRequest object
         
         Args:
             payload (CatalogItem or ResourceAction): payload object
+            context (VraContext, optional): Defaults to None. client context to use. If None, the VraConfig singleton is used
+            on_entitlement_error (function, optional): Defaults to None. function called without argument when vRa refuses the request
+                for entitlement reason (eg: VraSdk.invalidate_cache)
         """
 
         urllib3.disable_warnings()
-        self.config = VraConfig()
+        self.config = context or VraConfig()
         self.payload = payload
+        self.on_entitlement_error = on_entitlement_error
         self.status_url = 'not set'
         self.response = None
+        self.metadata = {}
 
-    def format_filters(self, object_type, key, value, resource_type=None):
+    def format_filters(self, object_type, key, value, resource_type=None, query=None):
         """Handle generation of OData url filter
         
         Args:
@@ -43,6 +56,7 @@ class VraRequest():
             key (string): field to filter from
             value (string): value of the field to filter
             resource_type (string, optional): Defaults to None. Use only for get_raw_definitions(), use to create a filter without defintions
+            query (VraQuery, optional): Defaults to None. Query whose conditions vRa can evaluate are added to the filter
         
         Returns:
             string: Odata filter
@@ -74,6 +88,11 @@ class VraRequest():
         if key and value:
             filters_array.append("(" + key + "+eq+'" + value + "')")
 
+        if query is not None:
+            server_filter, _ = query.split()
+            if server_filter:
+                filters_array.append(server_filter)
+
         result = "$filter=" + \
             "(" + "+and+".join(filters_array) + ")" if filters_array else None
         return result
@@ -100,33 +119,91 @@ class VraRequest():
     def execute_async(self):
         """Execute the self.payload object execute_request() method. Set the status_url if there's one in the vRa answer.
         
+        Raises:
+            VraSdkEntitlementException: vRa refused the request for entitlement reason, on_entitlement_error has been called
+
         Returns:
             self: VraRequest
         """
 
-        self.response = self.payload.execute_request()
+        try:
+            self.response = self.payload.execute_request()
+        except VraSdkEntitlementException:
+            if self.on_entitlement_error:
+                self.on_entitlement_error()
+            raise
         if hasattr(self.response, 'headers'):
             self.status_url = self.response.headers.get(
                 'Location', 'NoLocationFound')
 
         return self
 
+    def wait(self):
+        """Poll the status of the request until it reaches a final state
+
+        The status is requested once per tick, ticks being spaced according to the polling configuration
+
+        Raises:
+            VraSdkRequestTimeoutException: The request is still running after the polling timeout
+
+        Returns:
+            string: final vRa status state
+        """
+
+        delays = polling_delays(**self.config.polling)
+        while True:
+            status = self.get_status()
+            if status in FINAL_STATES:
+                return status
+            delay = next(delays, None)
+            if delay is None:
+                raise VraSdkRequestTimeoutException(
+                    f'Request {self.status_url} still in state {status} after polling timeout')
+            time.sleep(delay)
+
     def execute_sync(self):
-        """wrapper of execute_async and retry it until the result if successful or failed
+        """wrapper of execute_async and wait until the result is successful or failed
         
+        Raises:
+            VraSdkMainRequestException: Request failed
+            VraSdkRequestTimeoutException: The request is still running after the polling timeout
+
         Returns:
             self: VraRequest
         """
 
         self.execute_async()
-        while self.get_status() != 'SUCCESSFUL' and self.get_status() != 'PROVIDER_FAILED':
-            time.sleep(3)
-        if self.get_status() != 'SUCCESSFUL':
-            raise VraSdkMainRequestException('Request failed')
-        else:
-            return self
+        status = self.wait()
+        if status != 'SUCCESSFUL':
+            raise VraSdkMainRequestException(f'Request failed with state {status}')
+        return self
+
+    def listing_url(self, object_type, key, value, limit, page, resource_type=None, query=None):
+        """Build the url to list catalog resources
+
+        Args:
+            object_type (string): type of vRa resource to get data on
+            key (string): field to search for
+            value (string): value of the field
+            limit (int): maximum result per page
+            page (int): page to get from result.
+            resource_type (string, optional): Defaults to None. Only used for get_raw_definitions()
+            query (VraQuery, optional): Defaults to None. Query to filter and order the resources with
+
+        Returns:
+            string: listing url
+        """
 
-    def get_object_raw(self, object_type, key, value, limit, page, full=False, resource_type=None):
+        url_array = ["limit=" + str(limit), "page=" + str(page)]
+        filters = self.format_filters(object_type, key, value, resource_type, query)
+        if filters:
+            url_array.append(filters)
+        if query is not None and query.order_by:
+            url_array.append("$orderby=" + query.order_by.replace(' ', '+'))
+        amp = "&"
+        return f"https://{self.config.vcac_server}/catalog-service/api/consumer/resources/?{amp.join(url_array)}"
+
+    def get_object_raw(self, object_type, key, value, limit, page, full=False, resource_type=None, query=None):
         """Get raw catalog resource information from vRa infrastructure
         
         Args:
@@ -137,22 +214,18 @@ class VraRequest():
             page (int): page to get from result.
             full (bool): If True return the full result
             resource_type (string, optional): Defaults to None. Only used for get_raw_definitions()
+            query (VraQuery, optional): Defaults to None. Query to filter and order the resources with
         
         Returns:
             dict: raw vRa data
         """
 
-        
-        #url_array = [f"limit={str(limit)}",f'page={str(page)}']
-        url_array = ["limit=" + str(limit), "page=" + str(page)]
-        filters = self.format_filters(object_type, key, value, resource_type)
-        if filters:
-            url_array.append(filters)
-        amp = "&"
-        url = f"https://{self.config.vcac_server}/catalog-service/api/consumer/resources/?{amp.join(url_array)}"
+        url = self.listing_url(object_type, key, value, limit, page, resource_type, query)
         try:
-            req = self.config.session.get(
-                url, verify=self.config.verify, timeout=self.config.timeout)
+            # bounds the requests in flight, whatever the nesting of the thread pools (eg: pages and their resources)
+            with self.config.request_semaphore:
+                req = self.config.session.get(
+                    url, verify=self.config.verify, timeout=self.config.timeout)
             req.raise_for_status()
         except requests.exceptions.RequestException as e:
             raise VraSdkRequestException(
@@ -162,6 +235,7 @@ class VraRequest():
                 f'Unmanaged error requesting vRa: {e}')
 
         res = req.json()
+        self.metadata = res.get('metadata', {})
 
         if (not object_type and resource_type) or full:
             ids = []
@@ -171,27 +245,36 @@ class VraRequest():
             else:
                 ids.append(value)
 
-            result = []
-            for id in ids:
-                url = f"https://{self.config.vcac_server}/catalog-service/api/consumer/resources/{id}"
-                try:
-                    req = self.config.session.get(
-                        url, verify=self.config.verify, timeout=self.config.timeout)
-                    req.raise_for_status()
-                except requests.exceptions.RequestException as e:
-                    raise VraSdkRequestException(
-                        f'vRa request exception : {e}')
-                except Exception as e:
-                    raise VraSdkMainRequestException(
-                        f'Unmanaged error requesting vRa: {e}')
-
-                res = req.json()
-                result.append(res)
-            return result
+            return run_concurrently(self.get_resource_raw, ids, self.config.max_concurrent_requests)
         else:
             return res['content'] if 'content' in res else []
 
-    def get_object(self, object_type, key, value, limit, page, full=False, resource_type=None):
+    def get_resource_raw(self, resource_id):
+        """Get the full raw data of one catalog resource from vRa infrastructure
+
+        Args:
+            resource_id (string): id of the catalog resource
+
+        Returns:
+            dict: raw vRa data
+        """
+
+        url = f"https://{self.config.vcac_server}/catalog-service/api/consumer/resources/{resource_id}"
+        try:
+            with self.config.request_semaphore:
+                req = self.config.session.get(
+                    url, verify=self.config.verify, timeout=self.config.timeout)
+            req.raise_for_status()
+        except requests.exceptions.RequestException as e:
+            raise VraSdkRequestException(
+                f'vRa request exception : {e}')
+        except Exception as e:
+            raise VraSdkMainRequestException(
+                f'Unmanaged error requesting vRa: {e}')
+
+        return req.json()
+
+    def get_object(self, object_type, key, value, limit, page, full=False, resource_type=None, raw_data=True, fields=None, query=None):
         """Get raw_data from get_raw_object() and prettify it to then create a list of object using the factory and these data.
         
         Args:
@@ -201,30 +284,105 @@ class VraRequest():
             limit (int): maximum result per page
             page (int): page to get from result.
             resource_type (string, optional): Defaults to None. Only used for get_raw_definitions()
+            raw_data (bool, optional): Defaults to True. If False, the raw_data attribute of the objects is not set
+            fields (list, optional): Defaults to None. If set, only these fields are formatted and set on the objects
+            query (string, VraFilter or VraQuery, optional): Defaults to None. Query to filter and order the resources with, or name of a filter of the configuration file
         
         Returns:
             list: list of object type as defined in the business_models configuration section 
         """
 
+        query = get_query(self.config.config_file, query)
+        raw_result = self.get_object_raw(object_type, key, value, limit, page, full, resource_type, query)
+        return self.build_objects(object_type, key, value, raw_result, resource_type, raw_data, fields, query)
+
+    def build_objects(self, object_type, key, value, raw_result, resource_type=None, raw_data=True, fields=None, query=None):
+        """Prettify raw vRa data and create a list of object using the factory and these data.
+
+        Args:
+            object_type (string): type of vRa resource to create
+            key (string): field to search for
+            value (string): value of the field
+            raw_result (list): raw vRa data as returned by get_object_raw()
+            resource_type (string, optional): Defaults to None. Only used for get_raw_definitions()
+            raw_data (bool, optional): Defaults to True. If False, the raw_data attribute of the objects is not set
+            fields (list, optional): Defaults to None. If set, only these fields are formatted and set on the objects
+            query (VraQuery, optional): Defaults to None. Query whose conditions vRa can't evaluate are checked on the results
+
+        Returns:
+            list: list of object type as defined in the business_models configuration section
+        """
+
+        matches = self.filter_plan(key, value, query)
+        if fields is not None and resource_type is None:
+            return self.build_lazy_objects(object_type, raw_result, raw_data, fields, matches)
+
         result = []
-        object_result = []
-        raw_data = self.get_object_raw(object_type, key, value, limit, page, full, resource_type)
         # Contruct dict of result without raw_data
-        if raw_data is not None:
-            for elt in raw_data:
-                result.append(format_result(elt))
-            if key and value:
-                result = [obj for obj in result if re.match(
-                    value, obj.get(key, ""))]
+        if raw_result is not None:
+            if matches is not None:
+                raw_result = [elt for elt in raw_result if matches(LazyResource(elt))]
+            result = format_results(raw_result)
         if resource_type is not None:
             return result
 
-        # Adding raw_data and contruct object array
+        # Contruct object array, with raw_data if needed
         if result:
-            for i, elt in enumerate(result):
-                elt['raw_data'] = raw_data[i]
-                object_result.append(VraFactory.factory(object_type, **elt))
-            return object_result
+            return list(VraFactory.factory_many(object_type, result, raw_result if raw_data else None))
+
+    def filter_plan(self, key, value, query=None):
+        """Build the filter to apply on the raw vRa data, for the conditions vRa has not already evaluated
+
+        A key filter on a field vRa knows (see vra_query.SERVER_KEYS) is an exact match done by vRa, so it's not checked again.
+        Otherwise the value is a regex, compiled once for the whole result.
+
+        Args:
+            key (string): field to search for
+            value (string): value of the field
+            query (VraQuery, optional): Defaults to None. Query whose conditions vRa can't evaluate are checked on the results
+
+        Returns:
+            function: function taking a LazyResource and returning True if it must be kept, None if there's nothing to check
+        """
+
+        conditions = []
+        if key and value and key not in SERVER_KEYS:
+            match = re.compile(value).match
+            conditions.append(lambda resource: match(resource.get(key, "")) is not None)
+        if query is not None:
+            _, client_query = query.split()
+            if client_query is not None:
+                conditions.append(client_query.matches)
+
+        if not conditions:
+            return None
+        if len(conditions) == 1:
+            return conditions[0]
+        return lambda resource: all(condition(resource) for condition in conditions)
+
+    def build_lazy_objects(self, object_type, raw_result, raw_data, fields, matches=None):
+        """Create a list of object from raw vRa data, formatting only the requested fields (and the filtered ones)
+
+        Args:
+            object_type (string): type of vRa resource to create
+            raw_result (list): raw vRa data as returned by get_object_raw()
+            raw_data (bool): If False, the raw_data attribute of the objects is not set
+            fields (list): fields to format and set on the objects
+            matches (function, optional): Defaults to None. filter returned by filter_plan()
+
+        Returns:
+            list: list of object type as defined in the business_models configuration section
+        """
+
+        resources = [LazyResource(elt) for elt in raw_result or []]
+        if matches is not None:
+            resources = [resource for resource in resources if matches(resource)]
+
+        object_result = []
+        for resource in resources:
+            kwargs = {'raw_data': resource.raw_result} if raw_data else {}
+            object_result.append(VraFactory.factory_from_resource(object_type, resource, fields, **kwargs))
+        return object_result or None
 
     def get_request_result_raw(self):
         """Request vRa to get the status of a specific request based on the status_url
@@ -6,16 +6,44 @@ import os
 import os.path
 import time
 import urllib3
-from vra_sdk.vra_request import VraRequest
+from vra_sdk.vra_request import VraRequest, FINAL_STATES
 from vra_sdk import vra_decorator, vra_utils
+from vra_sdk.vra_utils import run_concurrently, polling_delays
 from vra_sdk.vra_config import VraConfig
-from vra_sdk.vra_exceptions import VraSdkMainException, VraSdkRequestException
+from vra_sdk.vra_exceptions import VraSdkMainException, VraSdkRequestException, VraSdkMainRequestException, \
+    VraSdkRequestTimeoutException
 from vra_sdk.vra_factory import VraFactory
+from vra_sdk.vra_entitlement import VraEntitlementIndex
+from vra_sdk.models import vra_payload_7
+
+
+def get_context(authentication_object, context=None):
+    """Get the client context of a VraSdk object, which is the one of its authentication object
+
+    Args:
+        authentication_object (VraAuthenticate): authentication object
+        context (VraContext, optional): Defaults to None. context explicitly given to the VraSdk object
+
+    Raises:
+        VraSdkMainException: The context is not the one of the authentication object
+
+    Returns:
+        VraContext: client context, None for the VraConfig singleton
+    """
+
+    auth_context = getattr(authentication_object, 'context', None)
+    if context is not None and context is not auth_context:
+        raise VraSdkMainException(
+            'The context must be the one the authentication object has been created with')
+    return auth_context
 
 
 class VraSdk():
     """Core class of the library.
 
+    The catalog and the business group id are loaded lazily, on first use, from a single request against vRa.
+    If a cache is configured, they are kept on disk between executions.
+
     Attributes:
         config (VraConfig): VraConfig object
         business_group (string): current business group name
@@ -23,20 +51,28 @@ class VraSdk():
         catalog (dict): map of catalog item/resource action to related vRa id
     """
 
-    def __init__(self, authentication_object, business_group, **kwargs):
+    def __init__(self, authentication_object, business_group, context=None, **kwargs):
         """Init the VraSdk object
+
+        No request is performed against vRa here
         
         Args:
             authentication_object (VraAuthenticate): authentication object
             business_group (string): business group to work on
+            context (VraContext, optional): Defaults to None. client context to use, which must be the one of the authentication object.
+                If None, the context of the authentication object is used
+
+        Raises:
+            VraSdkMainException: The context is not the one of the authentication object
         """
 
         urllib3.disable_warnings()
         self.authentication_object = authentication_object
-        self.config = VraConfig()
-        self.business_group_id = ''
+        self.context = get_context(authentication_object, context)
+        self.config = self.context or VraConfig()
+        self._entitlement_index = None
+        self._catalog = None
         self.business_group = business_group
-        self.catalog = self.get_catalog()
 
     @property
     def business_group(self):
@@ -45,77 +81,204 @@ class VraSdk():
 
     @business_group.setter
     def business_group(self, value):
-        """property to set business group name and update the business group id
+        """property to set business group name. The business group id and catalog will be resolved on first use
         
         Args:
             value (string): business group name to set
         """
 
-        self.business_group_id = self.get_bg_id(value)
+        self._business_group_id = ''
+        self._catalog = None
         self._business_group = value
 
-    def get_bg_id(self, business_group, force_refresh=False):
-        """get business group id against vRa infrastructure
-        
+    @property
+    def business_group_id(self):
+        """property to get business group id, resolved against vRa (or the cache) on first access"""
+        if not self._business_group_id:
+            self._business_group_id = self.get_cached_value(
+                'business_group_id', lambda: self.get_bg_id(self.business_group))
+        return self._business_group_id
+
+    @business_group_id.setter
+    def business_group_id(self, value):
+        self._business_group_id = value
+
+    @property
+    def catalog(self):
+        """property to get the catalog of the business group, loaded from vRa (or the cache) on first access"""
+        if self._catalog is None:
+            self._catalog = self.get_cached_value('catalog', self.get_catalog)
+        return self._catalog
+
+    @catalog.setter
+    def catalog(self, value):
+        self._catalog = value
+
+    def cache_key(self):
+        """Key of the cache entry of this business group
+
+        Returns:
+            tuple: vcac server, tenant, login and business group
+        """
+
+        return (self.config.vcac_server,
+                getattr(self.authentication_object, 'tenant', None),
+                self.authentication_object.login,
+                self.business_group)
+
+    def read_cache(self):
+        """Read the cache entry of this business group
+
+        Returns:
+            dict: cached entry, empty if there's no cache configured or no valid entry
+        """
+
+        if not self.config.cache:
+            return {}
+        return self.config.cache.get(self.cache_key()) or {}
+
+    def write_cache(self, entry):
+        """Write the cache entry of this business group, if a cache is configured
+
         Args:
-            business_group (string): business group name
-            force_refresh (bool, optional): Defaults to False. force the refresh of the business group id
-        
+            entry (dict): entry to write
         """
 
-        if not self.business_group_id or force_refresh:
-            try:
-                req = self.config.session.get(
-                    f"https://{self.config.vcac_server}/catalog-service/api/consumer/entitledCatalogItems?limit=998",
-                    verify=self.config.verify, timeout=self.config.timeout)
-                req.raise_for_status()
-                response = json.loads(req.text)
-            except requests.exceptions.RequestException as e:
-                raise VraSdkRequestException(
-                    f"Error getting business group id for bg {self.business_group}: {e}")
-            except Exception as e:
-                raise VraSdkMainException(e)
+        if self.config.cache:
+            self.config.cache.set(self.cache_key(), entry)
 
-            if 'content' in response:
-                for catalog_item in response['content']:
-                    for elt in catalog_item['entitledOrganizations']:
-                        if elt["subtenantLabel"] == business_group:
-                            return elt['subtenantRef']
-                raise VraSdkMainException(
-                    f'No entitlement for the account {self.authentication_object.login} in business group {business_group}')
-            else:
-                raise VraSdkMainException(
-                    f'Unable get bg id list. No entitled catalog item for account {self.authentication_object.login}')
+    def get_cached_value(self, field, loader):
+        """Get a field of the cache entry of this business group, loading and storing it if missing
+
+        Args:
+            field (string): field of the entry
+            loader (function): function returning the value of the field from vRa
 
-    def get_catalog(self):
-        """Get the catalog item list from the vRa infrastructure
-        
         Returns:
-            dict: map of catalog item to vRa id
+            object: value of the field
+        """
+
+        entry = self.read_cache()
+        if field not in entry:
+            entry[field] = loader()
+            self.write_cache(entry)
+        return entry[field]
+
+    def invalidate_cache(self):
+        """Drop the cache entry of this business group, and the data loaded from it.
+
+        Called when an entitlement error could be due to outdated cached data. Does nothing if there's no cache configured
+
+        Returns:
+            bool: True if the data has been dropped
+        """
+
+        if not self.config.cache:
+            return False
+        self.config.cache.invalidate(self.cache_key())
+        self._entitlement_index = None
+        self._catalog = None
+        self._business_group_id = ''
+        return True
+
+    def get_entitled_items(self):
+        """Get the entitled catalog items from the vRa infrastructure.
+
+        Raises:
+            VraSdkRequestException: Raised if any Requests error
+            VraSdkMainException: No entitled catalog item in the vRa answer
+
+        Returns:
+            list: entitled catalog items as returned by vRa
         """
 
-        catalog = {}
         try:
             req = self.config.session.get(
                 f"https://{self.config.vcac_server}/catalog-service/api/consumer/entitledCatalogItems?limit=9999",
                 verify=self.config.verify,
                 timeout=self.config.timeout)
             req.raise_for_status()
+            response = json.loads(req.text)
         except requests.exceptions.RequestException as e:
             raise VraSdkRequestException(
-                f'Error during retrieving catalog item: {e}')
+                f'Error during retrieving entitled catalog items: {e}')
         except Exception as e:
             raise VraSdkMainException(
-                f'Unmanaged error during catalog retrieving: {e}')
+                f'Unmanaged error during entitled catalog items retrieving: {e}')
 
-        try:
-            for elt in json.loads(req.text)['content']:
-                catalog[elt['catalogItem']['name']] = elt['catalogItem']['id']
-        except Exception as e:
+        if 'content' not in response:
+            raise VraSdkMainException(
+                f'Unable get entitled catalog items for account {self.authentication_object.login}')
+        return response['content']
+
+    def get_entitlement_index(self, force_refresh=False):
+        """Get the index of the entitled catalog items.
+
+        The index is built once from a single vRa request, and shared by get_catalog() and get_bg_id()
+
+        Args:
+            force_refresh (bool, optional): Defaults to False. force a new request against vRa
+
+        Raises:
+            VraSdkMainException: Error building the index
+
+        Returns:
+            VraEntitlementIndex: index of the entitled catalog items
+        """
+
+        if self._entitlement_index is None or force_refresh:
+            entitled_items = self.get_entitled_items()
+            try:
+                self._entitlement_index = VraEntitlementIndex(entitled_items)
+            except Exception as e:
+                raise VraSdkMainException(
+                    f'Error indexing the entitled catalog items {e}')
+        return self._entitlement_index
+
+    def get_bg_id(self, business_group, force_refresh=False):
+        """get business group id against vRa infrastructure
+        
+        Args:
+            business_group (string): business group name
+            force_refresh (bool, optional): Defaults to False. force the refresh of the entitled catalog items
+
+        Returns:
+            string: business group id
+        """
+
+        return self.find_bg_id(self.get_entitlement_index(force_refresh), business_group)
+
+    def find_bg_id(self, entitlement_index, business_group):
+        """Find a business group id in the index of the entitled catalog items
+
+        Args:
+            entitlement_index (VraEntitlementIndex): index of the entitled catalog items
+            business_group (string): business group name
+
+        Raises:
+            VraSdkMainException: No entitlement in this business group
+
+        Returns:
+            string: business group id
+        """
+
+        business_group_id = entitlement_index.get_bg_id(business_group)
+        if not business_group_id:
             raise VraSdkMainException(
-                f'Error updating the catalog attribute {e}')
+                f'No entitlement for the account {self.authentication_object.login} in business group {business_group}')
+        return business_group_id
 
-        return catalog
+    def get_catalog(self, force_refresh=False):
+        """Get the catalog item list of the business group from the vRa infrastructure
+        
+        Args:
+            force_refresh (bool, optional): Defaults to False. force the refresh of the entitled catalog items
+
+        Returns:
+            dict: map of catalog item to vRa id
+        """
+
+        return self.get_entitlement_index(force_refresh).get_catalog(self.business_group)
 
     @vra_decorator.check_entitlement
     def request_catalog_item(self, item_name, customization_func=None, **kwargs):
@@ -133,7 +296,7 @@ class VraSdk():
             kwargs['payload_version'] = self.config.config_file['payload_default_version']
         payload = self.format_payload(
             'catalog_item', item_name, customization_func, **kwargs)
-        return VraRequest(payload)
+        return VraRequest(payload, context=self.context, on_entitlement_error=self.invalidate_cache)
 
     @vra_decorator.update_catalog_resource_operation
     @vra_decorator.check_entitlement
@@ -152,7 +315,7 @@ class VraSdk():
             kwargs['payload_version'] = self.config.config_file['payload_default_version']
         payload = self.format_payload(
             'resource_action', action_name, resource_id, customization_func, **kwargs)
-        return VraRequest(payload)
+        return VraRequest(payload, context=self.context, on_entitlement_error=self.invalidate_cache)
 
     def format_payload(self, origin, *args, **kwargs):
         """Customized request kwargs before using it in the VraFactory class to create a payload object
@@ -168,6 +331,7 @@ class VraSdk():
         kwargs['business_group_name'] = self.business_group
         kwargs['business_group_id'] = self.business_group_id
         kwargs['tenant_name'] = self.authentication_object.tenant
+        kwargs['context'] = self.context
 
         if args[0] in self.config.config_file[origin] and self.config.config_file[origin][args[0]].get('payload'):
             kwargs['payload_path'] = self.config.config_file[origin][args[0]].get(
@@ -187,19 +351,103 @@ class VraSdk():
 
         return VraFactory.factory('payload', customization_func, **kwargs)
 
-    def get_data(self, object_type, key, value):
+    def warm_templates(self, item_names):
+        """Load concurrently the vRa 7.x payload templates of several catalog items in the template cache
+
+        Catalog items with a payload file defined in the configuration file are skipped
+
+        Args:
+            item_names (list): catalog item names
+        """
+
+        catalog_item_ids = [self.catalog[name] for name in item_names
+                            if not self.config.config_file['catalog_item'].get(name, {}).get('payload')]
+        run_concurrently(lambda catalog_item_id: vra_payload_7.get_catalog_item_template(catalog_item_id, self.context),
+                         catalog_item_ids, self.config.max_concurrent_requests)
+
+    def execute_many(self, vra_requests):
+        """Execute several requests and wait for the end of all of them
+
+        The requests are submitted concurrently (up to max_concurrent_requests at a time).
+        Then their status are polled together, round-robin, once per tick as configured in the polling configuration field.
+        An error getting the status of a request (eg: timeout, 5xx) doesn't stop its polling, since it may still be running on vRa.
+
+        Args:
+            vra_requests (list): VraRequest objects to execute, as returned by request_catalog_item() or request_resource_action()
+
+        Returns:
+            dict: map of each request to None if it's successful, or to the exception explaining its failure.
+                A request still running after the polling timeout maps to the error of its last status poll if it failed,
+                or to a VraSdkRequestTimeoutException
+        """
+
+        vra_requests = list(vra_requests)
+        results = dict.fromkeys(vra_requests)
+        # error of the last status poll of each request, if it failed
+        poll_errors = {}
+
+        def submit(request):
+            try:
+                request.execute_async()
+            except Exception as e:
+                return e
+
+        def poll(request):
+            try:
+                return request.get_status()
+            except Exception as e:
+                return e
+
+        errors = run_concurrently(submit, vra_requests, self.config.max_concurrent_requests)
+        pending = []
+        for request, error in zip(vra_requests, errors):
+            if error:
+                results[request] = error
+            else:
+                pending.append(request)
+
+        delays = polling_delays(**self.config.polling)
+        while pending:
+            statuses = run_concurrently(poll, pending, self.config.max_concurrent_requests)
+            running = []
+            for request, status in zip(pending, statuses):
+                if isinstance(status, Exception):
+                    poll_errors[request] = status
+                    running.append(request)
+                    continue
+                poll_errors.pop(request, None)
+                if status not in FINAL_STATES:
+                    running.append(request)
+                elif status != 'SUCCESSFUL':
+                    results[request] = VraSdkMainRequestException(f'Request failed with state {status}')
+            pending = running
+
+            if pending:
+                delay = next(delays, None)
+                if delay is None:
+                    for request in pending:
+                        results[request] = poll_errors.get(request) or VraSdkRequestTimeoutException(
+                            f'Request {request.status_url} still running after polling timeout')
+                    break
+                time.sleep(delay)
+
+        return results
+
+    def get_data(self, object_type, key, value, fields=None, query=None):
         """Get data about one catalog resource in vRa. Get detailed info about your object
         
         Args:
             object_type (string): object type as described in the 'business_models' section of the configuration fiel
             key (string): field to filter on
             value (string): value of the field
+            fields (list, optional): Defaults to None. If set, only these fields are formatted and set on the object
+            query (string, VraFilter or VraQuery, optional): Defaults to None. Query to filter and order the resources with, or name of a filter of the configuration file
         
         Returns:
             object: business models object type as described in you configuration file
         """
 
-        data = VraRequest({}).get_object(object_type, key, value, 1,1, True)
+        data = VraRequest({}, context=self.context).get_object(object_type, key, value, 1, 1, True, fields=fields, query=query)
 
         if not data:
             raise VraSdkMainException(
@@ -207,7 +455,7 @@ class VraSdk():
 
         return data[0]
 
-    def list_data(self, object_type, key, value, limit=None, page=1, full=False, recursive=False):
+    def list_data(self, object_type, key, value, limit=None, page=1, full=False, recursive=False, fields=None, query=None):
         """Get info about a list of object. Get less details than get_data(), but you still get the id
         
         Args:
@@ -216,7 +464,9 @@ class VraSdk():
             value (string): value of the field to search on
             limit (int, optional): Defaults to None. maximum result
             page (int, optional): Defaults to 1. vRa result page to get data from
-            recursive (bool, optional): Defaults to False. If True, will call itself recursively until there's no more page to get from
+            recursive (bool, optional): Defaults to False. If True, will also get every following page. Pages are fetched concurrently.
+            fields (list, optional): Defaults to None. If set, only these fields are formatted and set on the objects
+            query (string, VraFilter or VraQuery, optional): Defaults to None. Query to filter and order the resources with, or name of a filter of the configuration file
         
         Raises:
             VraSdkMainException: [description]
@@ -227,16 +477,60 @@ class VraSdk():
         if not limit:
             limit = self.config.config_file['max_vra_result_per_page']
 
-        data = VraRequest({}).get_object(object_type, key, value, limit, page, full)
+        request = VraRequest({}, context=self.context)
+        data = request.get_object(object_type, key, value, limit, page, full, fields=fields, query=query)
         if not data:
             raise VraSdkMainException(f'No {object_type} exist with {key}={value}')
 
-        if recursive and (len(data) == limit):
-            page = page+1
-            data_to_add = self.list_data(object_type, key, value, limit, page, full, recursive)
-            data = data + data_to_add
+        if recursive:
+            total_pages = request.metadata.get('totalPages')
+            if total_pages:
+                pages = run_concurrently(
+                    lambda next_page: VraRequest({}, context=self.context).get_object(object_type, key, value, limit, next_page, full, fields=fields, query=query) or [],
+                    range(page + 1, total_pages + 1),
+                    self.config.max_concurrent_requests)
+                for page_data in pages:
+                    data.extend(page_data)
+            else:
+                # no paging metadata, fallback on getting pages one by one until a page is not full
+                page_data = data
+                while len(page_data) == limit:
+                    page = page + 1
+                    page_data = VraRequest({}, context=self.context).get_object(object_type, key, value, limit, page, full, fields=fields, query=query) or []
+                    data.extend(page_data)
         return data
 
+    def iter_data(self, object_type, key, value, limit=None, page=1, full=False, raw_data=True, fields=None, query=None):
+        """Generator version of list_data(). vRa pages are requested one by one, only when the previous one has been consumed
+
+        Args:
+            object_type (string): object type as described in the 'business_models' section of the configuration file
+            key (string): field to filter on
+            value (string): value of the field to search on
+            limit (int, optional): Defaults to None. maximum result per page
+            page (int, optional): Defaults to 1. first vRa result page to get data from
+            full (bool, optional): Defaults to False. If True, get detailed info about each object
+            raw_data (bool, optional): Defaults to True. If False, the raw_data attribute of the objects is not set
+            fields (list, optional): Defaults to None. If set, only these fields are formatted and set on the objects
+            query (string, VraFilter or VraQuery, optional): Defaults to None. Query to filter and order the resources with, or name of a filter of the configuration file
+
+        Yields:
+            object: business models object type as described in you configuration file
+        """
+
+        if not limit:
+            limit = self.config.config_file['max_vra_result_per_page']
+
+        while True:
+            request = VraRequest({}, context=self.context)
+            data = request.get_object(object_type, key, value, limit, page, full, raw_data=raw_data, fields=fields, query=query)
+            yield from data or []
+
+            total_pages = request.metadata.get('totalPages')
+            if (total_pages and page >= total_pages) or (not total_pages and len(data or []) < limit):
+                return
+            page = page + 1
+
     def get_raw_definition(self, key, value, resource_type):
         """Return dict used to create object inside the VraFactory
 
@@ -251,5 +545,5 @@ class VraSdk():
             dict: dict of user friendly vRa formatted data
         """
         
-        return VraRequest({}).get_object(None, key, value, 1, 1, True, resource_type)[0]
+        return VraRequest({}, context=self.context).get_object(None, key, value, 1, 1, True, resource_type)[0]
 
@@ -5,7 +5,13 @@ import sys
 import json
 from pathlib import Path
 import importlib
+import keyword
 import time
+import random
+import threading
+from collections import OrderedDict
+from functools import lru_cache
+from concurrent.futures import ThreadPoolExecutor
 from vra_sdk.vra_exceptions import VraSdkUtilsException, VraSdkConfigException
 
 
@@ -22,6 +28,10 @@ def resolve_path(config_path):
     return os.path.abspath(os.path.join(os.getcwd(), config_path))
 
 
+FIRST_CAP_RE = re.compile('(.)([A-Z][a-z]+)')
+ALL_CAP_RE = re.compile('([a-z0-9])([A-Z])')
+
+
 def prettify_key(initial_dict):
     """transform camelCase dict key to snake_case
     
@@ -38,8 +48,36 @@ def prettify_key(initial_dict):
     return dict_clean
 
 
+def prettify_keys(initial_dicts):
+    """transform camelCase dict key to snake_case for a list of dict
+
+    Each distinct key is converted only once for the whole list
+
+    Args:
+        initial_dicts (list): dicts to transform key of
+
+    Returns:
+        list: transformed dicts
+    """
+
+    converted_keys = {}
+    result = []
+    for initial_dict in initial_dicts:
+        dict_clean = {}
+        for key, value in initial_dict.items():
+            key_clean = converted_keys.get(key)
+            if key_clean is None:
+                key_clean = converted_keys[key] = to_snake_case(key)
+            dict_clean[key_clean] = value
+        result.append(dict_clean)
+    return result
+
+
+@lru_cache(maxsize=4096)
 def to_snake_case(name):
     """transform CamelCase string to snake_case
+
+    Results are memoized, since vRa data keys are always the same
     
     Args:
         name (string): string to convert
@@ -48,8 +86,8 @@ def to_snake_case(name):
         string: converted string
     """
 
-    s1 = re.sub('(.)([A-Z][a-z]+)', r'\1_\2', name)
-    return re.sub('([a-z0-9])([A-Z])', r'\1_\2', s1).lower()
+    s1 = FIRST_CAP_RE.sub(r'\1_\2', name)
+    return ALL_CAP_RE.sub(r'\1_\2', s1).lower()
 
 
 
@@ -69,6 +107,23 @@ def get_module_class(kls):
     return mod, getattr(mod, cls)
 
 
+@lru_cache(maxsize=4096)
+def to_attribute_name(key):
+    """Convert a prettified vRa key to the name of a business model attribute
+
+    Dots (.) are replaced by underscores, and a trailing underscore is added to python keywords (eg: class -> class_)
+
+    Args:
+        key (string): prettified vRa key
+
+    Returns:
+        string: attribute name
+    """
+
+    key = key.replace('.', '_')
+    return key + '_' if keyword.iskeyword(key) else key
+
+
 def clean_kwargs_key(**kwargs):
     """replace dot (.) to underscore for kwargs key
     
@@ -82,17 +137,25 @@ def clean_kwargs_key(**kwargs):
 
 def load_payload_file(payload_path):
     """load json file
+
+    Files are kept in a process wide cache (PAYLOAD_CACHE), and only read again if their modification time changes
     
     Args:
         payload_path (string): path to the json file
     
     Returns:
-        dict: serialization of the json file
+        dict: serialization of the json file. Shared with the cache, so it must not be modified
     """
 
     try:
-        with open(resolve_path(payload_path)) as f:
+        path = resolve_path(payload_path)
+        mtime = os.stat(path).st_mtime_ns
+        cached = PAYLOAD_CACHE.get(path)
+        if cached and cached[0] == mtime:
+            return cached[1]
+        with open(path) as f:
             base = json.load(f)
+        PAYLOAD_CACHE.set(path, (mtime, base))
         return base
     except FileNotFoundError as e:
         raise VraSdkConfigException(
@@ -100,3 +163,248 @@ def load_payload_file(payload_path):
     except Exception as e:
         raise VraSdkUtilsException(
             f'Unmanaged error during payload loading for payload {payload_path}: {e}')
+
+
+def run_concurrently(func, iterable, max_workers):
+    """Apply func to every element of iterable using a bounded thread pool
+
+    Results are returned in the same order as the elements of iterable.
+    If max_workers is lower than 2 (or there's only one element), func is called sequentially in the current thread.
+
+    Args:
+        func (function): function to apply on each element
+        iterable (iterable): elements to process
+        max_workers (int): maximum number of concurrent calls
+
+    Returns:
+        list: result of func for each element
+    """
+
+    elements = list(iterable)
+    if max_workers < 2 or len(elements) < 2:
+        return [func(elt) for elt in elements]
+
+    with ThreadPoolExecutor(max_workers=min(max_workers, len(elements))) as executor:
+        return list(executor.map(func, elements))
+
+
+def polling_delays(initial_delay=3, factor=1.5, max_delay=30, jitter=0.1, timeout=7200, **kwargs):
+    """Generate the delays to wait between two polls of a vRa request status
+
+    Delays grow exponentially from initial_delay to max_delay, with a random jitter so that concurrent requests do not poll at the same time.
+    The generator stops once the timeout is reached, the last delay being shortened to end at the deadline.
+
+    Args:
+        initial_delay (float, optional): Defaults to 3. first delay, in seconds
+        factor (float, optional): Defaults to 1.5. multiplier applied to the delay after each poll
+        max_delay (float, optional): Defaults to 30. maximum delay, in seconds
+        jitter (float, optional): Defaults to 0.1. maximum random variation of a delay, as a ratio of the delay
+        timeout (float, optional): Defaults to 7200. maximum total waiting time, in seconds. None for no limit
+
+    Returns:
+        generator: delays, in seconds
+    """
+
+    deadline = time.monotonic() + timeout if timeout is not None else None
+    delay = initial_delay
+    while True:
+        next_delay = delay * (1 + random.uniform(-jitter, jitter))
+        if deadline is not None:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                return
+            next_delay = min(next_delay, remaining)
+        yield next_delay
+        delay = min(delay * factor, max_delay)
+
+
+class TtlLruCache():
+    """Thread safe in-memory cache, with a time to live and a least recently used eviction
+
+    Attributes:
+        maxsize (int): maximum number of entries. 0 disables the cache
+        ttl (float): time to live of an entry, in seconds. None for no expiration
+    """
+
+    def __init__(self, maxsize=128, ttl=3600, **kwargs):
+        """Init TtlLruCache
+
+        Args:
+            maxsize (int, optional): Defaults to 128. maximum number of entries. 0 disables the cache
+            ttl (float, optional): Defaults to 3600. time to live of an entry, in seconds. None for no expiration
+        """
+
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self.entries = OrderedDict()
+        self.lock = threading.Lock()
+
+    def get(self, key):
+        """Get an entry
+
+        Args:
+            key (hashable): entry key
+
+        Returns:
+            object: cached value, None if missing or expired
+        """
+
+        with self.lock:
+            entry = self.entries.get(key)
+            if entry is None:
+                return None
+            expires, value = entry
+            if expires is not None and expires < time.monotonic():
+                del self.entries[key]
+                return None
+            self.entries.move_to_end(key)
+            return value
+
+    def set(self, key, value):
+        """Store an entry, evicting the least recently used ones if the cache is full
+
+        Args:
+            key (hashable): entry key
+            value (object): value to store
+        """
+
+        if not self.maxsize:
+            return
+        expires = time.monotonic() + self.ttl if self.ttl is not None else None
+        with self.lock:
+            self.entries[key] = (expires, value)
+            self.entries.move_to_end(key)
+            while len(self.entries) > self.maxsize:
+                self.entries.popitem(last=False)
+
+    def clear(self):
+        """Remove every entry"""
+
+        with self.lock:
+            self.entries.clear()
+
+
+# cache of the payload files loaded by load_payload_file, map of absolute path to (modification time, payload)
+PAYLOAD_CACHE = TtlLruCache(maxsize=256, ttl=None)
+
+
+def preload_payload_files(config_file):
+    """Load in the payload cache every payload file referenced in the catalog_item and resource_action configuration sections
+
+    Missing or invalid files are skipped, the error will be raised when the payload is used
+
+    Args:
+        config_file (dict): serialization of the configuration file
+    """
+
+    for section in ('catalog_item', 'resource_action'):
+        for elt in config_file.get(section, {}).values():
+            if elt.get('payload'):
+                try:
+                    load_payload_file(elt['payload'])
+                except (VraSdkConfigException, VraSdkUtilsException):
+                    pass
+
+
+def copy_on_write(value):
+    """Wrap dict and list values into their copy-on-write version
+
+    Args:
+        value (object): value to wrap
+
+    Returns:
+        object: CopyOnWriteDict or CopyOnWriteList for plain dict or list, the value itself otherwise
+    """
+
+    if type(value) is dict:
+        return CopyOnWriteDict(value)
+    if type(value) is list:
+        return CopyOnWriteList(value)
+    return value
+
+
+def materialize(value):
+    """Convert a copy-on-write structure to plain dict and list, ready to be serialized
+
+    Parts of the structure which have never been accessed are still shared with the base structure
+
+    Args:
+        value (object): structure to convert
+
+    Returns:
+        object: plain structure
+    """
+
+    if isinstance(value, CopyOnWriteDict):
+        return {key: materialize(item) for key, item in dict.items(value)}
+    if isinstance(value, CopyOnWriteList):
+        return [materialize(item) for item in list.__iter__(value)]
+    return value
+
+
+class CopyOnWriteDict(dict):
+    """dict sharing its nested structure with a base dict, without ever modifying it.
+
+    Only the first level of the base dict is copied at creation. Nested dict and list are copied the same way when accessed,
+    so modifying a payload built from a large template only copies the modified paths, instead of the whole template.
+    Use materialize() to get a plain dict.
+    """
+
+    def __getitem__(self, key):
+        value = super().__getitem__(key)
+        wrapped = copy_on_write(value)
+        if wrapped is not value:
+            super().__setitem__(key, wrapped)
+        return wrapped
+
+    def __iter__(self):
+        # overriding __iter__ disables the fast path of dict(), {**payload} and update(), which would copy the shared
+        # nested structures as is: they go through keys() and __getitem__ instead
+        return dict.__iter__(self)
+
+    def get(self, key, default=None):
+        return self[key] if key in self else default
+
+    def setdefault(self, key, default=None):
+        if key not in self:
+            super().__setitem__(key, default)
+        return self[key]
+
+    def pop(self, key, *args):
+        return copy_on_write(super().pop(key, *args))
+
+    def popitem(self):
+        key, value = super().popitem()
+        return key, copy_on_write(value)
+
+    def values(self):
+        return [self[key] for key in self]
+
+    def items(self):
+        return [(key, self[key]) for key in self]
+
+    def copy(self):
+        return CopyOnWriteDict(self)
+
+
+class CopyOnWriteList(list):
+    """list sharing its nested structure with a base list, without ever modifying it. See CopyOnWriteDict"""
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return [self[i] for i in range(*index.indices(len(self)))]
+        value = super().__getitem__(index)
+        wrapped = copy_on_write(value)
+        if wrapped is not value:
+            super().__setitem__(index, wrapped)
+        return wrapped
+
+    def __iter__(self):
+        for index in range(len(self)):
+            yield self[index]
+
+    def pop(self, index=-1):
+        return copy_on_write(super().pop(index))
+
+    def copy(self):
+        return CopyOnWriteList(self)